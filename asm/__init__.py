@@ -1 +1,17 @@
-
+from ._function import Function, kernel
+from ._type import Type, Array, TypeVar
+from ._variable import Variable
+from ._bundle import build_bundle
+from ._fuse import fuse
+from ._toolchain import Toolchain, available_toolchains, fastest_toolchain
+from ._errors import (ArgumentsNumberError,
+                      ArgumentTypeError,
+                      ArgumentValueError,
+                      FunctionIsNotCompiledError,
+                      VariableDoesNotExistError,
+                      CompilationError,
+                      ChecksumError,
+                      LabelIsNotDefinedError)
+
+# public module asm.metrics (snapshot() and exporter of metrics of functions)
+from . import metrics
@@ -0,0 +1,64 @@
+'''
+Command-line interface of package.
+
+Usage:
+    python -m asm build MODULE [-o BUNDLE] [-a ATTRIBUTE]
+
+MODULE is path to Python file or name of module which declares compiled functions in dict
+(PYXASM_FUNCTIONS by default) like {name: Function}. Functions are written to bundle with build_bundle(),
+later they are loaded with Function.load(BUNDLE, name) on hosts without compiler.
+'''
+import os
+import sys
+import argparse
+from importlib import import_module
+from importlib.util import spec_from_file_location, module_from_spec
+
+from ._bundle import build_bundle
+
+
+def _import(module:str) -> object:
+    '''
+    Imports module by path to .py file or by name.
+    '''
+    if module.endswith('.py') or os.path.sep in module:
+        spec:object = spec_from_file_location(os.path.splitext(os.path.basename(module))[0], module)
+        imported:object = module_from_spec(spec)
+        spec.loader.exec_module(imported)
+
+        return imported
+
+    return import_module(module)
+
+
+def main(argv:list=None) -> int:
+    parser:argparse.ArgumentParser = argparse.ArgumentParser(prog='python -m asm')
+    commands:object = parser.add_subparsers(dest='command', required=True)
+
+    build:argparse.ArgumentParser = commands.add_parser('build', help='compile declared functions to bundle')
+    build.add_argument('module', help='path to .py file or name of module with declared functions')
+    build.add_argument('-o', '--output', default=None, help='path to directory of bundle (MODULE.bundle by default)')
+    build.add_argument('-a', '--attribute', default='PYXASM_FUNCTIONS', help='name of dict with functions in module')
+
+    args:argparse.Namespace = parser.parse_args(argv)
+
+    module:object = _import(args.module)
+
+    if not hasattr(module, args.attribute):
+        parser.error(f'module {args.module} has no attribute {args.attribute}')
+
+    output:str = args.output
+
+    if output is None:
+        output:str = os.path.splitext(os.path.basename(args.module))[0].split('.')[-1] + '.bundle'
+
+    functions:dict = getattr(module, args.attribute)
+    build_bundle(functions, output)
+
+    print(f'Bundle {output}: {", ".join(functions)}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,87 @@
 from abc import ABC
 from copy import copy
+from ctypes import sizeof
 from typing import Iterable, Union
 from collections.abc import Iterable as IterableObject
 
-from _variable import Variable
-from _errors import ArgumentTypeError, \
-                    ArgumentsNumberError
-from _typing import function
+from ._variable import Variable
+from ._register import Register
+from ._type import Array, TypeVar
+from ._isa import OperandKind, InstructionSpec, _WIDTH_BITS
+from ._errors import ArgumentTypeError, \
+                     ArgumentValueError, \
+                     ArgumentsNumberError
+from ._typehints import function
+
+
+# bits of OperandKind as int (operations with int are faster than operations with IntFlag)
+_REGISTER:int = int(OperandKind.REGISTER)
+_MEMORY:int = int(OperandKind.MEMORY)
+_IMMEDIATE:int = int(OperandKind.IMMEDIATE)
+_LABEL:int = int(OperandKind.LABEL)
+_KINDS:int = int(OperandKind.KINDS)
+_WIDTHS:int = int(OperandKind.WIDTHS)
+
+# widths of immediate values: (minimum, maximum, bits of widths which can hold value)
+_IMMEDIATE_WIDTHS:tuple = ((-0x80, 0xFF, _WIDTHS),
+                           (-0x8000, 0xFFFF, _WIDTHS & ~int(OperandKind.W8)),
+                           (-0x80000000, 0xFFFFFFFF, int(OperandKind.W32 | OperandKind.W64)),
+                           (-0x8000000000000000, 0xFFFFFFFFFFFFFFFF, int(OperandKind.W64)))
+
+# register -> bits of OperandKind, filled on first use of register (registers are interned)
+_register_classes:dict = dict()
+
+
+def _classify(operand:object) -> int:
+    '''
+    Returns class of operand: bits of kind and widths from asm._isa.OperandKind (0 for unsupported objects).
+
+    Register has its width, variable has width of its type (array is passed as pointer, so it has 32 bits,
+    variable of type variable has widths of all candidate types),
+    number has all widths which can hold it, label has all widths.
+    '''
+    operand_type:type = type(operand)
+
+    if operand_type is Register:
+        operand_class:Union[int, None] = _register_classes.get(operand)
+
+        if operand_class is None:
+            operand_class = _REGISTER | _WIDTH_BITS.get(operand.width(), 0)
+            _register_classes[operand] = operand_class
+
+        return operand_class
+
+    if operand_type is Variable:
+        ctype:object = operand._type()
+
+        if isinstance(ctype, Array):
+            return _MEMORY | _WIDTH_BITS[32]
+
+        # variable of type variable can have width of each candidate type
+        if isinstance(ctype, TypeVar):
+            operand_class:int = _MEMORY
+
+            for width in ctype._widths():
+                operand_class |= _WIDTH_BITS.get(width, 0)
+
+            return operand_class
+
+        return _MEMORY | _WIDTH_BITS.get(sizeof(ctype._get_type()) * 8, 0)
+
+    if operand_type is int:
+        for minimum, maximum, widths in _IMMEDIATE_WIDTHS:
+            if minimum <= operand <= maximum:
+                return _IMMEDIATE | widths
+
+        return _IMMEDIATE
+
+    if operand_type is float:
+        return _IMMEDIATE | _WIDTHS
+
+    if isinstance(operand, Label):
+        return _LABEL | _WIDTHS
+
+    return 0
 
 
 class InstructionInstance(object):
@@ -16,9 +91,13 @@ class InstructionInstance(object):
     __init__(self, name:str, args:tuple)
         Initialization in BaseInstruction.__call__().
 
-    __args(self) -> tuple
+    _args(self) -> tuple
         Returns tuple with its arguments.
     '''
+
+    __slots__ = ('__name', '__args')
+
+
     def __init__(self, name:str, args:Union[tuple, None]=None):
         
         self.__name:str = name
@@ -29,6 +108,13 @@ class InstructionInstance(object):
             self.__args:tuple = tuple()
 
 
+    def _name(self) -> str:
+        '''
+        Returns instruction's name.
+        '''
+        return self.__name
+
+
     def _args(self) -> tuple:
         '''
         Returns instruction's arguments.
@@ -115,24 +201,24 @@ class BaseInstruction(ABC):
             for instruction with one argument len(args) = 1;
             for instruction with no arguments len(args) = 0;
 
-        Calls self.__validate(self).
+        Calls self._validate(args).
 
-    __validate(self, *args):
-        Validates arguments using self.__validate_funcs.
+    _validate(self, args):
+        Validates arguments using self._validate_funcs (subclasses override it).
         Algorithm for instruction with two arguments looks like:
 
             arg1_validated = arg2_validated = False;
 
-            for (function in self.__validate_funcs[0])
+            for (function in self._validate_funcs[0])
                 arg1_validated = arg1_validated | function(arg1)
 
-            for (function in self.__validate_funcs[1])
+            for (function in self._validate_funcs[1])
                 arg2_validated = arg2_validated  | function(arg2)
 
         Algorithm for instruction with one argument looks like:
             arg_validated = False
 
-            for (function in self.__validate_funcs)
+            for (function in self._validate_funcs)
                 arg_validated = arg2_validated | function(arg)
     '''
     def __init__(self, name:str, validate_funcs:Union[Iterable[function], None]=None):
@@ -147,12 +233,12 @@ class BaseInstruction(ABC):
 
 
     def __call__(self, *args) -> InstructionInstance:
-        self.__validate(args)
+        self._validate(args)
 
         return InstructionInstance(self._name, args)
 
 
-    def __validate(self, args:tuple) -> None:
+    def _validate(self, args:tuple) -> None:
         pass
 
 
@@ -171,18 +257,18 @@ class InstructionWithTwoArguments(BaseInstruction):
             for instruction with one argument len(args) = 1;
             for instruction with no arguments len(args) = 0;
 
-        Calls self.__validate(self).
+        Calls self._validate(args).
 
-    __validate(self, *args):
-        Validates arguments using self.__validate_funcs.
+    _validate(self, args):
+        Validates arguments using self._validate_funcs.
         Algorithm looks like:
 
             arg1_validated = arg2_validated = False;
 
-            for (function in self.__validate_funcs[0])
+            for (function in self._validate_funcs[0])
                 arg1_validated = arg1_validated | function(arg1)
 
-            for (function in self.__validate_funcs[1])
+            for (function in self._validate_funcs[1])
                 arg2_validated = arg2_validated  | function(arg2)
     '''
 
@@ -197,13 +283,17 @@ class InstructionWithTwoArguments(BaseInstruction):
         return f'InstructionWithTwoArguments(name=\'{self._name}\')'
 
 
-    def __validate(self, args:tuple) -> None:
+    def _validate(self, args:tuple) -> None:
 
         # validate num of arguments
         if len(args) != InstructionWithTwoArguments.__num_of_args:
             raise ArgumentsNumberError(f'{self._name}: invalid number of arguments (got {len(args)}, expected 2).')
 
-        # self.__validate_funcs always has correct type - list<(tuple<function>, tuple<function>)>
+        # instruction without validate_funcs accepts arguments of any type
+        if len(self._validate_funcs) == 0:
+            return
+
+        # self._validate_funcs always has correct type - list<(tuple<function>, tuple<function>)>
         arg1_validated:bool = False
         arg2_validated:bool = False
 
@@ -239,15 +329,15 @@ class InstructionWithOneArgument(BaseInstruction):
             for instruction with one argument len(args) = 1;
             for instruction with no arguments len(args) = 0;
 
-        Calls self.__validate(self).
+        Calls self._validate(args).
 
-    __validate(self, *args) -> None:
-        Validates arguments using self.__validate_funcs.
+    _validate(self, args) -> None:
+        Validates arguments using self._validate_funcs.
 
         Algorithm for instruction looks like:
             arg_validated = False
 
-            for (function in self.__validate_funcs)
+            for (function in self._validate_funcs)
                 arg_validated = arg2_validated | function(arg)
 
             return arg_validated
@@ -265,13 +355,17 @@ class InstructionWithOneArgument(BaseInstruction):
         return f'InstructionWithOneArgument(name=\'{self._name}\')'
 
 
-    def __validate(self, args:tuple) -> None:
+    def _validate(self, args:tuple) -> None:
 
         # validate num of arguments
         if len(args) != InstructionWithOneArgument.__num_of_args:
             raise ArgumentsNumberError(f'{self._name}: invalid number of argument (got {len(args)}, expected 1)')
 
-        # self.__validate_funcs always has correct type - list<(tuple<function>, tuple<function>)>
+        # instruction without validate_funcs accepts arguments of any type
+        if len(self._validate_funcs) == 0:
+            return
+
+        # self._validate_funcs always has correct type - list<(tuple<function>, tuple<function>)>
         arg_validated:bool = False
 
         # validate argument
@@ -295,9 +389,9 @@ class InstructionWithoutParameters(BaseInstruction):
         args - arguments for instruction:
             for instruction with no arguments len(args) = 0;
 
-        Calls self.__validate(self).
+        Calls self._validate(args).
 
-    __validate(self, *args):
+    _validate(self, args):
         Checks true number of parameters.
     '''
 
@@ -313,38 +407,106 @@ class InstructionWithoutParameters(BaseInstruction):
         return f'InstructionWithoutParameters(name=\'{self._name}\')'
 
 
-    def __validate(self, args:tuple) -> None:
+    def _validate(self, args:tuple) -> None:
 
-        if len(args) != InstructionWithoutParameters:
+        if len(args) != InstructionWithoutParameters.__num_of_args:
             raise ArgumentsNumberError(f'{self._name}: invalid number of arguments (got {len(args)}, expected 0).')
 
 
+class Instruction(BaseInstruction):
+    '''
+    This class representes instruction from instruction set (asm._isa). Objects of this class are created
+    lazily by asm._instructions, so they should not be created directly.
+
+    __init__(self, instruction_spec:InstructionSpec):
+        instruction_spec - description of instruction from asm._isa.
+
+    _validate(self, args):
+        Checks number of arguments and classes of arguments. Each argument is classified once
+        (asm._base_intruction._classify) and checked with precomputed mask of its position:
+        argument is valid if class & mask has bit of kind and bit of width.
+        For instructions like mov widths of operands should be the same (mov eax, al is invalid).
+    '''
+
+
+    def __init__(self, instruction_spec:InstructionSpec):
+        super().__init__(instruction_spec.mnemonic)
+
+        self._masks:tuple = instruction_spec.masks
+        self._min_args:int = instruction_spec.min_operands
+        self._same_width:bool = instruction_spec.same_width
+
+
+    def __repr__(self) -> str:
+        return f'Instruction(name=\'{self._name}\')'
+
+
+    def _validate(self, args:tuple) -> None:
+
+        # validate num of arguments
+        if not self._min_args <= len(args) <= len(self._masks):
+            expected:str = str(self._min_args) if self._min_args == len(self._masks) else \
+                           f'from {self._min_args} to {len(self._masks)}'
+
+            raise ArgumentsNumberError(f'{self._name}: invalid number of arguments (got {len(args)}, expected {expected}).')
+
+        widths:int = _WIDTHS
+
+        for i, (arg, mask) in enumerate(zip(args, self._masks)):
+            allowed:int = _classify(arg) & mask
+
+            if not allowed & _KINDS:
+                raise ArgumentTypeError(f'{self._name}: unsupported type argument with index {i} ({repr(arg)}).')
+
+            if not allowed & _WIDTHS:
+                raise ArgumentTypeError(f'{self._name}: unsupported width of argument with index {i} ({repr(arg)}).')
+
+            widths &= allowed
+
+        if self._same_width and len(args) == 2 and not widths & _WIDTHS:
+            raise ArgumentTypeError(f'{self._name}: arguments have different widths ({repr(args[0])}, {repr(args[1])}).')
+
+
 class Label(object):
-    def __init__(self, instructions:Iterable[InstructionInstance]):
+    '''
+    This class representes label in Assembly.
+
+    __init__(self, instructions=None):
+        instructions - (default:None) iterable with objects of type InstructionInstance (body of label)
+                       or InstructionStream. Generators are consumed without building list.
+                       Body of label is placed after instructions of function.
+                       Label without instructions is defined at position in program
+                       (see asm._program.Program.label()), so it can be used before its definition.
+    '''
+
+    __slots__ = ('__name', '__instructions')
+
+
+    def __init__(self, instructions:Union[Iterable[InstructionInstance], None]=None):
 
         # get unique name for label
         # for example: l124324234
         self.__name = 'label' + str(id(self))
 
+        # label is defined at position in program
+        if instructions is None:
+            self.__instructions:None = None
+            return
+
         # try convert instructions argument to list
         if not isinstance(instructions, IterableObject):
             raise ArgumentTypeError('Initialization argument should be iterable.')
 
-        # convert instructions argument to list
-        instructions:list = list(instructions)
+        # InstructionStream imports this module, so it is imported here
+        from ._stream import InstructionStream
+
+        # instructions are appended to compact stream one by one
+        self.__instructions:InstructionStream = InstructionStream(instructions)
 
         # instructions argument is empty
-        if len(instructions) == 0:
+        if len(self.__instructions) == 0:
             raise ArgumentValueError('Initialization argument should be non-empty iterator.')
 
-        # validate elements in instructions argument
-        for i in range(len(instructions)):
-            if not isinstance(instructions[i], InstructionInstance):
-                raise ArgumentTypeError(f'Object with index {i} in initialization argument is not of type InstructionInstance.')
-
-        self.__instructions:list = instructions
-        self.__labels:tuple = (label for instruction in instructions for label in instruction._labels())
-
 
     def __eq__(self, var) -> bool:
 
@@ -354,33 +516,74 @@ class Label(object):
         return self.__name == var.__name
 
 
+    def __hash__(self) -> int:
+        return hash(self.__name)
+
+
     def __repr__(self) -> str:
         return self.__name
 
 
     def __str__(self) -> str:
-        output:str = 'Label(' + repr(self.__instructions[0]) + '\n'
+        if self.__instructions is None:
+            return f'Label({self.__name})'
+
+        output:str = 'Label('
 
         # indent is equal to 6 since string 'Label(' has 6 characters
         indent:int = 6
 
-        for i in range(1, len(self.__instructions)):
-            output += ' ' * indent + repr(self.__instructions[i]) + '\n'
+        for i, line in enumerate(self.__instructions._source_lines()):
+            output += (' ' * indent if i != 0 else '') + line + '\n'
 
         return output + ')'
 
 
+    def _is_position(self) -> bool:
+        '''
+        Returns True if label has no instructions (label is defined at position in program).
+        '''
+        return self.__instructions is None
+
+
+    def _body(self) -> object:
+        '''
+        Returns InstructionStream with instructions of label (None for label without instructions).
+        '''
+        return self.__instructions
+
+
     def _variables(self) -> tuple:
-        return (var for instruction in self.__instructions  \
-                    for var in instruction._variables())
+        if self.__instructions is None:
+            return tuple()
+
+        return self.__instructions._variables()
 
 
     def _labels(self) -> tuple:
-        return (var for instruction in self.__instructions  \
-                    for var in instruction._labels())
+        if self.__instructions is None:
+            return tuple()
 
+        return self.__instructions._labels()
 
-    def _source(self) -> str:
-        return  f'"{self.__name}:'  + \
-                " ".join(instruction._label_source() for instruction in self.__instructions) + \
-                '"'
\ No newline at end of file
+
+    def _registers(self) -> tuple:
+        if self.__instructions is None:
+            return tuple()
+
+        return (operand for operand in self.__instructions._operands if isinstance(operand, Register))
+
+
+    def _forms(self) -> set:
+        if self.__instructions is None:
+            return set()
+
+        return self.__instructions._forms()
+
+
+    def _source(self, syntax:str='intel') -> str:
+        # label without instructions is defined in source of instructions
+        if self.__instructions is None:
+            return ''
+
+        return f'"{self.__name}:"' + ' '.join(self.__instructions._source_lines(syntax))
@@ -0,0 +1,113 @@
+from typing import List
+from ctypes import sizeof
+
+from ._errors import ArgumentTypeError, ArgumentValueError
+from ._type import Array
+from ._variable import Variable
+
+
+# available schedules of OpenMP loop
+_SCHEDULES:tuple = ('static', 'dynamic', 'guided')
+
+
+def _batch_source(all_variables:List[Variable],
+                  roles:List[List[str]],
+                  asm_source:str,
+                  parallel:bool=False,
+                  schedule:str='static') -> str:
+    '''
+    Returns source of batch_function, which runs assembly insertion for each element of columns in native loop.
+
+    Signature of batch_function looks like:
+        void batch_function(long long n, int threads, int * in_a1, int * out_a2, int local_a3)
+    where in_ and out_ are columns of input and output variables (in order of all_variables)
+    and local_ are values of local variables.
+
+    Variables of assembly insertion are declared inside body of loop, so each iteration
+    (and each thread, if parallel is True) has its own copies of them.
+    With parallel=True loop is parallelized with '#pragma omp parallel for' (source has to be compiled with -fopenmp),
+    threads <= 0 means default number of OpenMP threads.
+    '''
+    if schedule not in _SCHEDULES:
+        raise ArgumentValueError(f'Unknown schedule: {schedule} (expected one of {", ".join(_SCHEDULES)}).')
+
+    parameters:List[str] = ['long long pyxasm_n', 'int pyxasm_threads']
+    body:str = ''
+    store:str = ''
+
+    for var, role in zip(all_variables, roles):
+        if isinstance(var._type(), Array):
+            raise ArgumentTypeError(f'Variable {repr(var)} is array, batch supports only variables of scalar types.')
+
+        typename:str = var._type()._base_type_name
+        name:str = var._name()
+
+        if 'o' in role:
+            # output is pointer in assembly insertion, so it points to value of current iteration
+            parameters.append(f'{typename} * out_{name}')
+
+            if 'i' in role:
+                parameters.append(f'{typename} * in_{name}')
+                body += f'{typename} value_{name} = in_{name}[pyxasm_i];\n'
+            else:
+                body += f'{typename} value_{name} = 0;\n'
+
+            body += f'{typename} * {name} = &value_{name};\n'
+            store += f'out_{name}[pyxasm_i] = value_{name};\n'
+        elif 'i' in role:
+            parameters.append(f'{typename} * in_{name}')
+            body += f'{typename} {name} = in_{name}[pyxasm_i];\n'
+        else:
+            parameters.append(f'{typename} local_{name}')
+            body += f'{typename} {name} = local_{name};\n'
+
+    source:str = ''
+
+    if parallel:
+        source += '#include <omp.h>\n\n'
+
+    source += 'void batch_function(' + ', '.join(parameters) + '){\n'
+
+    if parallel:
+        source += f'#pragma omp parallel for schedule({schedule}) ' + \
+                  'num_threads(pyxasm_threads > 0 ? pyxasm_threads : omp_get_max_threads())\n'
+
+    source += 'for (long long pyxasm_i = 0; pyxasm_i < pyxasm_n; pyxasm_i++){\n' + \
+              body + \
+              asm_source + '\n' + \
+              store + \
+              '}\n}\n'
+
+    return source
+
+
+def _column(ctype:type, column:object, size:int, writable:bool=False) -> object:
+    '''
+    Returns ctypes array with size elements of ctype for column of batch.
+
+    Buffer with the same format (array.array, ctypes array, numpy array etc.) is used without copying.
+    Other sequences are copied (writable column can not be copied, since it is used for outputs).
+    '''
+    column_type:type = ctype * size
+
+    if isinstance(column, column_type):
+        return column
+
+    try:
+        view:memoryview = memoryview(column)
+    except TypeError:
+        view:None = None
+
+    if view is not None and view.format.lstrip('@=<>!') == ctype._type_ and view.nbytes == sizeof(column_type):
+        if not view.readonly:
+            return column_type.from_buffer(column)
+        elif not writable:
+            return column_type.from_buffer_copy(column)
+
+    if writable:
+        raise ArgumentTypeError(f'Column of outputs should be writable buffer with {size} elements of type {ctype.__name__}.')
+
+    if len(column) != size:
+        raise ArgumentValueError(f'Invalid length of column (got {len(column)}, expected {size}).')
+
+    return column_type(*column)
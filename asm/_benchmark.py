@@ -0,0 +1,122 @@
+import math
+from typing import Dict, List, Sequence
+
+
+# helpers of generated source: serialized reading of time-stamp counter
+# lfence before rdtsc waits for previous instructions, rdtscp and lfence wait for the measured block
+_TSC_HELPERS:str = '''static inline unsigned long long pyxasm_tsc_begin(void){
+unsigned int low, high;
+__asm__ __volatile__("lfence\\n\\trdtsc\\n\\t" : "=a"(low), "=d"(high));
+return ((unsigned long long)high << 32) | low;
+}
+
+static inline unsigned long long pyxasm_tsc_end(void){
+unsigned int low, high;
+__asm__ __volatile__("rdtscp\\n\\tlfence\\n\\t" : "=a"(low), "=d"(high) : : "ecx");
+return ((unsigned long long)high << 32) | low;
+}
+
+'''
+
+# percentiles in BenchmarkResult.percentiles
+_PERCENTILES:tuple = (5, 25, 50, 75, 95, 99)
+
+
+def _benchmark_source(parameters:str, asm_source:str) -> str:
+    '''
+    Returns source of benchmark library with three functions:
+        benchmark_function(parameters, n, cycles) - runs assembly insertion n times, cycles[i] is time of i-th run;
+        overhead_function(n, cycles) - measures time of empty block (overhead of rdtsc and rdtscp);
+        empty_function(parameters) - empty function with the same signature to measure ctypes call overhead.
+
+    parameters is string like 'int * a1, int a2' (signature of main_function).
+    Each run stores its cycles to pyxasm_cycles, so runs of loop are observable.
+    '''
+    separator:str = ', ' if len(parameters) != 0 else ''
+
+    # measured block is volatile: its inputs do not change between runs, so optimizing toolchain
+    # (see Toolchain(optimization=...)) could hoist non-volatile block out of loop or merge runs
+    if asm_source.startswith('__asm__('):
+        asm_source:str = '__asm__ __volatile__(' + asm_source[len('__asm__('):]
+
+    return _TSC_HELPERS + \
+           f'void benchmark_function({parameters}{separator}unsigned long long pyxasm_n, unsigned long long * pyxasm_cycles){{\n' + \
+           'for (unsigned long long pyxasm_i = 0; pyxasm_i < pyxasm_n; pyxasm_i++){\n' + \
+           'unsigned long long pyxasm_start = pyxasm_tsc_begin();\n' + \
+           asm_source + '\n' + \
+           'pyxasm_cycles[pyxasm_i] = pyxasm_tsc_end() - pyxasm_start;\n' + \
+           '}\n}\n\n' + \
+           'void overhead_function(unsigned long long pyxasm_n, unsigned long long * pyxasm_cycles){\n' + \
+           'for (unsigned long long pyxasm_i = 0; pyxasm_i < pyxasm_n; pyxasm_i++){\n' + \
+           'unsigned long long pyxasm_start = pyxasm_tsc_begin();\n' + \
+           'pyxasm_cycles[pyxasm_i] = pyxasm_tsc_end() - pyxasm_start;\n' + \
+           '}\n}\n\n' + \
+           f'void empty_function({parameters}){{}}\n'
+
+
+def _percentile(sorted_values:Sequence[int], percent:float) -> int:
+    '''
+    Returns percentile of sorted values (nearest-rank method).
+    '''
+    rank:int = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+
+    return sorted_values[rank]
+
+
+class BenchmarkResult(object):
+    '''
+    This class representes result of Function.benchmark().
+
+    Cycles are measured with rdtsc/rdtscp inside native loop, so they do not include ctypes call overhead.
+    Overhead of rdtsc/rdtscp (minimum of empty measurements) is subtracted from each run.
+
+    Fields defined here:
+        repeat:int - number of measured runs (without warmup runs).
+        cycles:tuple - cycles of each run.
+        min:int, max:int, median:float, mean:float - statistics of cycles.
+        percentiles:dict - percent -> cycles (5, 25, 50, 75, 95 and 99 percentiles).
+        timer_overhead:int - subtracted cycles of rdtsc/rdtscp pair.
+        call_overhead_ns:float - time of one ctypes call of empty function with the same signature in nanoseconds.
+    '''
+
+    __slots__ = ('repeat', 'cycles', 'min', 'max', 'median', 'mean',
+                 'percentiles', 'timer_overhead', 'call_overhead_ns')
+
+
+    def __init__(self, raw_cycles:Sequence[int], timer_overhead:int, call_overhead_ns:float):
+
+        self.cycles:tuple = tuple(max(0, value - timer_overhead) for value in raw_cycles)
+        self.repeat:int = len(self.cycles)
+        self.timer_overhead:int = timer_overhead
+        self.call_overhead_ns:float = call_overhead_ns
+
+        sorted_cycles:List[int] = sorted(self.cycles)
+
+        self.min:int = sorted_cycles[0]
+        self.max:int = sorted_cycles[-1]
+        self.mean:float = sum(sorted_cycles) / len(sorted_cycles)
+
+        middle:int = len(sorted_cycles) // 2
+
+        if len(sorted_cycles) % 2 == 1:
+            self.median:float = float(sorted_cycles[middle])
+        else:
+            self.median:float = (sorted_cycles[middle - 1] + sorted_cycles[middle]) / 2
+
+        self.percentiles:Dict[int, int] = {percent: _percentile(sorted_cycles, percent) for percent in _PERCENTILES}
+
+
+    def __repr__(self) -> str:
+        return f'BenchmarkResult(repeat={self.repeat}, min={self.min}, median={self.median}, ' + \
+               f'call_overhead_ns={self.call_overhead_ns:.1f})'
+
+
+    def __str__(self) -> str:
+        return f'Runs:              {self.repeat}\n' + \
+               f'Cycles (min):      {self.min}\n' + \
+               f'Cycles (median):   {self.median}\n' + \
+               f'Cycles (mean):     {self.mean:.2f}\n' + \
+               f'Cycles (max):      {self.max}\n' + \
+               'Percentiles:       ' + ', '.join(f'p{percent}={value}' for percent, value in self.percentiles.items()) + '\n' + \
+               f'Timer overhead:    {self.timer_overhead} cycles (subtracted)\n' + \
+               f'ctypes call:       {self.call_overhead_ns:.1f} ns (not included in cycles)\n'
@@ -0,0 +1,51 @@
+import threading
+from typing import Iterable, List, Union
+
+
+class BoundFunction(object):
+    '''
+    This class representes compiled function with fixed arguments (see Function.bind()).
+
+    Fixed arguments are converted to ctypes values once (arrays are pinned: bound function keeps
+    references to their buffers), so each call converts only remaining arguments.
+    Outputs of each thread are written to its own objects, so bound function can be called from any thread.
+
+    Methods defined here:
+        __call__(*args, out=None) -> tuple
+            Calls function. args are values of remaining input variables (in order of input_vars in Function.compile()).
+            out is like out argument of Function.__call__().
+
+    Attributes:
+        _arguments:list - template of arguments of compiled function with converted fixed arguments.
+        _input_indexes:List[int] - indexes of remaining arguments in _arguments.
+        _copies:List[tuple] - (index, ctypes value) of fixed arguments of variables, which are input and output
+                              (they are copied to outputs before each call).
+    '''
+
+    __slots__ = ('__function', '_arguments', '_input_indexes', '_copies', '__local')
+
+
+    def __init__(self, function:object, arguments:list, input_indexes:List[int], copies:List[tuple]):
+        self.__function:object = function
+
+        self._arguments:list = arguments
+        self._input_indexes:List[int] = input_indexes
+        self._copies:List[tuple] = copies
+
+        # objects for outputs of each thread
+        self.__local:threading.local = threading.local()
+
+
+    def __call__(self, *args, out:Union[Iterable[object], None]=None) -> tuple:
+        if out is not None:
+            return self.__function._call_bound(self, args, out)
+
+        if not hasattr(self.__local, 'targets'):
+            self.__local.targets = self.__function._new_outputs()
+
+        return self.__function._call_bound(self, args, None, self.__local.targets)
+
+
+    def __repr__(self) -> str:
+        return f'BoundFunction(function={repr(self.__function)}, arguments={len(self._input_indexes)})'
+
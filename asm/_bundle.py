@@ -0,0 +1,169 @@
+import os
+import json
+from hashlib import sha256
+from typing import Dict, Tuple, Union
+from ctypes import Array as CTypesArray
+
+from ._errors import ArgumentTypeError, ArgumentValueError, ChecksumError
+from ._type import Type, Array
+from ._variable import Variable
+
+
+# name of manifest file in directory of bundle
+_MANIFEST:str = 'manifest.json'
+
+# version of format of manifest
+_VERSION:int = 1
+
+
+def _checksum(data:Union[str, bytes]) -> str:
+    '''
+    Returns sha256 of data (strings are encoded with utf-8).
+    '''
+    if isinstance(data, str):
+        data:bytes = data.encode('utf-8')
+
+    return sha256(data).hexdigest()
+
+
+def _python_value(value:object) -> object:
+    '''
+    Converts ctypes value to Python object (arrays are converted to lists recursively).
+    '''
+    if isinstance(value, CTypesArray):
+        return [_python_value(element) for element in value]
+
+    value:object = getattr(value, 'value', value)
+
+    # value of char is bytes, it is written to manifest as string
+    if isinstance(value, bytes):
+        return value.decode('latin-1')
+
+    return value
+
+
+def _describe_variable(var:Variable) -> dict:
+    '''
+    Returns description of variable for manifest: name, type, size of array, layout of array, value and trusted flag.
+    '''
+    ctype:Union[Type, Array] = var._type()
+
+    return {'name':  var._name(),
+            'type':  ctype._base_type_name,
+            'size':  list(ctype._size) if isinstance(ctype, Array) else None,
+            'contiguous': ctype._contiguous if isinstance(ctype, Array) else True,
+            'value': _python_value(var.get_c_value()) if var.has_value() else None,
+            'trusted': var._is_trusted()}
+
+
+def _restore_variable(description:dict) -> Variable:
+    '''
+    Creates variable from its description in manifest.
+    '''
+    ctype:Union[Type, Array] = Type(description['type'])
+
+    # size of array is like (outer dimension, ..., inner dimension)
+    if description['size'] is not None:
+        for dim in reversed(description['size']):
+            ctype:Array = Array(ctype, dim, contiguous=description.get('contiguous', True))
+
+    value:object = description['value']
+
+    # values of char are written to manifest as strings
+    if description['type'] == 'char' and value is not None:
+        value:object = _char_value(value)
+
+    return Variable._restore(ctype, value, description['name'], description.get('trusted', False))
+
+
+def _char_value(value:object) -> object:
+    '''
+    Converts value of char from manifest (string or nested lists of strings) to bytes.
+    '''
+    if isinstance(value, list):
+        return [_char_value(element) for element in value]
+
+    return value.encode('latin-1')
+
+
+def build_bundle(functions:Dict[str, object], path:str) -> str:
+    '''
+    Writes compiled functions to bundle: directory with shared library for each function and manifest.json
+    (symbol names, argtypes, roles and variables of functions, checksums of libraries and of assembly insertions).
+
+    functions - dict like {name: compiled Function}, names are used as names of library files.
+    path - path to directory of bundle (it is created if it does not exist).
+
+    Functions from bundle are loaded with Function.load(path, name) without compiler.
+    Returns path.
+    '''
+    if not isinstance(functions, dict):
+        raise ArgumentTypeError(f'Unsupposed type of functions argument (got {type(functions)}, expected dict).')
+
+    manifest:dict = {'version': _VERSION, 'functions': dict()}
+    libraries:Dict[str, bytes] = dict()
+
+    for name, function in functions.items():
+        if not isinstance(name, str) or not name.isidentifier():
+            raise ArgumentValueError(f'Invalid name of function in bundle: {repr(name)} (expected identifier).')
+
+        if not hasattr(function, '_bundle_entry'):
+            raise ArgumentTypeError(f'Object with name {name} is not of type Function.')
+
+        entry, library = function._bundle_entry()
+
+        entry['library'] = name + '.so'
+        entry['library_checksum'] = _checksum(library)
+
+        manifest['functions'][name] = entry
+        libraries[entry['library']] = library
+
+    os.makedirs(path, exist_ok=True)
+
+    for filename, library in libraries.items():
+        with open(os.path.join(path, filename), 'wb') as library_file:
+            library_file.write(library)
+
+    # manifest is written last, so bundle without manifest is incomplete
+    with open(os.path.join(path, _MANIFEST), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+
+    return path
+
+
+def _read_bundle(path:str, name:str) -> Tuple[dict, bytes]:
+    '''
+    Returns description of function from manifest of bundle and bytes of its shared library.
+
+    Checks checksum of library, checksum of source of assembly insertion
+    and checksum embedded to library (constant pyxasm_checksum).
+    '''
+    manifest_filename:str = os.path.join(path, _MANIFEST)
+
+    if not os.path.exists(manifest_filename):
+        raise ArgumentValueError(f'{path} is not a bundle (file {_MANIFEST} does not exist).')
+
+    with open(manifest_filename, 'r') as manifest_file:
+        manifest:dict = json.load(manifest_file)
+
+    if manifest.get('version') != _VERSION:
+        raise ArgumentValueError(f'Unsupported version of bundle {path} (got {manifest.get("version")}, expected {_VERSION}).')
+
+    if name not in manifest['functions']:
+        raise ArgumentValueError(f'Bundle {path} has no function {repr(name)} (available: {", ".join(manifest["functions"])}).')
+
+    entry:dict = manifest['functions'][name]
+
+    with open(os.path.join(path, entry['library']), 'rb') as library_file:
+        library:bytes = library_file.read()
+
+    if _checksum(library) != entry['library_checksum']:
+        raise ChecksumError(f'Checksum of library {entry["library"]} is different from checksum in manifest of bundle {path}.')
+
+    if _checksum(entry['asm']) != entry['checksum']:
+        raise ChecksumError(f'Checksum of source of function {repr(name)} is different from checksum in manifest of bundle {path}.')
+
+    if entry['checksum'].encode('ascii') not in library:
+        raise ChecksumError(f'Library {entry["library"]} was not compiled from source of function {repr(name)}.')
+
+    return entry, library
@@ -0,0 +1,269 @@
+from typing import Dict, List
+
+from ._errors import ArgumentTypeError, ArgumentValueError, ArgumentsNumberError
+from ._base_intruction import _classify, _REGISTER, _MEMORY, _IMMEDIATE
+from ._isa import _WIDTH_BITS
+from ._register import Register
+from ._stream import InstructionStream
+from ._type import Array
+from ._variable import Variable
+from ._bundle import _checksum
+from ._extension import _literal
+
+
+# types of variables of called function (each argument is one 32-bit slot of stack in cdecl)
+_SLOT_TYPES:tuple = ('int', 'unsigned int', 'long', 'unsigned long', 'float')
+
+# bits of 32-bit operands
+_W32:int = _WIDTH_BITS[32]
+
+_ESP:Register = Register('esp')
+_EBP:Register = Register('ebp')
+_EAX:Register = Register('eax')
+_ECX:Register = Register('ecx')
+_EDX:Register = Register('edx')
+
+
+def _thunk_operand(operand:object, syntax:str) -> str:
+    '''
+    Returns operand of instruction of thunk in syntax 'intel' or 'att': register, number,
+    tuple (base register, offset) for 32-bit memory operand or name of symbol.
+    '''
+    att:bool = syntax == 'att'
+
+    if isinstance(operand, Register):
+        return f'%{repr(operand)}' if att else repr(operand)
+
+    if isinstance(operand, int):
+        return f'${operand}' if att else str(operand)
+
+    if isinstance(operand, tuple):
+        base, offset = operand
+        return f'{offset}(%{repr(base)})' if att else f'DWORD PTR [{repr(base)}{offset:+d}]'
+
+    return operand
+
+
+def _thunk_line(syntax:str, mnemonic:str, *operands) -> str:
+    '''
+    Returns instruction of thunk in syntax 'intel' or 'att' (operands are in Intel order, destination is first).
+    '''
+    if syntax == 'att':
+        operands:tuple = operands[::-1]
+
+    return ' '.join((mnemonic, ', '.join(_thunk_operand(operand, syntax) for operand in operands))).strip()
+
+
+class Routine(object):
+    '''
+    This class representes compiled function, which is called from assembly insertion of other function (see call()).
+    It is operand of instruction call, its representation is name of thunk.
+
+    Called function is static C function in library of caller (with assembly insertion of called function).
+    Thunk is routine in assembly, which preserves eax, ecx and edx, aligns stack to 16 bytes
+    and calls called function by cdecl convention: arguments are values of input variables and pointers
+    to output variables.
+
+    Attributes:
+        _symbol:str - name of thunk.
+        _inputs:int - number of input variables of called function.
+        _outputs:int - number of output variables of called function.
+        _sources:Dict[str, str] - sources of called function and of its thunk and of routines
+                                  which are called by called function: name of thunk -> source.
+        _syntax:str - syntax of assembly insertion of called function and of thunk ('intel' or 'att'),
+                      caller should be compiled with toolchain of the same syntax.
+    '''
+
+    __slots__ = ('_symbol', '_inputs', '_outputs', '_sources', '_syntax')
+
+
+    def __init__(self, function:object):
+        all_variables, roles, input_indexes, asm_source, routines, syntax = function._callee()
+
+        output_indexes:List[int] = [i for i in range(len(all_variables)) if 'o' in roles[i]]
+
+        parameters:List[str] = list()
+        declarations:str = ''
+
+        for var, role in zip(all_variables, roles):
+            ctype:object = var._type()
+
+            if role == ['s'] or (isinstance(ctype, Array) and not ctype._contiguous):
+                raise ArgumentTypeError(f'Variable {repr(var)} is array with contiguous=False, call supports only contiguous arrays.')
+
+            if 'i' in role and 'o' in role:
+                raise ArgumentTypeError(f'Variable {repr(var)} is input and output, called function can not have such variables.')
+
+            if isinstance(ctype, Array):
+                if role != ['i']:
+                    raise ArgumentTypeError(f'Variable {repr(var)} is array, called function can have arrays only as input variables.')
+            elif ctype._base_type_name not in _SLOT_TYPES:
+                raise ArgumentTypeError(f'Variable {repr(var)} is of type {ctype._base_type_name}, ' + \
+                                        f'variables of called function should be of types: {", ".join(_SLOT_TYPES)}.')
+
+            # local variables are declared with their values
+            if len(role) == 0:
+                if isinstance(ctype, Array):
+                    raise ArgumentTypeError(f'Variable {repr(var)} is local array, called function can not have local arrays.')
+
+                declarations += f'{var._definition()} = {_literal(var)};\n'
+
+        # parameters of called function: values of input variables and pointers to output variables
+        parameters += [all_variables[i]._definition() for i in input_indexes]
+        parameters += [all_variables[i]._definition(with_pointer=True) for i in output_indexes]
+
+        body:str = f'({", ".join(parameters) or "void"}){{\n' + declarations + asm_source + '\n}\n'
+
+        # the same function is compiled once in library of caller
+        name:str = _checksum(body)[:16]
+
+        self._symbol:str = f'pyxasm_thunk_{name}'
+        self._inputs:int = len(input_indexes)
+        self._outputs:int = len(output_indexes)
+        self._syntax:str = syntax
+
+        self._sources:Dict[str, str] = dict(routines)
+        # values of local variables can be HUGE_VAL or NAN (see asm._extension._literal())
+        self._sources[self._symbol] = '#include <math.h>\n' + \
+                                      f'static void __attribute__((used, noinline)) pyxasm_routine_{name}' + body + '\n' + \
+                                      self.__thunk(name)
+
+
+    def __thunk(self, name:str) -> str:
+        '''
+        Returns source of thunk. Arguments of thunk are values of input variables on stack (first argument
+        is on top of stack) and slots for outputs after them.
+        '''
+        slots:int = self._inputs + self._outputs
+        syntax:str = self._syntax
+
+        lines:List[str] = [f'pyxasm_thunk_{name}:',
+                           _thunk_line(syntax, 'push', _EBP),
+                           _thunk_line(syntax, 'mov', _EBP, _ESP),
+                           _thunk_line(syntax, 'push', _EAX),
+                           _thunk_line(syntax, 'push', _ECX),
+                           _thunk_line(syntax, 'push', _EDX),
+                           _thunk_line(syntax, 'sub', _ESP, 4 * slots),
+                           _thunk_line(syntax, 'and', _ESP, -16)]
+
+        # copy values of input variables
+        for i in range(self._inputs):
+            lines += [_thunk_line(syntax, 'mov', _EAX, (_EBP, 8 + 4 * i)),
+                      _thunk_line(syntax, 'mov', (_ESP, 4 * i), _EAX)]
+
+        # pass pointers to slots for outputs
+        for j in range(self._outputs):
+            lines += [_thunk_line(syntax, 'lea', _EAX, (_EBP, 8 + 4 * (self._inputs + j))),
+                      _thunk_line(syntax, 'mov', (_ESP, 4 * (self._inputs + j)), _EAX)]
+
+        lines += [_thunk_line(syntax, 'call', f'pyxasm_routine_{name}'),
+                  _thunk_line(syntax, 'lea', _ESP, (_EBP, -12)),
+                  _thunk_line(syntax, 'pop', _EDX),
+                  _thunk_line(syntax, 'pop', _ECX),
+                  _thunk_line(syntax, 'pop', _EAX),
+                  _thunk_line(syntax, 'pop', _EBP),
+                  _thunk_line(syntax, 'ret')]
+
+        # section of compiler is restored after thunk, so code and data after it are in their sections
+        return '__asm__(\n".pushsection .text\\n"\n".p2align 4\\n"\n' + '\n'.join(f'"{line}\\n"' for line in lines) + \
+               '\n".popsection\\n"\n);\n'
+
+
+    def __repr__(self) -> str:
+        return self._symbol
+
+
+def _check_operand(operand:object, index:int, is_output:bool) -> None:
+    '''
+    Checks that operand of call is 32-bit register or variable (or number for input).
+    '''
+    operand_class:int = _classify(operand)
+    kinds:int = _REGISTER | _MEMORY if is_output else _REGISTER | _MEMORY | _IMMEDIATE
+
+    if operand_class & kinds == 0 or operand_class & _W32 == 0 or operand is _ESP:
+        raise ArgumentTypeError(f'call: unsupported argument with index {index} ({repr(operand)}), ' + \
+                                f'expected 32-bit register or variable{"" if is_output else " or number"}.')
+
+
+class CallInstruction(object):
+    '''
+    This class representes instruction call: call(function, *operands) calls compiled function
+    from assembly insertion. operands are values of input variables of function (registers, variables
+    or numbers) and then registers or variables for its output variables.
+
+    Call is expanded to instructions which pass arguments on stack and call thunk of function:
+        sub esp, 4 * outputs
+        push input_n ... push input_1
+        call thunk
+        add esp, 4 * inputs
+        pop output_1 ... pop output_m
+    Registers are preserved (except outputs), so function is called like one instruction.
+
+    Example:
+    >>> f = Function([mov(eax, a), call(square, eax, c)])
+    '''
+
+    _name:str = 'call'
+
+
+    def __call__(self, function:object, *operands) -> InstructionStream:
+        # Function imports this module, so it is imported here
+        from ._function import Function
+
+        if not isinstance(function, Function):
+            raise ArgumentTypeError(f'call: first argument should be compiled Function (got {type(function)}).')
+
+        routine:Routine = Routine(function)
+
+        if len(operands) != routine._inputs + routine._outputs:
+            raise ArgumentsNumberError(f'call: function takes {routine._inputs} inputs and {routine._outputs} outputs ({len(operands)} operands given).')
+
+        inputs:tuple = operands[:routine._inputs]
+        outputs:tuple = operands[routine._inputs:]
+
+        for i, operand in enumerate(operands):
+            _check_operand(operand, i, i >= routine._inputs)
+
+        stream:InstructionStream = InstructionStream()
+
+        if routine._outputs != 0:
+            stream.append('sub', (_ESP, 4 * routine._outputs))
+
+        # cdecl: the last argument is pushed first
+        for operand in reversed(inputs):
+            stream.append('push', (operand, ))
+
+        stream.append('call', (routine, ))
+
+        if routine._inputs != 0:
+            stream.append('add', (_ESP, 4 * routine._inputs))
+
+        for operand in outputs:
+            stream.append('pop', (operand, ))
+
+        return stream
+
+
+    def __repr__(self) -> str:
+        return 'call'
+
+
+call:CallInstruction = CallInstruction()
+
+
+def _routines(operands:List[object], syntax:str='intel') -> Dict[str, str]:
+    '''
+    Returns sources of routines, which are called in instructions with given operands (including labels):
+    name of thunk -> source. Routines should have syntax of toolchain of caller.
+    '''
+    sources:Dict[str, str] = dict()
+
+    for operand in operands:
+        if isinstance(operand, Routine):
+            if operand._syntax != syntax:
+                raise ArgumentValueError(f'Called function is compiled with {operand._syntax} syntax, ' + \
+                                         f'it can not be called from function compiled with {syntax} syntax.')
+
+            sources.update(operand._sources)
+
+    return sources
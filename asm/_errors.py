@@ -24,5 +24,14 @@ class VariableDoesNotExistError(Exception):
 
 
 class CompilationError(Exception):
+    def __init__(self, text:str):
+        Exception.__init__(self, text)
+
+
+class ChecksumError(Exception):
+    def __init__(self, text:str):
+        Exception.__init__(self, text)
+
+class LabelIsNotDefinedError(Exception):
     def __init__(self, text:str):
         Exception.__init__(self, text)
\ No newline at end of file
@@ -0,0 +1,342 @@
+from typing import Dict, Iterable, List, Tuple, Union
+
+from ._errors import ArgumentValueError
+from ._register import Register
+from ._variable import Variable
+from ._base_intruction import Label
+from ._stream import InstructionStream, _mnemonics, _mnemonic_ids, _NO_OPERAND, _LABEL_MNEMONIC
+from ._isa import spec, InstructionSpec
+
+
+# profiles of microarchitectures: name -> (issue width, latency class -> (latency, ((ports, cycles), ...)))
+# cycles of each usage are spread evenly over its ports, for example ('p0156', 1) adds 0.25 cycle to each port
+_PROFILES:Dict[str, tuple] = {'skylake': (4, {'mov':       (1,   (('p0156', 1), )),
+                                              'alu':       (1,   (('p0156', 1), )),
+                                              'shift':     (1,   (('p06', 1), )),
+                                              'bittest':   (1,   (('p06', 1), )),
+                                              'bitscan':   (3,   (('p1', 1), )),
+                                              'xchg':      (2,   (('p0156', 3), )),
+                                              'mul':       (4,   (('p1', 1), ('p5', 1))),
+                                              'div':       (26,  (('p0', 1), ('div', 6))),
+                                              'convert':   (1,   (('p06', 1), )),
+                                              'branch':    (1,   (('p6', 1), )),
+                                              'serialize': (100, (('p0156', 25), )),
+                                              'nop':       (0,   (('p0156', 1), ))}),
+
+                              'zen2':    (5, {'mov':       (1,   (('a0123', 1), )),
+                                              'alu':       (1,   (('a0123', 1), )),
+                                              'shift':     (1,   (('a12', 1), )),
+                                              'bittest':   (1,   (('a12', 1), )),
+                                              'bitscan':   (3,   (('a0123', 1), )),
+                                              'xchg':      (1,   (('a0123', 2), )),
+                                              'mul':       (3,   (('a1', 2), )),
+                                              'div':       (25,  (('a2', 1), ('div', 12))),
+                                              'convert':   (1,   (('a0123', 1), )),
+                                              'branch':    (1,   (('a03', 1), )),
+                                              'serialize': (100, (('a0123', 25), )),
+                                              'nop':       (0,   (('a0123', 1), ))}),
+
+                              'generic': (2, {'mov':       (1,   (('p01', 1), )),
+                                              'alu':       (1,   (('p01', 1), )),
+                                              'shift':     (1,   (('p0', 1), )),
+                                              'bittest':   (1,   (('p0', 1), )),
+                                              'bitscan':   (3,   (('p0', 1), )),
+                                              'xchg':      (2,   (('p01', 3), )),
+                                              'mul':       (4,   (('p0', 1), )),
+                                              'div':       (30,  (('p0', 1), ('div', 20))),
+                                              'convert':   (1,   (('p01', 1), )),
+                                              'branch':    (1,   (('p1', 1), )),
+                                              'serialize': (100, (('p01', 50), )),
+                                              'nop':       (0,   (('p01', 1), ))})}
+
+# latency class of instructions which are not in instruction set (asm._isa)
+_DEFAULT_CLASS:str = 'alu'
+
+
+def _ports(group:str) -> Tuple[str]:
+    '''
+    Splits group of ports like 'p0156' to ('p0', 'p1', 'p5', 'p6'). Group without digits is one port.
+    '''
+    prefix:str = group.rstrip('0123456789')
+
+    if prefix == group:
+        return (group, )
+
+    return tuple(prefix + digit for digit in group[len(prefix):])
+
+
+def _resource(operand:object) -> Union[str, None]:
+    '''
+    Returns name of resource for dependency analysis: family of register or name of variable.
+    Immediate values and labels are not resources.
+    '''
+    if isinstance(operand, Register):
+        return operand.family()
+
+    if isinstance(operand, Variable):
+        return operand._name()
+
+    return None
+
+
+class Estimate(object):
+    '''
+    This class representes result of Function.estimate().
+
+    Fields defined here:
+        profile:str - name of microarchitecture profile.
+        instructions:int - number of instructions in one iteration.
+        uops:int - number of micro-operations in one iteration.
+        cycles:float - estimated cycles per iteration.
+        latency:int - latency of critical dependency chain of one iteration.
+        critical_chain:tuple - sources of instructions in critical dependency chain.
+        port_pressure:dict - cycles per iteration for each port.
+        bottleneck:str - port with maximal pressure or 'latency' if loop is bound by dependency chain.
+        unknown:tuple - mnemonics that are not in table (estimated as simple ALU instructions).
+    '''
+
+    __slots__ = ('profile', 'instructions', 'uops', 'cycles', 'latency',
+                 'critical_chain', 'port_pressure', 'bottleneck', 'unknown')
+
+
+    def __init__(self, **fields):
+        for name in Estimate.__slots__:
+            setattr(self, name, fields[name])
+
+
+    def __repr__(self) -> str:
+        return f'Estimate(profile=\'{self.profile}\', cycles={self.cycles:.2f}, bottleneck=\'{self.bottleneck}\')'
+
+
+    def __str__(self) -> str:
+        ports:List[str] = sorted(self.port_pressure)
+
+        output:str = f'Profile:            {self.profile}\n' + \
+                     f'Instructions:       {self.instructions}\n' + \
+                     f'Total uops:         {self.uops}\n' + \
+                     f'Cycles/iteration:   {self.cycles:.2f}\n' + \
+                     f'Critical latency:   {self.latency}\n' + \
+                     f'Bottleneck:         {self.bottleneck}\n\n' + \
+                     'Resource pressure per iteration:\n' + \
+                     ''.join(f'{port:>7}' for port in ports) + '\n' + \
+                     ''.join(f'{self.port_pressure[port]:>7.2f}' for port in ports) + '\n\n' + \
+                     'Critical chain:\n' + \
+                     ''.join(f'    {source}\n' for source in self.critical_chain)
+
+        if len(self.unknown) != 0:
+            output += '\nUnknown instructions (estimated as ALU): ' + ', '.join(self.unknown) + '\n'
+
+        return output
+
+
+def available_profiles() -> List[str]:
+    '''
+    Returns list with names of available microarchitecture profiles.
+    '''
+    return list(_PROFILES)
+
+
+def _flatten(stream:InstructionStream) -> InstructionStream:
+    '''
+    Returns stream with instructions in order of assembly insertion: instructions of stream
+    and then bodies of labels (labels used in bodies of other labels too), so loops written
+    as labels are estimated with their bodies. Each body is added once.
+    '''
+    labels:List[Label] = list()
+    flat:InstructionStream = InstructionStream(stream)
+
+    for label in flat._labels():
+        if not label._is_position() and label not in labels:
+            labels.append(label)
+
+    i:int = 0
+
+    # labels used in added bodies are appended to list while it is walked
+    while i < len(labels):
+        body:InstructionStream = labels[i]._body()
+        flat.extend(body)
+
+        for label in body._labels():
+            if not label._is_position() and label not in labels:
+                labels.append(label)
+
+        i += 1
+
+    return flat
+
+
+def estimate(stream:InstructionStream, profile:str='skylake', iterations:int=4) -> Estimate:
+    '''
+    Estimates cycles per iteration of stream (like a small llvm-mca).
+    Bodies of labels are estimated after instructions of stream (see _flatten()),
+    definitions of labels are not counted as instructions.
+
+    Throughput bound is maximal pressure on a port (or number of uops divided by issue width).
+    Latency bound is growth of dependency chains between iterations (loop-carried dependencies),
+    which is found by simulating given number of iterations. Result is maximal bound.
+    '''
+    if profile not in _PROFILES:
+        raise ArgumentValueError(f'Unknown profile: {profile}. Use available_profiles() to get list of available profiles.')
+
+    if not isinstance(iterations, int) or iterations < 2:
+        raise ArgumentValueError(f'Invalid number of iterations (got {iterations}, expected int >= 2).')
+
+    issue_width, classes = _PROFILES[profile]
+
+    stream:InstructionStream = _flatten(stream)
+
+    # positions of instructions (definitions of labels are skipped)
+    label_opcode:Union[int, None] = _mnemonic_ids.get(_LABEL_MNEMONIC)
+    instructions:List[int] = [i for i in range(len(stream)) if stream._opcodes[i] != label_opcode]
+
+    # precompute resources of operands once
+    resources:List[Union[str, None]] = [_resource(operand) for operand in stream._operands]
+    operand_sources:List[str] = [repr(operand) for operand in stream._operands]
+
+    # precompute per opcode: latency, reads and writes of implicit operands and usage of ports
+    opcode_info:dict = dict()
+    unknown:List[str] = list()
+
+    for opcode in set(stream._opcodes):
+        mnemonic:str = _mnemonics[opcode]
+
+        # definition of label is not instruction
+        if mnemonic == _LABEL_MNEMONIC:
+            opcode_info[opcode] = (0, (), (), (), (), None)
+            continue
+
+        instruction_spec:Union[InstructionSpec, None] = spec(mnemonic)
+
+        if instruction_spec is not None:
+            latency_class:str = instruction_spec.latency_class
+            access:tuple = instruction_spec.access
+            implicit_reads:tuple = instruction_spec.implicit_reads
+            implicit_writes:tuple = instruction_spec.implicit_writes
+            implicit_forms:dict = instruction_spec.implicit_forms
+            flags:str = instruction_spec.flags
+        else:
+            latency_class, access, implicit_reads, implicit_writes, flags = _DEFAULT_CLASS, ('rw', 'r'), (), (), 'w'
+            implicit_forms:dict = dict()
+            unknown.append(mnemonic)
+
+        latency, usage = classes[latency_class]
+
+        flag_reads:tuple = ('flags', ) if 'r' in flags else ()
+        flag_writes:tuple = ('flags', ) if 'w' in flags else ()
+
+        # implicit registers of other forms by number of operands (None if they are the same for all forms)
+        forms:Union[dict, None] = {operands: (reads + flag_reads, writes + flag_writes)
+                                   for operands, (reads, writes) in implicit_forms.items()} or None
+
+        opcode_info[opcode] = (latency, access, implicit_reads + flag_reads, implicit_writes + flag_writes, usage, forms)
+
+    # resource pressure of one iteration
+    port_pressure:Dict[str, float] = dict()
+    uops:int = 0
+
+    for i in instructions:
+        usage:tuple = opcode_info[stream._opcodes[i]][4]
+
+        for group, cycles in usage:
+            ports:Tuple[str] = _ports(group)
+
+            for port in ports:
+                port_pressure[port] = port_pressure.get(port, 0) + cycles / len(ports)
+
+            # each cycle on a pipelined port is one uop, non-pipelined units (like divider) add no uops
+            if group != 'div':
+                uops += cycles
+
+    # dependency analysis: time when each resource is ready and instruction which produced it
+    ready:Dict[str, int] = dict()
+    producer:Dict[str, int] = dict()
+    iteration_ends:List[int] = list()
+
+    # predecessor of each instruction in critical chain of last iteration
+    predecessor:List[int] = [-1] * len(stream)
+    finish:List[int] = [0] * len(stream)
+
+    for iteration in range(iterations):
+        last_iteration:bool = iteration == iterations - 1
+
+        for i in instructions:
+            latency, access, implicit_reads, implicit_writes, usage, forms = opcode_info[stream._opcodes[i]]
+
+            if forms is not None:
+                operands:int = (stream._first[i] != _NO_OPERAND) + (stream._second[i] != _NO_OPERAND)
+                implicit_reads, implicit_writes = forms.get(operands, (implicit_reads, implicit_writes))
+
+            reads:List[str] = list(implicit_reads)
+            writes:List[str] = list(implicit_writes)
+
+            for operand_id, mode in zip((stream._first[i], stream._second[i]), access):
+                if operand_id == _NO_OPERAND or resources[operand_id] is None:
+                    continue
+
+                if 'r' in mode:
+                    reads.append(resources[operand_id])
+                if 'w' in mode:
+                    writes.append(resources[operand_id])
+
+            start:int = 0
+            start_producer:int = -1
+
+            for resource in reads:
+                if ready.get(resource, 0) > start:
+                    start = ready[resource]
+                    start_producer = producer[resource]
+
+            end:int = start + latency
+
+            for resource in writes:
+                ready[resource] = end
+                producer[resource] = i
+
+            if last_iteration:
+                finish[i] = end
+                # producer from previous iteration starts the chain of this iteration
+                predecessor[i] = start_producer if start_producer < i else -1
+
+        iteration_ends.append(max(ready.values(), default=0))
+
+    # latency bound is growth of dependency chains per iteration
+    latency_bound:float = (iteration_ends[-1] - iteration_ends[0]) / (iterations - 1)
+    throughput_bound:float = max(max(port_pressure.values(), default=0), uops / issue_width)
+
+    # critical chain of last iteration (from instruction with maximal finish time)
+    chain:List[int] = list()
+
+    if len(instructions) != 0:
+        i:int = max(instructions, key=lambda index: finish[index])
+
+        while i != -1:
+            chain.append(i)
+            i = predecessor[i]
+
+        chain.reverse()
+
+        # chain starts when its first instruction starts
+        latency:int = finish[chain[-1]] - finish[chain[0]] + opcode_info[stream._opcodes[chain[0]]][0]
+    else:
+        latency:int = 0
+
+    def source(index:int) -> str:
+        args:str = ', '.join(operand_sources[operand_id] for operand_id in (stream._first[index], stream._second[index]) \
+                             if operand_id != _NO_OPERAND)
+
+        return f'[{index}] {_mnemonics[stream._opcodes[index]]} {args}'.rstrip()
+
+    if latency_bound > throughput_bound:
+        bottleneck:str = 'latency'
+    else:
+        bottleneck:str = max(port_pressure, key=port_pressure.get, default='none')
+
+    return Estimate(profile=profile,
+                    instructions=len(instructions),
+                    uops=uops,
+                    cycles=max(latency_bound, throughput_bound),
+                    latency=latency,
+                    critical_chain=tuple(source(i) for i in chain),
+                    port_pressure=port_pressure,
+                    bottleneck=bottleneck,
+                    unknown=tuple(unknown))
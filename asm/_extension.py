@@ -0,0 +1,240 @@
+import os
+import math
+import sysconfig
+from typing import List
+from importlib.machinery import ExtensionFileLoader
+from importlib.util import spec_from_file_location, module_from_spec
+
+from ._errors import ArgumentTypeError
+from ._type import Array
+from ._variable import Variable
+
+
+# C functions for converting Python objects to C values and back:
+# base type name -> (unboxing, type of unboxed value, boxing)
+_CONVERTERS:dict = {'short':              ('PyLong_AsLong',             'long',               'PyLong_FromLong'),
+                    'int':                ('PyLong_AsLong',             'long',               'PyLong_FromLong'),
+                    'long':               ('PyLong_AsLong',             'long',               'PyLong_FromLong'),
+                    'long long':          ('PyLong_AsLongLong',         'long long',          'PyLong_FromLongLong'),
+                    'unsigned short':     ('PyLong_AsUnsignedLong',     'unsigned long',      'PyLong_FromUnsignedLong'),
+                    'unsigned int':       ('PyLong_AsUnsignedLong',     'unsigned long',      'PyLong_FromUnsignedLong'),
+                    'unsigned long':      ('PyLong_AsUnsignedLong',     'unsigned long',      'PyLong_FromUnsignedLong'),
+                    'unsigned long long': ('PyLong_AsUnsignedLongLong', 'unsigned long long', 'PyLong_FromUnsignedLongLong'),
+                    'float':              ('PyFloat_AsDouble',          'double',             'PyFloat_FromDouble'),
+                    'double':             ('PyFloat_AsDouble',          'double',             'PyFloat_FromDouble'),
+                    'char':               ('pyxasm_as_char',            'long',               'pyxasm_from_char')}
+
+# range checks for types which are narrower than type of unboxed value
+_LIMITS:dict = {'short':          'pyxasm_value < SHRT_MIN || pyxasm_value > SHRT_MAX',
+                'int':            'pyxasm_value < INT_MIN || pyxasm_value > INT_MAX',
+                'unsigned short': 'pyxasm_value > USHRT_MAX',
+                'unsigned int':   'pyxasm_value > UINT_MAX'}
+
+# helpers for char type (Python value of char is bytes with one byte, like value of c_char in ctypes backend)
+_CHAR_HELPERS:str = '''static long pyxasm_as_char(PyObject * obj){
+if (!PyBytes_Check(obj) || PyBytes_GET_SIZE(obj) != 1){
+PyErr_SetString(pyxasm_type_error, "Value is not of type 'char' (expected bytes with one byte).");
+return -1;
+}
+return (long)(unsigned char)PyBytes_AS_STRING(obj)[0];
+}
+
+static PyObject * pyxasm_from_char(char value){
+return PyBytes_FromStringAndSize(&value, 1);
+}
+
+'''
+
+# errors of package raised by kernel (ArgumentTypeError and ArgumentValueError from module asm._errors),
+# they are imported when module is initialized
+_ERROR_HELPERS:str = '''static PyObject * pyxasm_type_error = NULL;
+static PyObject * pyxasm_value_error = NULL;
+
+static int pyxasm_import_errors(void){
+PyObject * errors = PyImport_ImportModule("asm._errors");
+if (errors == NULL) return -1;
+pyxasm_type_error = PyObject_GetAttrString(errors, "ArgumentTypeError");
+pyxasm_value_error = PyObject_GetAttrString(errors, "ArgumentValueError");
+Py_DECREF(errors);
+return pyxasm_type_error != NULL && pyxasm_value_error != NULL ? 0 : -1;
+}
+
+'''
+
+# check of buffer of input array: format code and size of elements, number of dimensions and known sizes
+# of dimensions (unknown size is -1), bytes and bytearray are viewed as arrays of elements of any type
+_BUFFER_HELPERS:str = '''static int pyxasm_check_buffer(PyObject * obj, Py_buffer * view, const char * format, Py_ssize_t itemsize,
+                               int ndim, const Py_ssize_t * shape, Py_ssize_t argument){
+if (PyBytes_Check(obj) || PyByteArray_Check(obj)){
+if (ndim != 1 || view->len % itemsize != 0 || (shape[0] >= 0 && view->len / itemsize != shape[0])){
+PyErr_Format(pyxasm_value_error, "Invalid length of buffer with index %zd (got %zd bytes, expected %zd bytes for each element).", argument, view->len, itemsize);
+return -1;
+}
+return 0;
+}
+const char * got = view->format != NULL ? view->format : "B";
+while (*got == '@' || *got == '=' || *got == '<' || *got == '>' || *got == '!') got++;
+if (strcmp(got, format) != 0 || view->itemsize != itemsize){
+PyErr_Format(pyxasm_type_error, "Invalid format of buffer with index %zd (got '%s', expected '%s').", argument, got, format);
+return -1;
+}
+if (view->ndim != ndim){
+PyErr_Format(pyxasm_value_error, "Invalid number of dimensions of array with index %zd (got %d, expected %d).", argument, view->ndim, ndim);
+return -1;
+}
+for (int i = 0; i < ndim; i++){
+if (shape[i] >= 0 && view->shape[i] != shape[i]){
+PyErr_Format(pyxasm_value_error, "Invalid size of dimension %d of array with index %zd (got %zd, expected %zd).", i, argument, view->shape[i], shape[i]);
+return -1;
+}
+}
+return 0;
+}
+
+'''
+
+
+def _literal(var:Variable) -> str:
+    '''
+    Returns C literal with value of local variable. Floating point values are written as exact hexadecimal
+    literals, infinities and NaN as HUGE_VAL and NAN from math.h (source should include it).
+    '''
+    value:object = var.get_c_value().value
+
+    if isinstance(value, bytes):
+        return str(value[0])
+
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NAN'
+
+        if math.isinf(value):
+            return 'HUGE_VAL' if value > 0 else '(-HUGE_VAL)'
+
+        return value.hex()
+
+    return repr(value)
+
+
+def _extension_source(module_name:str,
+                      all_variables:List[Variable],
+                      roles:List[List[str]],
+                      input_indexes:List[int],
+                      asm_source:str) -> str:
+    '''
+    Returns source of CPython extension module with function kernel (METH_FASTCALL).
+
+    Arguments of kernel are values of input variables. Scalars are unboxed with function for their type
+    (PyLong_AsLong, PyFloat_AsDouble etc.), arrays are taken with buffer protocol (pointer to data is passed
+    to assembly insertion). Format, size of elements and shape of buffer are checked against type of array
+    (ArgumentTypeError or ArgumentValueError is raised like in ctypes backend), read-only buffers like bytes are accepted.
+    Kernel returns tuple with values of output variables. GIL is released while assembly insertion runs.
+    '''
+    declarations:str = ''
+    unboxing:str = ''
+    release:str = ''
+    outputs:List[str] = list()
+
+    for i, (var, role) in enumerate(zip(all_variables, roles)):
+        name:str = var._name()
+        ctype:object = var._type()
+        typename:str = ctype._base_type_name
+
+        if isinstance(ctype, Array):
+            if not ctype._contiguous or role == ['s']:
+                raise ArgumentTypeError(f'Variable {repr(var)} is array with contiguous=False, extension backend supports only contiguous arrays.')
+
+            if role != ['i']:
+                raise ArgumentTypeError(f'Variable {repr(var)} is array, extension backend supports arrays only as input variables.')
+
+            argument:int = input_indexes.index(i)
+
+            shape:str = ', '.join(str(-1 if size is None else size) for size in ctype._size)
+
+            # pointer to data of buffer is passed to assembly insertion (array is input, so buffer can be read-only)
+            declarations += f'Py_buffer view_{name};\nview_{name}.obj = NULL;\n{typename} * {name} = NULL;\n' + \
+                            f'static const Py_ssize_t shape_{name}[] = {{{shape}}};\n'
+            unboxing += f'if (PyObject_GetBuffer(args[{argument}], &view_{name}, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) goto cleanup;\n' + \
+                        f'if (pyxasm_check_buffer(args[{argument}], &view_{name}, "{ctype._base_type._ctype._type_}", sizeof({typename}), ' + \
+                        f'{len(ctype._size)}, shape_{name}, {argument}) != 0) goto cleanup;\n' + \
+                        f'{name} = ({typename} *)view_{name}.buf;\n'
+            release += f'if (view_{name}.obj != NULL) PyBuffer_Release(&view_{name});\n'
+            continue
+
+        unbox, unboxed_type, box = _CONVERTERS[typename]
+
+        if 'o' in role:
+            declarations += f'{typename} value_{name} = 0;\n{typename} * {name} = &value_{name};\n'
+            outputs.append(f'{box}(value_{name})')
+            target:str = f'value_{name}'
+        else:
+            declarations += f'{typename} {name} = 0;\n'
+            target:str = name
+
+        if 'i' in role:
+            argument:int = input_indexes.index(i)
+            unboxing += f'{{\n{unboxed_type} pyxasm_value = {unbox}(args[{argument}]);\n' + \
+                        'if (PyErr_Occurred()) goto cleanup;\n'
+
+            if typename in _LIMITS:
+                unboxing += f'if ({_LIMITS[typename]}){{\n' + \
+                            f'PyErr_SetString(PyExc_OverflowError, "argument {argument} is out of range of \'{typename}\'");\n' + \
+                            'goto cleanup;\n}\n'
+
+            unboxing += f'{target} = ({typename})pyxasm_value;\n}}\n'
+        elif len(role) == 0:
+            unboxing += f'{target} = {_literal(var)};\n'
+
+    source:str = '#define PY_SSIZE_T_CLEAN\n#include <Python.h>\n#include <limits.h>\n#include <math.h>\n#include <string.h>\n\n' + \
+                 _ERROR_HELPERS + _CHAR_HELPERS + _BUFFER_HELPERS
+
+    source += 'static PyObject * pyxasm_kernel(PyObject * self, PyObject * const * args, Py_ssize_t nargs){\n' + \
+              'PyObject * result = NULL;\n' + \
+              declarations + \
+              f'if (nargs != {len(input_indexes)}){{\n' + \
+              f'PyErr_Format(PyExc_TypeError, "kernel expected {len(input_indexes)} arguments, got %zd", nargs);\n' + \
+              'goto cleanup;\n}\n' + \
+              unboxing + \
+              'Py_BEGIN_ALLOW_THREADS\n' + \
+              asm_source + '\n' + \
+              'Py_END_ALLOW_THREADS\n' + \
+              f'result = PyTuple_New({len(outputs)});\n' + \
+              'if (result == NULL) goto cleanup;\n'
+
+    for k, output in enumerate(outputs):
+        source += f'PyTuple_SET_ITEM(result, {k}, {output});\n'
+
+    source += 'cleanup:\n' + \
+              release + \
+              'return result;\n}\n\n'
+
+    source += 'static PyMethodDef pyxasm_methods[] = {\n' + \
+              '{"kernel", (PyCFunction)(void(*)(void))pyxasm_kernel, METH_FASTCALL, NULL},\n' + \
+              '{NULL, NULL, 0, NULL}\n};\n\n' + \
+              f'static struct PyModuleDef pyxasm_module = {{PyModuleDef_HEAD_INIT, "{module_name}", NULL, -1, pyxasm_methods}};\n\n' + \
+              f'PyMODINIT_FUNC PyInit_{module_name}(void){{\n' + \
+              'if (pyxasm_import_errors() != 0) return NULL;\n' + \
+              'return PyModule_Create(&pyxasm_module);\n}\n'
+
+    return source
+
+
+def _include_flags() -> tuple:
+    '''
+    Returns flags of compiler with directories of Python headers.
+    '''
+    paths:dict = sysconfig.get_paths()
+
+    return tuple(f'-I{paths[key]}' for key in ('include', 'platinclude') if key in paths)
+
+
+def _load_extension(module_name:str, path:str) -> object:
+    '''
+    Loads compiled extension module from path.
+    '''
+    loader:ExtensionFileLoader = ExtensionFileLoader(module_name, os.path.abspath(path))
+    spec:object = spec_from_file_location(module_name, os.path.abspath(path), loader=loader)
+    module:object = module_from_spec(spec)
+    loader.exec_module(module)
+
+    return module
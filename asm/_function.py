@@ -1,50 +1,791 @@
 import os
-from subprocess import run as run_command, PIPE
+import tempfile
+import threading
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter_ns
 from copy import copy
-from typing import Iterable, List, Union
+from inspect import signature, Signature, BoundArguments
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple, Union
 from collections.abc import Iterable as IterableObject
-from ctypes import cdll
+from ctypes import (cdll,
+                    byref,
+                    memmove,
+                    addressof,
+                    sizeof,
+                    c_int,
+                    c_long,
+                    c_longlong,
+                    c_ulonglong,
+                    Structure,
+                    Array as CTypesArray,
+                    _SimpleCData,
+                    POINTER as pointer)
+
+from ._errors import (ArgumentTypeError, 
+                      FunctionIsNotCompiledError, 
+                      ArgumentValueError, 
+                      VariableDoesNotExistError,
+                      LabelIsNotDefinedError,
+                      CompilationError)
+
+from ._base_intruction import InstructionInstance, Instruction, Label
+from ._stream import InstructionStream, _mnemonics
+from ._program import Program
+from ._isa import spec, InstructionSpec
+from ._estimate import Estimate, estimate, _flatten
+from ._benchmark import BenchmarkResult, _benchmark_source
+from ._bound import BoundFunction
+from ._batch import _batch_source, _column
+from ._extension import _extension_source, _include_flags, _load_extension
+from ._bundle import _checksum, _describe_variable, _restore_variable, _read_bundle
+from ._call import Routine, _routines
+from ._toolchain import Toolchain, GccToolchain, _resolve_toolchain
+from ._server import _compile_remote
+from ._metrics import FunctionMetrics, _metrics_for
+from ._variable import Variable
+from ._type import Array, TypeVar, _is_generic, _specialize_type, _c_strides
+from ._register import Register
+from ._typehints import function, SharedLibrary, CType, CArray, CValue
+
+
+# available backends of Function.compile()
+_BACKENDS:tuple = ('ctypes', 'extension')
+
+# names of clobbered registers for families of general purpose registers (esp can not be clobbered)
+_CLOBBERS:dict = {'a':  'eax',
+                  'b':  'ebx',
+                  'c':  'ecx',
+                  'd':  'edx',
+                  'si': 'esi',
+                  'di': 'edi',
+                  'bp': 'ebp'}
+
+
+# descriptors of memory files with loaded libraries. They are not closed, since dlopen
+# finds already loaded library by path and /proc/self/fd/N of closed descriptor can be reused
+_memfds:List[int] = list()
+
+
+def _load_library(library:bytes, module_name:Union[str, None]=None, in_memory:bool=False) -> SharedLibrary:
+    '''
+    Writes shared library to file with unique name, loads it and deletes file.
+    If module_name is not None, library is loaded as CPython extension module with this name.
+
+    With in_memory=True library is written to anonymous memory file (memfd_create) if it is available,
+    so nothing is written to disk. Used for unpickled functions in worker processes.
+
+    Unique name is required since library with the same path is loaded only once by dlopen.
+    '''
+    if in_memory and hasattr(os, 'memfd_create'):
+        try:
+            descriptor:int = os.memfd_create('pyxasm_library')
+        except OSError:
+            descriptor:None = None
+
+        if descriptor is not None:
+            _memfds.append(descriptor)
+            os.write(descriptor, library)
+
+            path:str = f'/proc/self/fd/{descriptor}'
+
+            if module_name is not None:
+                return _load_extension(module_name, path)
+
+            return cdll.LoadLibrary(path)
+
+    descriptor, shared_lib_filename = tempfile.mkstemp(prefix='pyxasm_', suffix='.so')
+
+    try:
+        with os.fdopen(descriptor, 'wb') as library_file:
+            library_file.write(library)
+
+        if module_name is not None:
+            return _load_extension(module_name, shared_lib_filename)
 
-from _errors import (ArgumentTypeError, 
-                     FunctionIsNotCompiledError, 
-                     ArgumentValueError, 
-                     VariableDoesNotExistError,
-                     CompilationError)
+        # load library with 1 function and get this function by main_function attribute
+        return cdll.LoadLibrary(os.path.abspath(shared_lib_filename))
+    finally:
+        if os.path.exists(shared_lib_filename):
+            os.remove(shared_lib_filename)
+
+
+def _to_python(value:object) -> object:
+    '''
+    Converts value of field of structure with outputs (or output buffer) to Python object.
+    ctypes arrays are converted to lists (recursively), since structure is reused by next call.
+    '''
+    if isinstance(value, CTypesArray):
+        return [_to_python(element) for element in value]
+
+    # ctypes objects of simple types (fields of structure are already converted)
+    if isinstance(value, _SimpleCData):
+        return value.value
+
+    return value
+
+
+def _validate_variant(stream:InstructionStream, variables:Dict[str, Variable]) -> None:
+    '''
+    Validates instructions of stream and bodies of its labels with concrete variables of variant
+    of function with type variables (variables: name -> concrete variable). Operands of type variables
+    were checked with widths of all candidate types, so variant is checked with width of its concrete type.
+    Raises ArgumentTypeError if instruction is invalid for concrete types (like mov eax, x for long long x).
+    '''
+    flat:InstructionStream = _flatten(stream)
+    instructions:Dict[str, Union[Instruction, None]] = dict()
+
+    for i in range(len(flat)):
+        args:tuple = flat._args(i)
+
+        if not any(isinstance(arg, Variable) and arg._name() in variables for arg in args):
+            continue
 
-from _base_intruction import InstructionInstance, Label
-from _variable import Variable
-from _typing import SystemProcess, function, SharedLibrary, CType
+        mnemonic:str = _mnemonics[flat._opcodes[i]]
+
+        if mnemonic not in instructions:
+            instruction_spec:Union[InstructionSpec, None] = spec(mnemonic)
+            instructions[mnemonic] = Instruction(instruction_spec) if instruction_spec is not None else None
+
+        if instructions[mnemonic] is not None:
+            instructions[mnemonic]._validate(tuple(variables.get(arg._name(), arg) if isinstance(arg, Variable) else arg \
+                                                   for arg in args))
 
 
 # TODO: write documentation for methods and class
 class Function(object):
-    def __init__(self, instructions:List[InstructionInstance]):
-
-        if not isinstance(instructions, IterableObject):
+    def __init__(self, instructions:Union[Program, InstructionStream, Iterable[InstructionInstance]]):
+
+        # InstructionStream (and stream of Program) is used directly, without copying
+        if isinstance(instructions, Program):
+            self.__instructions:InstructionStream = instructions._finish()
+        elif isinstance(instructions, InstructionStream):
+            self.__instructions:InstructionStream = instructions
+        elif not isinstance(instructions, IterableObject):
             raise ArgumentTypeError('Can not iter object with instructions.')
         else:
-            instructions:List[InstructionInstance] = list(instructions)
+            self.__instructions:InstructionStream = InstructionStream(instructions)
 
-        for i in range(len(instructions)):
-            if not isinstance(instructions[i], InstructionInstance):
-                raise ArgumentTypeError(f'Object with index {i} in list of instructions is not of type Instruction from asm.instructions.')
-
-        self.__instructions:List[InstructionInstance] = instructions
         self.__is_compiled:bool = False
 
+        # benchmark library is compiled in first call of Function.benchmark()
+        self.__benchmark_functions:Union[tuple, None] = None
+
+        # variants of batch_function: (parallel, schedule) -> function
+        self.__batch_functions:dict = dict()
+
+        # template of kernel (see kernel()), it is None for usual functions
+        self.__template:Union[function, None] = None
+
+        # signature of function with type variables (see Function.resolve()), it is None for usual functions
+        self.__dispatch:Union[tuple, None] = None
+
+        # metrics of calls (see Function.enable_metrics()), calls are not measured if it is None
+        self.__metrics:Union[FunctionMetrics, None] = None
+
+
+    def __call__(self, *args, out:Union[Iterable[object], None]=None) -> tuple:
+        '''
+        Calls compiled function. args are values of input variables (in order of input_vars in Function.compile()).
+
+        Returns tuple with values of output variables. Outputs are written to one preallocated structure,
+        which is reused by all calls, so call does not allocate ctypes objects for outputs.
+
+        out - (default:None) sequence with ctypes objects or writable buffers (bytearray, array.array etc.),
+              one for each output variable. Outputs are written to them in place and out is returned.
+
+        Example:
+        >>> f(1, 2)
+            (3, )
+        >>> result = (c_int(), )
+        >>> f(1, 2, out=result)
+            (c_int(3), )
+        '''
+        # function with type variables calls its variant for types of arguments
+        if self.__dispatch is not None:
+            return self.resolve(*args)(*args, out=out)
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not call this function since it was not compiled with Function.compile().')
+
+        metrics:Union[FunctionMetrics, None] = self.__metrics
+        start:int = perf_counter_ns() if metrics is not None else 0
+
+        try:
+            # kernel of extension module converts arguments and builds result itself
+            if self.__backend == 'extension':
+                result:tuple = self.__main(*args)
+
+                if out is None:
+                    return result
+
+                # extension backend supports only scalar outputs
+                for target, value in zip(self.__out_targets(out), result):
+                    target.value = value
+
+                return out
+
+            self.__main(*self.__prepare_arguments(args, out))
+
+            if out is not None:
+                return out
+
+            outputs:Structure = self.__outputs
+
+            if self.__has_array_outputs:
+                return tuple(_to_python(getattr(outputs, field)) for field in self.__output_fields)
+
+            return tuple(getattr(outputs, field) for field in self.__output_fields)
+        except Exception:
+            if metrics is not None:
+                metrics._record_error()
+
+            raise
+        finally:
+            if metrics is not None:
+                metrics._record(perf_counter_ns() - start)
+
+
+    def bind(self, fixed:Union[dict, None]=None) -> BoundFunction:
+        '''
+        Returns function with fixed arguments (object of BoundFunction).
+
+        fixed - dict: index of input variable (in order of input_vars in Function.compile()) or input variable -> value.
+
+        Fixed arguments are converted to ctypes values once (buffers of arrays are not copied and are kept alive
+        by bound function), each call of bound function converts only remaining arguments.
+        Bound function can be called from any thread, since outputs of each thread are written to its own objects.
+
+        Example:
+        >>> lookup = f.bind({table: array('i', range(256))})
+        >>> lookup(3)
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be bound. Bind its variant from Function.resolve().')
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not bind this function since it was not compiled with Function.compile().')
+
+        if fixed is None:
+            fixed:dict = dict()
+
+        if not isinstance(fixed, dict):
+            raise ArgumentTypeError(f'Unsuposed type of fixed argument (got {type(fixed)}, expected dict).')
+
+        names:List[str] = [self.__all_variables[i]._name() for i in self.__input_indexes]
+
+        # position of argument in call -> value
+        positions:dict = dict()
+
+        for key, value in fixed.items():
+            if isinstance(key, Variable):
+                if key._name() not in names:
+                    raise ArgumentValueError(f'Variable {repr(key)} is not input variable of function.')
+
+                position:int = names.index(key._name())
+            elif isinstance(key, int) and not isinstance(key, bool):
+                if not 0 <= key < len(names):
+                    raise ArgumentValueError(f'Invalid index of input variable (got {key}, expected index from 0 to {len(names) - 1}).')
+
+                position:int = key
+            else:
+                raise ArgumentTypeError(f'Key of fixed argument should be index of input variable or Variable (got {type(key)}).')
+
+            if position in positions:
+                raise ArgumentValueError(f'Input variable with index {position} is fixed twice.')
+
+            positions[position] = value
+
+        # kernel of extension module converts arguments itself, so fixed arguments are passed as they are
+        if self.__backend == 'extension':
+            return BoundFunction(self,
+                                 [positions.get(position) for position in range(len(names))],
+                                 [position for position in range(len(names)) if position not in positions],
+                                 [])
+
+        arguments:list = self.__call_arguments.copy()
+        copies:List[tuple] = list()
+
+        for position, value in positions.items():
+            index:int = self.__input_indexes[position]
+            c_value:Union[CValue, CArray, None] = self.__convert_argument(arguments, index, value)
+
+            if c_value is None:
+                continue
+
+            # value of variable, which is input and output, is copied to output before each call
+            if self.__fields[index] is None:
+                arguments[index] = c_value
+            else:
+                copies.append((index, c_value))
+
+        return BoundFunction(self,
+                             arguments,
+                             [index for position, index in enumerate(self.__input_indexes) if position not in positions],
+                             copies)
+
+
+    def _call_bound(self, bound:BoundFunction, args:tuple, out:Union[Iterable[object], None], targets:Union[list, None]=None) -> tuple:
+        '''
+        Calls function with arguments of bound function. Outputs are written to out or to targets
+        (objects for outputs of thread, see Function._new_outputs()). Used in BoundFunction.
+        '''
+        if len(args) != len(bound._input_indexes):
+            raise ArgumentValueError(f'Invalid number of arguments (got {len(args)}, expected {len(bound._input_indexes)}).')
+
+        if self.__backend == 'extension':
+            arguments:list = bound._arguments.copy()
+
+            for position, arg in zip(bound._input_indexes, args):
+                arguments[position] = arg
+
+            return self(*arguments, out=out)
+
+        metrics:Union[FunctionMetrics, None] = self.__metrics
+        start:int = perf_counter_ns() if metrics is not None else 0
+
+        try:
+            if out is not None:
+                self.__main(*self.__prepare_arguments(args, out, bound))
+                return out
+
+            self.__main(*self.__prepare_arguments(args, None, bound, targets))
+
+            if self.__has_array_outputs:
+                return tuple(_to_python(target) for target in targets)
+
+            return tuple([target.value for target in targets])
+        except Exception:
+            if metrics is not None:
+                metrics._record_error()
+
+            raise
+        finally:
+            if metrics is not None:
+                metrics._record(perf_counter_ns() - start)
+
 
-    # TODO: finish function call
-    def __call__(self, *args) -> tuple:
+    def _callee(self) -> Tuple[List[Variable], List[List[str]], List[int], str, Dict[str, str], str]:
+        '''
+        Returns variables, roles, indexes of input variables, assembly insertion, sources of called functions
+        and syntax of assembly insertion of compiled function. Used in asm._call.Routine.
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be called. Call its variant from Function.resolve().')
 
         if not self.__is_compiled:
             raise FunctionIsNotCompiledError('Can not call this function since it was not compiled with Function.compile().')
 
+        return self.__all_variables, self.__roles, self.__input_indexes, self.__asm_source, self.__routines, self.__toolchain.syntax
+
+
+    def __routines_source(self) -> str:
+        '''
+        Returns source of called functions and their thunks.
+        '''
+        return ''.join('\n' + source for source in self.__routines.values())
+
+
+    def _signature(self) -> Tuple[InstructionStream, List[Variable], List[Variable], List[Variable]]:
+        '''
+        Returns instructions and input, local and output variables of compiled function
+        (shape and strides of arrays are not included, they are added by Function.compile()). Used in fuse().
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be fused. Fuse its variants from Function.resolve().')
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not fuse this function since it was not compiled with Function.compile().')
+
+        if len(self.__instructions) == 0:
+            raise ArgumentValueError('Function has no instructions (function loaded from bundle can not be fused).')
+
+        return (self.__instructions,
+                [self.__all_variables[i] for i in self.__input_indexes],
+                [self.__all_variables[i] for i in range(len(self.__all_variables)) if len(self.__roles[i]) == 0],
+                [self.__all_variables[i] for i in self.__output_indexes])
+
+
+    def _new_outputs(self) -> Union[list, None]:
+        '''
+        Returns new objects for outputs (None for extension backend, since its kernel returns new tuple). Used in BoundFunction.
+        '''
+        if self.__backend == 'extension':
+            return None
+
+        return [output_type() for output_type in self.__output_types]
+
+
+    def parallel_map(self, inputs:Iterable[object], workers:Union[int, None]=None, chunk:Union[int, None]=None) -> List[tuple]:
+        '''
+        Calls compiled function for each element of inputs on pool of threads and returns list of results in order.
+
+        inputs - sequence of arguments: tuples with values of input variables (or values, if function has one input variable).
+        workers - (default:None) number of threads, os.cpu_count() by default.
+        chunk - (default:None) number of calls in one task of pool.
+
+        If all variables have scalar types, inputs are converted to columns once and each chunk is one native call
+        of Function.batch() on slices of columns, so GIL is released for whole chunk. Otherwise each element is one call
+        (native calls release GIL too) and each thread writes outputs and local arrays to its own buffers,
+        so calls do not share state.
+
+        Example:
+        >>> f.parallel_map([(1, 2), (3, 4), (5, 6)], workers=2)
+            [(3, ), (7, ), (11, )]
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be mapped. Map its variant from Function.resolve().')
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not call this function since it was not compiled with Function.compile().')
+
+        if not isinstance(inputs, IterableObject):
+            raise ArgumentTypeError('Can not iter inputs argument.')
+
+        if not isinstance(inputs, (list, tuple)):
+            inputs:list = list(inputs)
+
+        if workers is None:
+            workers:int = os.cpu_count() or 1
+        elif not isinstance(workers, int) or workers < 1:
+            raise ArgumentValueError(f'Invalid value of workers argument (got {workers}, expected int > 0).')
+
+        if chunk is None:
+            # a few chunks for each worker to balance load
+            chunk:int = max(1, -(-len(inputs) // (workers * 4)))
+        elif not isinstance(chunk, int) or chunk < 1:
+            raise ArgumentValueError(f'Invalid value of chunk argument (got {chunk}, expected int > 0).')
+
+        single_input:bool = len(self.__input_indexes) == 1
+
+        # chunks of functions with scalar variables are run in native loop of batch
+        if len(self.__input_indexes) != 0 and not any(isinstance(var._type(), Array) for var in self.__all_variables):
+            return self.__parallel_batch(inputs, workers, chunk)
+
+        thread_data:threading.local = threading.local()
+
+        def run_chunk(start:int) -> List[tuple]:
+            # buffers for outputs and arguments with local arrays of current thread
+            targets:Union[list, None] = getattr(thread_data, 'targets', None)
+
+            if targets is None:
+                targets:list = [output_type() for output_type in self.__output_types]
+                thread_data.targets = targets
+                thread_data.bound = BoundFunction(self, self.__thread_arguments(), self.__input_indexes, [])
+
+            bound:BoundFunction = thread_data.bound
+            results:List[tuple] = list()
+
+            for args in inputs[start:start + chunk]:
+                if single_input and not isinstance(args, tuple):
+                    args:tuple = (args, )
+
+                results.append(self._call_bound(bound, args, None, targets))
+
+            return results
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunks:Iterable[List[tuple]] = executor.map(run_chunk, range(0, len(inputs), chunk))
+
+            return [result for chunk_results in chunks for result in chunk_results]
+
+
+    def __thread_arguments(self) -> list:
+        '''
+        Returns template of arguments with own copies of local arrays (kernel can write to them),
+        so calls from different threads do not share buffers. Used in Function.parallel_map().
+        '''
+        arguments:list = self.__call_arguments.copy()
+
+        for i, role in enumerate(self.__roles):
+            if len(role) == 0 and isinstance(arguments[i], CTypesArray):
+                arguments[i] = type(arguments[i]).from_buffer_copy(arguments[i])
+
+        return arguments
+
+
+    def __parallel_batch(self, inputs:Union[list, tuple], workers:int, chunk:int) -> List[tuple]:
+        '''
+        Runs Function.parallel_map() with batch: inputs are converted to ctypes columns, each chunk is one call
+        of Function.batch() with slices of columns (memoryview slices are not copied).
+        '''
+        size:int = len(inputs)
+        count:int = len(self.__input_indexes)
+
+        if count == 1:
+            rows:list = [[args[0] if isinstance(args, tuple) and len(args) == 1 else args for args in inputs]]
+        else:
+            for args in inputs:
+                if not isinstance(args, tuple) or len(args) != count:
+                    raise ArgumentValueError(f'Invalid element of inputs: {args} (expected tuple with {count} values).')
+
+            rows:list = list(zip(*inputs)) if size != 0 else [()] * count
+
+        columns:list = list()
+
+        for index, values in zip(self.__input_indexes, rows):
+            ctype:CType = type(self.__all_variables[index].get_c_value())
+
+            try:
+                columns.append((ctype * size)(*values))
+            except TypeError:
+                raise ArgumentTypeError(f'Invalid type of input with index {len(columns)} (expected values for {ctype.__name__}).') from None
+
+        outputs:list = [(type(self.__all_variables[index].get_c_value()) * size)() for index in self.__output_indexes]
+
+        # batch library is compiled before threads use it
+        self.__batch_function(False, 'static')
+
+        def run_chunk(start:int) -> None:
+            end:int = min(start + chunk, size)
+
+            self.batch(*[memoryview(column)[start:end] for column in columns],
+                       out=[memoryview(output)[start:end] for output in outputs])
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # results of map are read to raise exceptions of chunks
+            list(executor.map(run_chunk, range(0, size, chunk)))
+
+        if len(outputs) == 0:
+            return [tuple() for _ in range(size)]
+
+        return list(zip(*[list(output) for output in outputs]))
+
+
+    def batch(self, *columns, parallel:bool=False, 
+                              threads:Union[int, None]=None, 
+                              schedule:str='static', 
+                              out:Union[Iterable[object], None]=None) -> tuple:
+        '''
+        Runs assembly insertion for each element of columns in one native call.
+
+        columns - one column for each input variable (in order of input_vars in Function.compile()), all columns
+                  have the same length. Buffers with the same type of elements (array.array, ctypes arrays) are not copied.
+        parallel - (default:False) if True, loop is parallelized with OpenMP (library is compiled with -fopenmp).
+        threads - (default:None) number of OpenMP threads, default number of OpenMP threads if None.
+        schedule - (default:'static') schedule of OpenMP loop: 'static', 'dynamic' or 'guided'.
+        out - (default:None) writable buffers for outputs (one for each output variable).
+
+        Returns tuple with columns of outputs (ctypes arrays or objects from out).
+        Supports only variables of scalar types. Each variant of batch library is compiled once.
+
+        Example:
+        >>> f.batch(array('i', range(10 ** 8)), array('i', range(10 ** 8)), parallel=True, threads=8)
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be run in batch. Run its variant from Function.resolve().')
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not call this function since it was not compiled with Function.compile().')
+
+        if len(columns) != len(self.__input_indexes):
+            raise ArgumentValueError(f'Invalid number of columns (got {len(columns)}, expected {len(self.__input_indexes)}).')
+
+        if len(columns) == 0:
+            raise ArgumentValueError('Function without input variables can not be called with batch.')
+
+        if threads is not None and (not isinstance(threads, int) or threads < 1):
+            raise ArgumentValueError(f'Invalid value of threads argument (got {threads}, expected int > 0).')
+
+        batch_function:function = self.__batch_function(bool(parallel), schedule)
+
+        size:int = len(columns[0])
+
+        if out is not None:
+            out:list = list(out)
+
+            if len(out) != len(self.__output_indexes):
+                raise ArgumentValueError(f'Invalid number of objects in out argument (got {len(out)}, expected {len(self.__output_indexes)}).')
+
+        args:list = [size, threads or 0]
+        outputs:list = list()
+
+        for i in range(len(self.__all_variables)):
+            ctype:CType = type(self.__all_variables[i].get_c_value())
+
+            if 'o' in self.__roles[i]:
+                if out is None:
+                    output:CArray = (ctype * size)()
+                else:
+                    output:CArray = _column(ctype, out[len(outputs)], size, writable=True)
+
+                outputs.append(output)
+                args.append(output)
+
+            if 'i' in self.__roles[i]:
+                args.append(_column(ctype, columns[self.__input_indexes.index(i)], size))
+
+            if len(self.__roles[i]) == 0:
+                args.append(self.__all_variables[i].get_c_value())
+
+        # batch is one call, which processes size elements
+        if self.__metrics is not None:
+            start:int = perf_counter_ns()
+            batch_function(*args)
+            self.__metrics._record_batch(perf_counter_ns() - start, size)
+        else:
+            batch_function(*args)
+
+        if out is not None:
+            return tuple(out)
+
+        return tuple(outputs)
+
+
+    def __batch_function(self, parallel:bool, schedule:str) -> function:
+        '''
+        Returns batch_function of library compiled from _batch_source() (each variant is compiled once).
+        '''
+        key:tuple = (parallel, schedule)
+
+        if key not in self.__batch_functions:
+            source:str = _batch_source(self.__all_variables,
+                                       self.__roles,
+                                       self.__asm_source,
+                                       parallel=parallel,
+                                       schedule=schedule) + self.__routines_source()
+
+            library:SharedLibrary = _load_library(self.__compile_library(source,
+                                                                         'pyxasm_batch_source_file.c',
+                                                                         True,
+                                                                         flags=('-fopenmp', ) if parallel else ()))
+
+            argtypes:list = [c_longlong, c_int]
+
+            for i in range(len(self.__all_variables)):
+                ctype:CType = type(self.__all_variables[i].get_c_value())
+
+                if 'o' in self.__roles[i]:
+                    argtypes.append(pointer(ctype))
+                if 'i' in self.__roles[i]:
+                    argtypes.append(pointer(ctype))
+                if len(self.__roles[i]) == 0:
+                    argtypes.append(ctype)
+
+            library.batch_function.argtypes = tuple(argtypes)
+            library.batch_function.restype = None
+
+            self.__batch_functions[key] = library.batch_function
+
+        return self.__batch_functions[key]
+
+
+    def estimate(self, profile:str='skylake', iterations:int=4) -> Estimate:
+        '''
+        Returns static estimation of cycles per iteration of instructions (function does not have to be compiled).
+
+        profile - name of microarchitecture profile ('skylake', 'zen2' or 'generic').
+        iterations - number of simulated iterations for loop-carried dependencies.
+
+        Example:
+        >>> print(f.estimate('zen2'))
+        '''
+        return estimate(self.__instructions, profile=profile, iterations=iterations)
+
+
+    @classmethod
+    def _from_template(cls, template:function,
+                            input_vars:Union[Iterable[Variable], None],
+                            local_vars:Union[Iterable[Variable], None],
+                            output_vars:Union[Iterable[Variable], None],
+                            backend:str,
+                            maxsize:int,
+                            toolchain:Union[Toolchain, str, None]=None) -> 'Function':
+        '''
+        Creates template of kernel. Used in kernel().
+        '''
+        if not callable(template):
+            raise ArgumentTypeError(f'Template of kernel should be callable (got {type(template)}).')
+
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ArgumentValueError(f'Invalid size of cache of specializations (got {maxsize}, expected int >= 1).')
+
+        if backend not in _BACKENDS:
+            raise ArgumentValueError(f'Unknown backend: {backend} (expected one of {", ".join(_BACKENDS)}).')
+
+        function:Function = cls(InstructionStream())
+
+        function.__template:function = template
+        function.__template_signature:Signature = signature(template)
+        function.__template_vars:tuple = (input_vars, local_vars, output_vars)
+        function.__template_backend:str = backend
+        function.__template_toolchain:Union[Toolchain, str, None] = toolchain
+
+        # LRU cache of compiled specializations: values of parameters -> Function
+        function.__specializations:OrderedDict = OrderedDict()
+        function.__max_specializations:int = maxsize
+        function.__specializations_lock:threading.Lock = threading.Lock()
+
+        return function
+
+
+    def specialize(self, **params) -> 'Function':
+        '''
+        Returns compiled variant of kernel with given values of parameters (see kernel()).
+
+        Template generates instructions with parameters as immediate values, variant is compiled once
+        and memoized in LRU cache keyed by values of parameters (with default values of template),
+        so repeated call with the same parameters does not build instructions and does not compile.
+
+        Example:
+        >>> shift_and_mask.specialize(shift=3, mask=0xFF)(5)
+        '''
+        if self.__template is None:
+            raise ArgumentValueError('Function is not a kernel template. Use kernel() to create template.')
+
+        try:
+            bound:BoundArguments = self.__template_signature.bind(**params)
+        except TypeError as error:
+            raise ArgumentValueError(f'Invalid parameters of kernel: {error}.') from None
+
+        bound.apply_defaults()
+        key:tuple = tuple((name, type(value), value) for name, value in bound.arguments.items())
+
+        try:
+            hash(key)
+        except TypeError:
+            raise ArgumentTypeError('Parameters of kernel should be hashable (they are used as key of cache).') from None
+
+        with self.__specializations_lock:
+            variant:Union[Function, None] = self.__specializations.get(key)
+
+            if variant is not None:
+                self.__specializations.move_to_end(key)
+                return variant
+
+            input_vars, local_vars, output_vars = self.__template_vars
+
+            variant:Function = Function(self.__template(*bound.args, **bound.kwargs))
+            variant.compile(input_vars, local_vars, output_vars, backend=self.__template_backend, toolchain=self.__template_toolchain)
+
+            # variants share metrics of template
+            variant.__metrics:Union[FunctionMetrics, None] = self.__metrics
+
+            self.__specializations[key] = variant
+
+            # remove least recently used variant
+            if len(self.__specializations) > self.__max_specializations:
+                self.__specializations.popitem(last=False)
+
+            return variant
+
 
     # TODO: finish full compiling
     def compile(self, input_vars:Union[Iterable[Variable], None]=None, 
                       local_vars:Union[Iterable[Variable], None]=None, 
                       output_vars:Union[Iterable[Variable], None]=None,
-                      delete_source:bool=True):
+                      delete_source:bool=True,
+                      backend:str='ctypes',
+                      trusted:bool=False,
+                      toolchain:Union[Toolchain, str, None]=None):
+
+        # backend of compiled function: shared library loaded with ctypes or CPython extension module
+        if backend not in _BACKENDS:
+            raise ArgumentValueError(f'Unknown backend: {backend} (expected one of {", ".join(_BACKENDS)}).')
+
+        # compiler of function: Toolchain, name of driver, 'auto' (fastest available toolchain) or None (gcc)
+        toolchain:Toolchain = _resolve_toolchain(toolchain)
 
         # convert input_vars argument to list of variables
         if input_vars is None:
@@ -130,6 +871,20 @@ class Function(object):
                 all_variables.append(current_var)
                 roles.append([])
 
+        # arrays with contiguous=False get shape and strides with their role ['s'] (they are filled in each call)
+        for current_var in list(all_variables):
+            for layout_var in current_var._layout_variables():
+                if layout_var in all_variables:
+                    raise ArgumentValueError(f'Variable {repr(layout_var)} is shape or strides of array, it can not be input, local or output variable.')
+
+                all_variables.append(layout_var)
+                roles.append(['s'])
+
+        # output arrays are fields of structure for outputs, so their size should be known
+        for current_var in output_vars:
+            if isinstance(current_var._type(), Array) and None in current_var._type()._size:
+                raise ArgumentValueError(f'Output variable {repr(current_var)} is array with unknown size.')
+
         # check have input variables default value
         for i in range(len(input_vars)):
             if input_vars[i].has_value():
@@ -138,67 +893,633 @@ class Function(object):
         # list with labels from instructions
         labels:List[Label] = list()
 
-        for i in range(len(self.__instructions)):
-            instruction:InstructionInstance = self.__instructions[i]
+        # operands of stream are unique, so each variable and label is checked once
+        for instruction_var in self.__instructions._variables():
+            if instruction_var not in all_variables:
+                raise VariableDoesNotExistError(f'Instruction has variable {repr(instruction_var)} which is not input, local or output variable.')
+
+        # labels without instructions are defined at positions in stream
+        defined_labels:List[Label] = list(self.__instructions._defined_labels())
 
-            # check are instructions' variables in all_variables
-            for instruction_var in instruction._variables():
-                if instruction_var not in all_variables:
-                    raise VariableDoesNotExistError(f'Instruction with index {i} has variable which is not input, local or output variable.')
+        for label in self.__instructions._labels():
+            if label._is_position() and label not in defined_labels:
+                raise LabelIsNotDefinedError(f'Instruction has label {repr(label)}, which is not defined in instructions.')
 
             # check are all variables from labels in all_variables
-            for label in instruction._labels():
-                for label_var in label._variables():
-                    if label_var not in all_variables:
-                        raise ArgumentTypeError(f'Instruction with index {i} has label, which has instruction which is not input, local or output variable.')
+            for label_var in label._variables():
+                if label_var not in all_variables:
+                    raise ArgumentTypeError(f'Instruction has label {repr(label)}, which has variable which is not input, local or output variable.')
+
+            # build list of labels
+            if label not in labels:
+                labels.append(label)
+
+        # variants of function with type variables are compiled at call time (see Function.resolve())
+        if any(_is_generic(var._type()) for var in all_variables):
+            self.__prepare_dispatch(input_vars, local_vars, output_vars, delete_source, backend, trusted, toolchain)
+            return
+
+        # sources of functions called with call() (they are compiled to library of this function)
+        operands:List[object] = list(self.__instructions._operands)
+
+        for label in labels:
+            if not label._is_position():
+                operands += label._body()._operands
+
+        # save signature of function for calls and variants of main_function
+        self.__setup(all_variables,
+                     roles,
+                     [all_variables.index(var) for var in input_vars],
+                     self.__build_asm_source(all_variables, roles, labels, toolchain.syntax),
+                     backend,
+                     trusted,
+                     _routines(operands, toolchain.syntax),
+                     toolchain)
+
+        if backend == 'ctypes':
+            # get source of function in C language
+            source:str = self.__build_func_source()
+            source_filename:str = 'pyxasm_source_file.c'
+            module_name:Union[str, None] = None
+            flags:tuple = ()
+        else:
+            # name of module should be unique, since module is initialized once for each name
+            module_name:str = 'pyxasm_extension_' + uuid4().hex
+
+            source:str = _extension_source(module_name,
+                                           all_variables,
+                                           roles,
+                                           self.__input_indexes,
+                                           self.__asm_source)
+            source_filename:str = 'pyxasm_extension_source_file.c'
+            flags:tuple = _include_flags()
+
+        # checksum of assembly insertion is embedded to library, it is checked in Function.load()
+        source += f'\nconst char pyxasm_checksum[] = "{self.__checksum}";\n' + self.__routines_source()
+
+        # compile source file to shared library and load function from it
+        self.__library:bytes = self.__compile_library(source, source_filename, delete_source, flags=flags)
+        self.__module_name:Union[str, None] = module_name
+        self.__bind(_load_library(self.__library, module_name))
+
+        self.__is_compiled:bool = True
+
+
+    def __prepare_dispatch(self, input_vars:List[Variable],
+                                 local_vars:List[Variable],
+                                 output_vars:List[Variable],
+                                 delete_source:bool,
+                                 backend:str,
+                                 trusted:bool,
+                                 toolchain:Toolchain) -> None:
+        '''
+        Saves signature of function with type variables. Concrete types are picked from arguments
+        of input variables, so each type variable should be used by at least one input variable.
+        '''
+        # name of type variable -> (type variable, indexes of input variables)
+        type_vars:dict = dict()
+
+        for i, var in enumerate(input_vars):
+            if _is_generic(var._type()):
+                type_var:TypeVar = var._type() if isinstance(var._type(), TypeVar) else var._type()._base_type
+                type_vars.setdefault(type_var._name, (type_var, list()))[1].append(i)
+
+        for var in local_vars + output_vars:
+            if _is_generic(var._type()):
+                type_var:TypeVar = var._type() if isinstance(var._type(), TypeVar) else var._type()._base_type
+
+                if type_var._name not in type_vars:
+                    raise ArgumentValueError(f'Type variable {type_var._name} of variable {repr(var)} is not used by input variables.')
+
+        self.__dispatch:tuple = (input_vars, local_vars, output_vars, delete_source, backend, trusted, toolchain, tuple(type_vars.values()))
+
+        # dispatch table: names of concrete types of type variables -> compiled variant
+        self.__variants:dict = dict()
+        self.__variants_lock:threading.Lock = threading.Lock()
+
+
+    def resolve(self, *args) -> 'Function':
+        '''
+        Returns compiled variant of function with type variables for given arguments.
+
+        Concrete type of each type variable is first candidate, which can hold all arguments of this type variable
+        (range of Python int, float, one-byte bytes for char, format code of buffer). Variant is compiled on first use
+        and cached in dispatch table keyed by concrete types.
+
+        Example:
+        >>> T = TypeVar('T', 'int', 'long long')
+        >>> a, b, c = Variable(T), Variable(T), Variable(T)
+        >>> f.compile([a, b], [], [c])
+        >>> f(1, 2)          # variant for int
+        >>> f(2 ** 40, 2)    # variant for long long
+        >>> f.resolve(1, 2).benchmark(1, 2)
+        '''
+        if self.__dispatch is None:
+            raise ArgumentValueError('Function has no type variables. Use TypeVar to declare type variables.')
+
+        input_vars, local_vars, output_vars, delete_source, backend, trusted, toolchain, type_vars = self.__dispatch
+
+        if len(args) != len(input_vars):
+            raise ArgumentValueError(f'Invalid number of arguments (got {len(args)}, expected {len(input_vars)}).')
+
+        binding:dict = {type_var._name: type_var._resolve([args[i] for i in indexes]) for type_var, indexes in type_vars}
+        key:tuple = tuple(binding[type_var._name]._base_type_name for type_var, _ in type_vars)
+
+        variant:Union[Function, None] = self.__variants.get(key)
+
+        if variant is not None:
+            return variant
+
+        with self.__variants_lock:
+            # variant can be compiled by other thread while waiting for lock
+            variant:Union[Function, None] = self.__variants.get(key)
+
+            if variant is None:
+                # concrete variables have the same names, so source of instructions is the same
+                def concrete(var:Variable) -> Variable:
+                    if not _is_generic(var._type()):
+                        return var
+
+                    return Variable._restore(_specialize_type(var._type(), binding), None, var._name(), var._is_trusted())
+
+                concrete_vars:List[List[Variable]] = [[concrete(var) for var in variables] \
+                                                      for variables in (input_vars, local_vars, output_vars)]
+
+                # widths of operands are checked with concrete types of variant
+                try:
+                    _validate_variant(self.__instructions,
+                                      {var._name(): var for variables in concrete_vars for var in variables})
+                except ArgumentTypeError as error:
+                    raise ArgumentTypeError('Function has no valid variant for types ' + \
+                                            f'{", ".join(f"{name}={concrete_type._base_type_name}" for name, concrete_type in binding.items())}: {error}') from None
+
+                variant:Function = Function(self.__instructions)
+                variant.compile(*concrete_vars,
+                                delete_source,
+                                backend,
+                                trusted,
+                                toolchain)
+
+                # variants share metrics of function with type variables
+                variant.__metrics:Union[FunctionMetrics, None] = self.__metrics
+
+                self.__variants[key] = variant
+
+        return variant
+
+
+    def __setup(self, all_variables:List[Variable], 
+                      roles:List[List[str]], 
+                      input_indexes:List[int], 
+                      asm_source:str,
+                      backend:str,
+                      trusted:bool,
+                      routines:Dict[str, str],
+                      toolchain:Toolchain) -> None:
+        '''
+        Saves signature of function and prepares structure for outputs. Used in Function.compile() and Function.load().
+        '''
+        self.__all_variables:List[Variable] = all_variables
+        self.__roles:List[List[str]] = roles
+        self.__backend:str = backend
+
+        # arguments of trusted function are not checked
+        self.__trusted:bool = trusted
+
+        # sources of called functions: name of thunk -> source (see asm._call)
+        self.__routines:Dict[str, str] = routines
+
+        # compiler of libraries of function (assembly insertion is in its syntax)
+        self.__toolchain:Toolchain = toolchain
+
+        # index of each input variable in all_variables
+        self.__input_indexes:List[int] = input_indexes
+
+        # source of assembly insertion is used in all variants of main_function
+        self.__asm_source:str = asm_source
+        self.__checksum:str = _checksum(asm_source)
+
+        self.__argtypes:tuple = tuple(all_variables[i]._get_type(is_pointer=('o' in roles[i])) \
+                                      for i in range(len(all_variables)))
+
+        # input arrays are passed as pointers to data of arguments (see Array._marshal())
+        # index of input array -> indexes of its shape and strides (None for contiguous arrays)
+        names:List[str] = [var._name() for var in all_variables]
+        self.__arrays:dict = {i: None for i in input_indexes if isinstance(all_variables[i]._type(), Array) and roles[i] == ['i']}
+        layouts:dict = dict()
+
+        for i, var in enumerate(all_variables):
+            if len(var._layout_variables()) != 0:
+                layouts[i] = tuple(names.index(layout_var._name()) for layout_var in var._layout_variables())
+
+                if i in self.__arrays:
+                    self.__arrays[i] = layouts[i]
+
+        # preallocated structure for outputs, which is reused by all calls
+        self.__output_indexes:List[int] = [i for i in range(len(all_variables)) if 'o' in roles[i]]
+        self.__fields:List[Union[str, None]] = [f'o{i}' if 'o' in roles[i] else None for i in range(len(all_variables))]
+        self.__output_fields:List[str] = [self.__fields[i] for i in self.__output_indexes]
+        self.__output_types:List[CType] = [type(all_variables[i].get_c_value()) for i in self.__output_indexes]
+        self.__has_array_outputs:bool = any(issubclass(output_type, CTypesArray) for output_type in self.__output_types)
+
+        outputs_type:type = type('Outputs', (Structure, ), {'_fields_': list(zip(self.__output_fields, self.__output_types))})
+        self.__outputs:Structure = outputs_type()
+
+        # template of arguments: pointers to fields of structure for outputs and values of local variables
+        # fields are viewed as objects of output types, since argtypes of outputs are pointers to them
+        self.__call_arguments:list = [byref(self.__output_view(i))                                      \
+                                      if 'o' in roles[i]                                                 \
+                                      else                                                               \
+                                      all_variables[i].get_c_value()                                     \
+                                      for i in range(len(all_variables))]
+
+        # shape and strides of arrays with fixed size (outputs and locals) are the same in all calls
+        for i, (shape_index, strides_index) in layouts.items():
+            if i not in self.__arrays:
+                shape:tuple = all_variables[i]._type()._size
+                strides:tuple = _c_strides(shape, sizeof(all_variables[i]._type()._base_type._ctype))
+
+                self.__call_arguments[shape_index] = (c_long * len(shape))(*shape)
+                self.__call_arguments[strides_index] = (c_long * len(strides))(*strides)
+
+        self.__benchmark_functions:Union[tuple, None] = None
+        self.__batch_functions:dict = dict()
+
+
+    def __bind(self, library:SharedLibrary) -> None:
+        '''
+        Gets compiled function from loaded library (main_function of shared library or kernel of extension module).
+        '''
+        if self.__backend == 'ctypes':
+            self.__main:function = library.main_function
+
+            self.__main.argtypes:List[CType] = self.__argtypes
+            self.__main.restype:Union[CType, None] = None
+        else:
+            # kernel of extension module converts arguments and returns tuple with outputs itself
+            self.__main:function = library.kernel
+
+
+    def _bundle_entry(self) -> Tuple[dict, bytes]:
+        '''
+        Returns description of compiled function for manifest of bundle and bytes of its shared library.
+        Used in build_bundle().
+        '''
+        if self.__dispatch is not None:
+            raise ArgumentValueError('Function with type variables can not be added to bundle. Add its variants from Function.resolve().')
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not add function to bundle since it was not compiled with Function.compile().')
+
+        entry:dict = {'backend':   self.__backend,
+                      'module':    self.__module_name,
+                      'symbol':    'main_function' if self.__backend == 'ctypes' else 'kernel',
+                      'checksum':  self.__checksum,
+                      'asm':       self.__asm_source,
+                      'variables': [_describe_variable(var) for var in self.__all_variables],
+                      'roles':     self.__roles,
+                      'inputs':    self.__input_indexes,
+                      'argtypes':  [argtype.__name__ for argtype in self.__argtypes],
+                      'trusted':   self.__trusted,
+                      'routines':  self.__routines,
+                      'toolchain': self.__toolchain._description()}
+
+        return entry, self.__library
+
+
+    @classmethod
+    def load(cls, bundle:str, name:str) -> 'Function':
+        '''
+        Loads compiled function from bundle built with build_bundle() (or python -m asm build). Compiler is not used.
+
+        bundle - path to directory of bundle.
+        name - name of function in bundle.
+
+        Checksums of shared library and of source of assembly insertion are checked with manifest of bundle,
+        asm.ChecksumError is raised if they are different. asm.ArgumentValueError is raised if bundle or function
+        in it does not exist or version of bundle is not supported.
+        Loaded function has no instructions, so Function.estimate() can not be used with it.
+
+        Example:
+        >>> f = Function.load('kernels.bundle', 'add')
+        >>> f(1, 2)
+        '''
+        entry, library = _read_bundle(bundle, name)
+
+        return cls._restore(InstructionStream(),
+                            [_restore_variable(description) for description in entry['variables']],
+                            [list(role) for role in entry['roles']],
+                            list(entry['inputs']),
+                            entry['asm'],
+                            entry['backend'],
+                            library,
+                            entry['module'],
+                            trusted=entry.get('trusted', False),
+                            routines=entry.get('routines', {}),
+                            toolchain=Toolchain.create(**entry['toolchain']) if 'toolchain' in entry else None)
+
+
+    @classmethod
+    def _restore(cls, instructions:InstructionStream,
+                      all_variables:List[Variable],
+                      roles:List[List[str]],
+                      input_indexes:List[int],
+                      asm_source:str,
+                      backend:str,
+                      library:bytes,
+                      module_name:Union[str, None],
+                      in_memory:bool=False,
+                      trusted:bool=False,
+                      routines:Union[Dict[str, str], None]=None,
+                      toolchain:Union[Toolchain, None]=None) -> 'Function':
+        '''
+        Creates compiled function from already compiled shared library. Used in Function.load() and by pickle.
+        '''
+        function:Function = cls(instructions)
+
+        function.__setup(all_variables, roles, input_indexes, asm_source, backend, trusted, routines or {}, toolchain or GccToolchain())
+
+        function.__library:bytes = library
+        function.__module_name:Union[str, None] = module_name
+        function.__bind(_load_library(library, module_name, in_memory=in_memory))
+
+        function.__is_compiled:bool = True
+
+        return function
+
+
+    def __reduce__(self) -> tuple:
+        '''
+        Compiled function is pickled with bytes of its shared library, so it is loaded
+        in other process (for example, in worker of multiprocessing pool) without compiler.
+        Library is loaded from memory file (or from temporary file if memfd_create is not available).
+        '''
+        if not self.__is_compiled:
+            return (Function, (self.__instructions, ))
+
+        return (Function._restore, (self.__instructions,
+                                    self.__all_variables,
+                                    self.__roles,
+                                    self.__input_indexes,
+                                    self.__asm_source,
+                                    self.__backend,
+                                    self.__library,
+                                    self.__module_name,
+                                    True,
+                                    self.__trusted,
+                                    self.__routines,
+                                    self.__toolchain))
+
+
+    def __output_view(self, index:int) -> Union[CValue, CArray]:
+        '''
+        Returns object of output type which shares memory with field of structure for outputs.
+        '''
+        field:str = self.__fields[index]
+        output_type:CType = self.__output_types[self.__output_fields.index(field)]
+
+        return output_type.from_buffer(self.__outputs, getattr(type(self.__outputs), field).offset)
+
+
+    def __prepare_arguments(self, args:tuple, 
+                                  out:Union[Iterable[object], None], 
+                                  bound:Union[BoundFunction, None]=None, 
+                                  targets:Union[list, None]=None) -> list:
+        '''
+        Converts arguments of call to ctypes values in order of all_variables.
+
+        Outputs are passed by reference to fields of preallocated structure (or to objects from out).
+        Output variable which is also input gets value of argument before call.
+        Input arrays are passed as pointers to data of arguments.
+        Arguments of bound function are converted remaining arguments and already converted fixed arguments.
+        targets are objects of output types for outputs (they are not checked like objects from out).
+        '''
+        if bound is None:
+            call_arguments, input_indexes, copies = self.__call_arguments, self.__input_indexes, ()
+        else:
+            call_arguments, input_indexes, copies = bound._arguments, bound._input_indexes, bound._copies
+
+        if len(args) != len(input_indexes):
+            raise ArgumentValueError(f'Invalid number of arguments (got {len(args)}, expected {len(input_indexes)}).')
+
+        c_args:list = call_arguments.copy()
+
+        if out is not None:
+            targets:list = self.__out_targets(out)
+
+        if targets is not None:
+            for index, target in zip(self.__output_indexes, targets):
+                c_args[index] = byref(target)
+
+        for index, c_value in copies:
+            self.__store_input(index, c_value, targets)
+
+        for arg, index in zip(args, input_indexes):
+            c_value:Union[CValue, CArray, None] = self.__convert_argument(c_args, index, arg)
+
+            if c_value is None:
+                continue
+
+            if self.__fields[index] is None:
+                c_args[index] = c_value
+            else:
+                self.__store_input(index, c_value, targets)
+
+        return c_args
+
+
+    def __convert_argument(self, c_args:list, index:int, arg:object) -> Union[CValue, CArray, None]:
+        '''
+        Converts argument of input variable with given index. Input array is written to c_args (with its shape and strides)
+        and None is returned, other arguments are returned as ctypes values.
+        '''
+        # pointer to data of array is passed without copying (if layout of data is supported by kernel)
+        if index in self.__arrays:
+            c_args[index], shape, strides = self.__all_variables[index]._type()._marshal(arg, self.__trusted or self.__all_variables[index]._is_trusted())
+
+            if self.__arrays[index] is not None:
+                shape_index, strides_index = self.__arrays[index]
+                c_args[shape_index] = (c_long * len(shape))(*shape)
+                c_args[strides_index] = (c_long * len(strides))(*strides)
+
+            return None
+
+        return self.__all_variables[index]._check_and_get_c_value(arg, self.__trusted)
+
+
+    def __store_input(self, index:int, c_value:Union[CValue, CArray], targets:Union[list, None]) -> None:
+        '''
+        Stores converted value of variable, which is input and output, as initial value of output.
+        '''
+        field:str = self.__fields[index]
+
+        if targets is None:
+            setattr(self.__outputs, field, c_value)
+        else:
+            target:Union[CValue, CArray] = targets[self.__output_fields.index(field)]
+            memmove(addressof(target), addressof(c_value), sizeof(c_value))
+
+
+    def __out_targets(self, out:Iterable[object]) -> list:
+        '''
+        Returns ctypes objects for outputs from out argument of Function.__call__().
+        Objects of output types are used directly, other objects are used as writable buffers.
+        '''
+        if not isinstance(out, IterableObject):
+            raise ArgumentTypeError('Can not iter out argument.')
+
+        out:list = list(out)
+
+        if len(out) != len(self.__output_types):
+            raise ArgumentValueError(f'Invalid number of objects in out argument (got {len(out)}, expected {len(self.__output_types)}).')
+
+        targets:list = list()
+
+        for i in range(len(out)):
+            output_type:CType = self.__output_types[i]
+
+            if isinstance(out[i], output_type):
+                targets.append(out[i])
+            else:
+                try:
+                    targets.append(output_type.from_buffer(out[i]))
+                except (TypeError, ValueError):
+                    raise ArgumentTypeError(f'Object in out with index {i} is not of type {output_type.__name__} or writable buffer of enough size.')
+
+        return targets
+
+
+    def enable_metrics(self, name:Union[str, None]=None) -> FunctionMetrics:
+        '''
+        Turns on metrics of calls of function: number of calls, processed elements (rows of Function.batch()) and errors
+        and histogram of latencies. Metrics are exported with asm.metrics (snapshot(), Prometheus text format).
+
+        name - (default:None) name of function in metrics. Functions with the same name share metrics.
+               By default name is function_ with prefix of checksum of assembly insertion (the same in all processes)
+               or name of template for kernel templates.
+
+        Variants of kernel template and of function with type variables share its metrics.
+        Returns object of FunctionMetrics.
+
+        Example:
+        >>> f.enable_metrics('decode')
+        >>> asm.metrics.snapshot()['decode']['calls']
+        '''
+        if name is None:
+            if self.__template is not None:
+                name:str = self.__template.__name__
+            elif self.__is_compiled:
+                name:str = 'function_' + self.__checksum[:12]
+            else:
+                raise ArgumentValueError('Function is not compiled, name of function in metrics is required.')
+        elif not isinstance(name, str) or len(name) == 0:
+            raise ArgumentTypeError(f'Name of function in metrics should be non-empty str (got {repr(name)}).')
+
+        self.__metrics:FunctionMetrics = _metrics_for(name)
+        self.__share_metrics()
+
+        return self.__metrics
+
+
+    def disable_metrics(self) -> None:
+        '''
+        Turns off metrics of calls of function (and of its variants). Counters stay in asm.metrics.
+        '''
+        self.__metrics:Union[FunctionMetrics, None] = None
+        self.__share_metrics()
+
+
+    def __share_metrics(self) -> None:
+        '''
+        Sets metrics of function to its compiled variants (specializations of template and variants for type variables).
+        '''
+        variants:List[Function] = list()
+
+        if self.__template is not None:
+            with self.__specializations_lock:
+                variants += self.__specializations.values()
+
+        if self.__dispatch is not None:
+            with self.__variants_lock:
+                variants += self.__variants.values()
+
+        for variant in variants:
+            variant.__metrics:Union[FunctionMetrics, None] = self.__metrics
+
+
+    def benchmark(self, *args, repeat:int=1000, warmup:int=100) -> BenchmarkResult:
+        '''
+        Measures cycles of assembly insertion with rdtsc inside native loop.
+
+        args - values of input variables (like in Function.__call__()).
+        repeat - number of measured runs.
+        warmup - number of runs before measured runs (they are not included in result).
+
+        Benchmark library (variant of main_function with loop and serialized reading
+        of time-stamp counter) is compiled in first call and reused later.
+        Cycles are reported separately from overhead of ctypes call (BenchmarkResult.call_overhead_ns).
+        Function with type variables benchmarks its variant for types of arguments (see Function.resolve()).
+        '''
+        # function with type variables benchmarks its variant for types of arguments
+        if self.__dispatch is not None:
+            return self.resolve(*args).benchmark(*args, repeat=repeat, warmup=warmup)
+
+        if not self.__is_compiled:
+            raise FunctionIsNotCompiledError('Can not benchmark this function since it was not compiled with Function.compile().')
+
+        if not isinstance(repeat, int) or repeat < 1:
+            raise ArgumentValueError(f'Invalid value of repeat argument (got {repeat}, expected int > 0).')
 
-                # build list of labels
-                if label not in labels:
-                    labels.append(label)
+        if not isinstance(warmup, int) or warmup < 0:
+            raise ArgumentValueError(f'Invalid value of warmup argument (got {warmup}, expected int >= 0).')
 
-        # get source of function in C language
-        source:str = self.__build_func_source(all_variables, 
-                                              roles, 
-                                              labels)
+        if self.__benchmark_functions is None:
+            source:str = _benchmark_source(self.__parameters(self.__all_variables, self.__roles),
+                                           self.__asm_source) + self.__routines_source()
 
-        # get number of input arguments
-        self.__input_arguments_num:int = len(input_vars)
+            library:SharedLibrary = _load_library(self.__compile_library(source, 'pyxasm_benchmark_source_file.c', True))
 
-        # define filenames for source file and shared library
-        source_filename:str = 'pyxasm_source_file.c'
-        shared_lib_filename:str = 'pyxasm_shared_library.so'
+            library.benchmark_function.argtypes = (*self.__argtypes, c_ulonglong, pointer(c_ulonglong))
+            library.benchmark_function.restype = None
+            library.overhead_function.argtypes = (c_ulonglong, pointer(c_ulonglong))
+            library.overhead_function.restype = None
+            library.empty_function.argtypes = self.__argtypes
+            library.empty_function.restype = None
 
-        # compile source file to shared library
-        self.__compile_source(source, 
-                       source_filename, 
-                       shared_lib_filename, 
-                       delete_source=delete_source)
+            self.__benchmark_functions:tuple = (library.benchmark_function,
+                                                library.overhead_function,
+                                                library.empty_function)
 
-        # load function from shared library
-        self.__main:function = self.__load_and_delete_lib(shared_lib_filename).main_function
+        benchmark_function, overhead_function, empty_function = self.__benchmark_functions
 
-        # preprocess function
-        self.__main.argtypes:List[CType] = tuple(all_variables[i]._get_type(is_pointer=('o' in roles[i])) \
-                                                 for i in range(len(all_variables)))
+        c_args:list = self.__prepare_arguments(args, None)
 
-        self.__main.restype:Union[Ctype, None] = None
+        # measure assembly insertion
+        cycles:CArray = (c_ulonglong * (warmup + repeat))()
+        benchmark_function(*c_args, warmup + repeat, cycles)
 
+        # measure rdtsc/rdtscp pair without assembly insertion
+        overhead:CArray = (c_ulonglong * repeat)()
+        overhead_function(repeat, overhead)
 
-    def __build_func_source(self, all_variables:List[Variable], 
-                                  roles:List[List[str]], 
-                                  asm_labels:List[Label]) -> str:
+        # measure ctypes call of empty function with the same arguments
+        start:int = perf_counter_ns()
+
+        for _ in range(repeat):
+            empty_function(*c_args)
+
+        call_overhead_ns:float = (perf_counter_ns() - start) / repeat
+
+        return BenchmarkResult(cycles[warmup:], min(overhead), call_overhead_ns)
+
+
+    def __build_func_source(self) -> str:
 
         # build signature of function like void main(int a1, short a2)
-        # remark: len of roles is equal to len of all_variables
-        # for output variable .definition returns string like 'type * var_name'
-        # for input and local variables .definition returns string like 'type var_name'
-        source:str = 'void main_function(' + \
-                     ', '.join([all_variables[i]._definition(with_pointer=('o' in roles[i])) \
-                                for i in range(len(all_variables))]) + \
-                     '){\n'
+        source:str = 'void main_function(' + self.__parameters(self.__all_variables, self.__roles) + '){\n'
 
         # add assembly insertion to source
-        source += self.__build_asm_source(all_variables, roles, asm_labels)
+        source += self.__asm_source
 
         # end building, function is ready
         source += '}'
@@ -206,19 +1527,32 @@ class Function(object):
         return source
 
 
+    def __parameters(self, all_variables:List[Variable], roles:List[List[str]]) -> str:
+        '''
+        Returns parameters of main_function like 'int * a1, short a2'.
+        '''
+
+        # remark: len of roles is equal to len of all_variables
+        # for output variable .definition returns string like 'type * var_name'
+        # for input and local variables .definition returns string like 'type var_name'
+        return ', '.join([all_variables[i]._definition(with_pointer=('o' in roles[i])) \
+                          for i in range(len(all_variables))])
+
+
     def __build_asm_source(self, all_variables:List[Variable], 
                                  roles:List[List[str]],
-                                 labels:List[Label]) -> str:
+                                 labels:List[Label],
+                                 syntax:str='intel') -> str:
         
         source:str = '__asm__(\n'
 
-        # add source of instructions 
-        for instruction in self.__instructions:
-            source += instruction._source() + '\n'
+        # add source of instructions in syntax of toolchain (assembly insertion without instructions still needs template string)
+        source += (self.__instructions._source(syntax) or '""') + '\n'
 
-        # add source of labels used in function
+        # add source of labels used in function (labels without instructions are defined in source of instructions)
         for label in labels:
-            source += label._source() + '\n'
+            if not label._is_position():
+                source += label._source(syntax) + '\n'
 
         # jump to definition of variables
         # this line adds : because :"=r"(var) means output variable
@@ -226,67 +1560,142 @@ class Function(object):
         source += ':'
 
         # add variables
-        # alternative of this code snippet is
-        # source += ','.join([f'[{all_variables[i]._name()}]"=r"('*' * ('o' in roles[i]) + {all_variables[i]._name()}) \
-        #                     for i in range(len(all_variables))])
-        source += ','.join([f'[{all_variables[i]._name()}]"=r"({all_variables[i]._name()})'  \
-                            if 'o' not in roles[i]                                           \
-                            else                                                             \
-                            f'[{all_variables[i]._name()}]"=r"(*{all_variables[i]._name()})' \
+        # only output variable is write-only ("=r"), other variables are read and can be changed ("+r")
+        # output variable is passed as pointer, so its register is written to *var
+        # array is passed as pointer to its first element, so its register is pointer to data ("+r"(var))
+        is_array:List[bool] = [isinstance(var._type(), Array) for var in all_variables]
+
+        source += ','.join([f'[{all_variables[i]._name()}]"{"=r" if roles[i] == ["o"] and not is_array[i] else "+r"}"' + \
+                            f'({"*" if "o" in roles[i] and not is_array[i] else ""}{all_variables[i]._name()})'       \
                             for i in range(len(all_variables))])
 
+        # registers used in instructions are clobbered (compiler does not put variables to them)
+        # data of arrays can be changed by instructions and by called functions, so memory is clobbered too
+        operands:List[object] = list(self.__instructions._operands)
+
+        for label in labels:
+            if not label._is_position():
+                operands += label._body()._operands
+
+        has_calls:bool = any(isinstance(operand, Routine) for operand in operands)
+
+        clobbers:List[str] = self.__clobbers(labels) + (['memory'] if any(is_array) or has_calls else [])
+
+        source += '\n:\n:' + ', '.join(f'"{register}"' for register in clobbers)
+
         # finish assembly insertion
         source += '\n);'
 
         return source
 
 
+    def __compile_library(self, source:str, 
+                                source_filename:str, 
+                                delete_source:bool, 
+                                flags:tuple=()) -> bytes:
+        '''
+        Compiles source to shared library and returns its bytes (file of library is deleted).
+        Source is compiled by compile server (see asm.server) if it is running, otherwise it is compiled in process.
+        '''
+        library:Union[bytes, None] = _compile_remote(source, self.__toolchain, flags)
+
+        if library is not None:
+            # source file is written only to keep it
+            if not delete_source:
+                with open(source_filename, 'w') as c_file:
+                    c_file.write(source)
+
+            return library
+
+        descriptor, shared_lib_filename = tempfile.mkstemp(prefix='pyxasm_', suffix='.so')
+        os.close(descriptor)
+
+        try:
+            self.__compile_source(source,
+                                  source_filename,
+                                  shared_lib_filename,
+                                  delete_source=delete_source,
+                                  flags=flags)
+
+            with open(shared_lib_filename, 'rb') as library_file:
+                return library_file.read()
+        finally:
+            if os.path.exists(shared_lib_filename):
+                os.remove(shared_lib_filename)
+
+
+    def __clobbers(self, labels:List[Label]) -> List[str]:
+        '''
+        Returns clobber list of assembly insertion: general purpose registers used in instructions,
+        registers implicitly written by instructions (like edx for mul) and "cc" (flags).
+
+        Register is clobbered as whole family: al clobbers eax.
+        Stack pointer can not be clobbered.
+        '''
+        registers:List[Register] = [operand for operand in self.__instructions._operands if isinstance(operand, Register)]
+        forms:set = self.__instructions._forms()
+
+        for label in labels:
+            registers.extend(label._registers())
+            forms.update(label._forms())
+
+        families:set = {register.family() for register in registers if register.is_gpr()}
+
+        # implicit registers from instruction set (they depend on number of operands, like for imul)
+        for mnemonic, operands in forms:
+            instruction_spec:Union[InstructionSpec, None] = spec(mnemonic)
+
+            if instruction_spec is not None:
+                families.update(instruction_spec.implicit(operands)[1])
+
+        return sorted(_CLOBBERS[family] for family in families if family in _CLOBBERS) + ['cc']
+
+
     def __compile_source(self, source:str, 
                                source_filename:str, 
                                shared_lib_filename:str, 
-                               delete_source:bool=True) -> None:
+                               delete_source:bool=True,
+                               flags:tuple=()) -> None:
 
         # create .c file with source builded in __build_function_source()
         with open(source_filename, 'w') as c_file:
             c_file.write(source)
 
-        # compile .c file to shared library (file with .so extension)
-        command:List[str] = ['gcc', 
-                             '-fPIC', 
-                             '-shared', 
-                             '-m32', 
-                             '-masm=intel', 
-                             '-o', 
-                             shared_lib_filename, 
-                             source_filename]
-
-        result:SystemProcess = run_command(command, 
-                                           stdout=PIPE, 
-                                           cwd=os.getcwd(), 
-                                           text=True,
-                                           shell=True)
-
-        # handle error while compiling
-        # if returncode is equal to 0, file was compiled
-        if result.returncode != 0:
-            raise CompilationError(f'Compilation with gcc was unsuccessful. Error code: {result.returncode}. See details above.')
+        # compile .c file to shared library (file with .so extension) with toolchain of function
+        # toolchain raises CompilationError if compilation was unsuccessful
+        self.__toolchain._compile(source_filename, shared_lib_filename, flags)
 
         # delete source file
         if delete_source:
             if os.path.exists(source_filename):
                 os.remove(source_filename)
 
-        
-    def __load_and_delete_lib(self, shared_lib_filename:str) -> SharedLibrary:
-        
-        # load library with 1 function and get this function by main_function attribute
-        lib:SharedLibrary = cdll.LoadLibrary(os.path.abspath(shared_lib_filename))
 
-        # delete shared library
-        #if os.path.exists(shared_lib_filename):
-            #os.remove(shared_lib_filename)
-
-        return lib
-
-        
-        
+def kernel(input_vars:Union[Iterable[Variable], None]=None,
+           local_vars:Union[Iterable[Variable], None]=None,
+           output_vars:Union[Iterable[Variable], None]=None,
+           backend:str='ctypes',
+           maxsize:int=128,
+           toolchain:Union[Toolchain, str, None]=None) -> function:
+    '''
+    Decorator of template of kernel: function, which generates instructions from parameters
+    (it can return list, generator, InstructionStream or Program). Decorator returns template
+    (object of Function), compiled variants are created with Function.specialize(**params).
+
+    input_vars, local_vars, output_vars, backend, toolchain - arguments of Function.compile() for each variant.
+    maxsize - (default:128) number of variants in LRU cache of template.
+
+    Example:
+    >>> @kernel(input_vars=[a], output_vars=[c])
+    ... def shift_and_mask(shift, mask=0xFF):
+    ...     yield mov(eax, a)
+    ...     yield shl(eax, shift)
+    ...     yield AND(eax, mask)
+    ...     yield mov(c, eax)
+    >>> shift_and_mask.specialize(shift=3)(5)
+    (40,)
+    '''
+    def decorator(template:function) -> Function:
+        return Function._from_template(template, input_vars, local_vars, output_vars, backend, maxsize, toolchain)
+
+    return decorator
@@ -0,0 +1,204 @@
+from typing import Iterable, List, Tuple, Union
+
+from ._errors import ArgumentTypeError, ArgumentValueError
+from ._base_intruction import Label
+from ._stream import InstructionStream
+from ._variable import Variable
+from ._function import Function
+from ._toolchain import Toolchain
+
+
+def _stage_variable(stages:List[tuple], key:object, kind:int, name:str) -> Tuple[int, Variable]:
+    '''
+    Returns (index of stage, variable) for key of wiring: tuple (index of stage, variable) or variable,
+    which is input (kind = 1) or output (kind = 3) of only one stage.
+    '''
+    if isinstance(key, tuple):
+        if len(key) != 2 or not isinstance(key[0], int) or not isinstance(key[1], Variable):
+            raise ArgumentTypeError(f'Invalid {name} in wiring: {key} (expected Variable or tuple (index of function, Variable)).')
+
+        stage, var = key
+
+        if not 0 <= stage < len(stages):
+            raise ArgumentValueError(f'Invalid index of function in wiring (got {stage}, expected index from 0 to {len(stages) - 1}).')
+
+        if var not in stages[stage][kind]:
+            raise ArgumentValueError(f'Variable {repr(var)} is not {name} of function with index {stage}.')
+
+        return stage, var
+
+    if not isinstance(key, Variable):
+        raise ArgumentTypeError(f'Invalid {name} in wiring: {key} (expected Variable or tuple (index of function, Variable)).')
+
+    found:List[int] = [i for i in range(len(stages)) if key in stages[i][kind]]
+
+    if len(found) != 1:
+        raise ArgumentValueError(f'Variable {repr(key)} is {name} of {len(found)} functions, use tuple (index of function, Variable) in wiring.')
+
+    return found[0], key
+
+
+def _wiring(stages:List[tuple], wiring:Union[dict, None]) -> dict:
+    '''
+    Returns wiring as dict: (index of stage, name of input variable) -> (index of stage, name of output variable).
+    Without wiring outputs of each function are connected to first inputs of next function.
+    '''
+    connections:dict = dict()
+
+    if wiring is None:
+        for stage in range(1, len(stages)):
+            for input_var, output_var in zip(stages[stage][1], stages[stage - 1][3]):
+                connections[(stage, input_var._name())] = (stage - 1, output_var._name())
+
+        return connections
+
+    if not isinstance(wiring, dict):
+        raise ArgumentTypeError(f'Unsuposed type of wiring argument (got {type(wiring)}, expected dict).')
+
+    for key, value in wiring.items():
+        input_stage, input_var = _stage_variable(stages, key, 1, 'input')
+        output_stage, output_var = _stage_variable(stages, value, 3, 'output')
+
+        if output_stage >= input_stage:
+            raise ArgumentValueError(f'Output of function with index {output_stage} can be connected only to inputs of next functions (got function with index {input_stage}).')
+
+        if str(input_var._type()) != str(output_var._type()):
+            raise ArgumentTypeError(f'Can not connect output {repr(output_var)} of type {output_var._type()} to input {repr(input_var)} of type {input_var._type()}.')
+
+        connections[(input_stage, input_var._name())] = (output_stage, output_var._name())
+
+    return connections
+
+
+def _append_stage(result:InstructionStream, instructions:InstructionStream, variables:dict) -> None:
+    '''
+    Appends instructions of function to fused instructions. Variables are renamed with dict variables
+    (name of variable -> new variable). Labels are replaced with new labels defined at positions: instructions
+    of labels are placed after instructions of function (like in Function.compile()), so the next function
+    starts where assembly insertion of this function ends.
+    '''
+    # name of label -> new label without instructions, instructions of labels in order of first use
+    labels:dict = dict()
+    bodies:List[tuple] = list()
+
+    def rename(operand:object) -> object:
+        if isinstance(operand, Variable):
+            return variables.get(operand._name(), operand)
+
+        if isinstance(operand, Label):
+            label:Union[Label, None] = labels.get(repr(operand))
+
+            if label is None:
+                label:Label = Label()
+                labels[repr(operand)] = label
+
+                if not operand._is_position():
+                    bodies.append((label, operand._body()))
+
+            return label
+
+        return operand
+
+    result._extend_mapped(instructions, rename)
+
+    # instructions of labels can use other labels, so bodies are appended while they are found
+    i:int = 0
+
+    while i < len(bodies):
+        label, body = bodies[i]
+
+        result.define_label(label)
+        result._extend_mapped(body, rename)
+
+        i += 1
+
+
+def fuse(*functions:Function, wiring:Union[dict, None]=None, backend:str='ctypes', toolchain:Union[Toolchain, str, None]=None) -> Function:
+    '''
+    Fuses compiled functions into one function with one assembly insertion (one native call).
+
+    functions - compiled functions (stages of pipeline) in order of execution.
+    wiring - (default:None) dict: input of function -> output of previous function. Keys and values are
+             variables (if variable is input or output of only one function) or tuples (index of function, variable).
+             If wiring is None, outputs of each function are connected to first inputs of the next function.
+    backend - backend of fused function (see Function.compile()).
+    toolchain - (default:None) toolchain of fused function (see Function.compile()).
+
+    Variables and labels of each function are renamed, so functions can share variables and labels.
+    Connected outputs are local variables of fused function, so they stay in registers between stages.
+    Inputs of fused function are not connected inputs (in order of functions), outputs are not connected outputs.
+
+    Example:
+    >>> decode_mask = fuse(decode, mask, wiring={(1, x): (0, y)})
+    >>> decode_mask(5)
+    >>> decode_mask.batch(array('i', range(10 ** 6)))
+    '''
+    if len(functions) == 0:
+        raise ArgumentValueError('fuse() requires at least one function.')
+
+    for i, function in enumerate(functions):
+        if not isinstance(function, Function):
+            raise ArgumentTypeError(f'Object with index {i} is not of type Function (got {type(function)}).')
+
+    # (instructions, input variables, local variables, output variables) of each stage
+    stages:List[tuple] = [function._signature() for function in functions]
+    connections:dict = _wiring(stages, wiring)
+
+    # connected outputs: (index of stage, name of variable)
+    consumed:set = set(connections.values())
+
+    # renamed variables of each stage: name of variable -> new variable
+    renamed:List[dict] = list()
+
+    input_vars:List[Variable] = list()
+    local_vars:List[Variable] = list()
+    output_vars:List[Variable] = list()
+
+    instructions:InstructionStream = InstructionStream()
+
+    for stage, (stage_instructions, stage_inputs, stage_locals, stage_outputs) in enumerate(stages):
+        variables:dict = dict()
+
+        for var in stage_inputs + stage_locals + stage_outputs:
+            if var._name() in variables:
+                continue
+
+            # connected input is output of previous stage
+            if (stage, var._name()) in connections:
+                source_stage, source_name = connections[(stage, var._name())]
+                new_var:Variable = renamed[source_stage][source_name]
+            else:
+                new_var:Variable = var._renamed(f'{var._name()}_{stage}')
+
+            variables[var._name()] = new_var
+
+            # shape and strides of array are renamed with array
+            for layout_var, new_layout_var in zip(var._layout_variables(), new_var._layout_variables()):
+                variables[layout_var._name()] = new_layout_var
+
+        for var in stage_inputs:
+            if (stage, var._name()) not in connections:
+                input_vars.append(variables[var._name()])
+
+        for var in stage_locals:
+            local_vars.append(variables[var._name()])
+
+        for var in stage_outputs:
+            # connected output is local variable of fused function (it is in register between stages)
+            if (stage, var._name()) in consumed:
+                if variables[var._name()] not in local_vars and variables[var._name()] not in input_vars:
+                    local_vars.append(variables[var._name()])
+            elif variables[var._name()] not in output_vars:
+                output_vars.append(variables[var._name()])
+
+        renamed.append(variables)
+
+        _append_stage(instructions, stage_instructions, variables)
+
+    # connected output, which is output of fused function too, is not local variable
+    local_vars:List[Variable] = [var for var in local_vars if var not in output_vars]
+
+    fused:Function = Function(instructions)
+    fused.compile(input_vars, local_vars, output_vars, backend=backend, toolchain=toolchain)
+
+    return fused
@@ -0,0 +1,50 @@
+'''
+Instructions for asm._function.Function, generated from instruction set asm._isa.
+
+Instructions are created on first access, so import of this module does not create objects
+for hundreds of instructions. Names are case insensitive: mnemonics which are keywords
+of Python are available in upper case (AND, OR, NOT).
+
+call(function, *operands) calls other compiled function (see asm._call.CallInstruction).
+
+Example:
+    from ._instructions import mov, add, AND
+
+    f = Function([mov(eax, a), add(eax, b), AND(eax, 255), mov(c, eax)])
+'''
+from keyword import iskeyword
+from typing import List
+
+from ._isa import spec, available_instructions, InstructionSpec
+from ._base_intruction import Instruction
+
+# call of compiled function is expanded to several instructions (see asm._call)
+from ._call import call
+
+
+def _public_name(mnemonic:str) -> str:
+    '''
+    Returns name of instruction in this module (keywords of Python are in upper case).
+    '''
+    return mnemonic.upper() if iskeyword(mnemonic) else mnemonic
+
+
+__all__:List[str] = [_public_name(mnemonic) for mnemonic in available_instructions()]
+
+
+def __getattr__(name:str) -> Instruction:
+    instruction_spec:InstructionSpec = spec(name) if not name.startswith('__') else None
+
+    if instruction_spec is None:
+        raise AttributeError(f'module {__name__} has no instruction {name}')
+
+    instruction:Instruction = Instruction(instruction_spec)
+
+    # next access does not call __getattr__
+    globals()[name] = instruction
+
+    return instruction
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
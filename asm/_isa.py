@@ -0,0 +1,278 @@
+from enum import IntFlag
+from typing import Dict, List, Tuple, Union
+
+
+# kinds of operands: 'r' - register, 'm' - memory (variable), 'i' - immediate value (number), 'l' - label
+# widths of operands are widths of destination (first operand) in bits
+
+# groups of widths
+_B_W_D:tuple = (8, 16, 32)
+_W_D:tuple = (16, 32)
+_D:tuple = (32, )
+
+# condition codes of jcc, setcc and cmovcc
+_CONDITIONS:tuple = ('o', 'no', 'b', 'c', 'nae', 'ae', 'nb', 'nc', 'e', 'z', 'ne', 'nz', 'be', 'na', 'a', 'nbe',
+                     's', 'ns', 'p', 'pe', 'np', 'po', 'l', 'nge', 'ge', 'nl', 'le', 'ng', 'g', 'nle')
+
+# instruction set: mnemonic -> (kinds of operands, number of required operands, access to operands,
+#                                widths, implicit reads, implicit writes, access to flags, latency class)
+# access is 'r' (read), 'w' (write) or 'rw'; implicit registers are families from asm._register
+# latency class is key of profiles of microarchitectures in asm._estimate
+_ISA:Dict[str, tuple] = {
+    # data transfer
+    'mov':     (('rm', 'rmi'), 2, ('w', 'r'),   _B_W_D, (),              (),                   '',   'mov'),
+    'movzx':   (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   '',   'mov'),
+    'movsx':   (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   '',   'mov'),
+    'lea':     (('r', 'm'),    2, ('w', 'r'),   _W_D,   (),              (),                   '',   'alu'),
+    'xchg':    (('rm', 'rm'),  2, ('rw', 'rw'), _B_W_D, (),              (),                   '',   'xchg'),
+    'xadd':    (('rm', 'r'),   2, ('rw', 'rw'), _B_W_D, (),              (),                   'w',  'xchg'),
+    'cmpxchg': (('rm', 'r'),   2, ('rw', 'r'),  _B_W_D, ('a', ),        ('a', ),              'w',  'xchg'),
+    'bswap':   (('r', ),       1, ('rw', ),     _D,     (),              (),                   '',   'alu'),
+    'push':    (('rmi', ),     1, ('r', ),      _W_D,   ('sp', ),       ('sp', ),             '',   'mov'),
+    'pop':     (('rm', ),      1, ('w', ),      _W_D,   ('sp', ),       ('sp', ),             '',   'mov'),
+
+    # arithmetic
+    'add':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'alu'),
+    'adc':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'rw', 'alu'),
+    'sub':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'alu'),
+    'sbb':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'rw', 'alu'),
+    'cmp':     (('rm', 'rmi'), 2, ('r', 'r'),   _B_W_D, (),              (),                   'w',  'alu'),
+    'inc':     (('rm', ),      1, ('rw', ),     _B_W_D, (),              (),                   'w',  'alu'),
+    'dec':     (('rm', ),      1, ('rw', ),     _B_W_D, (),              (),                   'w',  'alu'),
+    'neg':     (('rm', ),      1, ('rw', ),     _B_W_D, (),              (),                   'w',  'alu'),
+    'mul':     (('rm', ),      1, ('r', ),      _B_W_D, ('a', ),        ('a', 'd'),           'w',  'mul'),
+    'imul':    (('rm', 'rmi'), 1, ('rw', 'r'),  _B_W_D, ('a', ),        ('a', 'd'),           'w',  'mul'),
+    'div':     (('rm', ),      1, ('r', ),      _B_W_D, ('a', 'd'),     ('a', 'd'),           'w',  'div'),
+    'idiv':    (('rm', ),      1, ('r', ),      _B_W_D, ('a', 'd'),     ('a', 'd'),           'w',  'div'),
+
+    # conversions
+    'cbw':     ((),            0, (),           (),     ('a', ),        ('a', ),              '',   'convert'),
+    'cwde':    ((),            0, (),           (),     ('a', ),        ('a', ),              '',   'convert'),
+    'cwd':     ((),            0, (),           (),     ('a', ),        ('d', ),              '',   'convert'),
+    'cdq':     ((),            0, (),           (),     ('a', ),        ('d', ),              '',   'convert'),
+
+    # logic
+    'and':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'alu'),
+    'or':      (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'alu'),
+    'xor':     (('rm', 'rmi'), 2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'alu'),
+    'not':     (('rm', ),      1, ('rw', ),     _B_W_D, (),              (),                   '',   'alu'),
+    'test':    (('rm', 'ri'),  2, ('r', 'r'),   _B_W_D, (),              (),                   'w',  'alu'),
+
+    # shifts and rotations (count is cl or immediate value)
+    'shl':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'shr':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'sal':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'sar':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'rol':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'ror':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'w',  'shift'),
+    'rcl':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'rw', 'shift'),
+    'rcr':     (('rm', 'ri'),  2, ('rw', 'r'),  _B_W_D, (),              (),                   'rw', 'shift'),
+
+    # bit operations
+    'bt':      (('rm', 'ri'),  2, ('r', 'r'),   _W_D,   (),              (),                   'w',  'bittest'),
+    'btc':     (('rm', 'ri'),  2, ('rw', 'r'),  _W_D,   (),              (),                   'w',  'bittest'),
+    'btr':     (('rm', 'ri'),  2, ('rw', 'r'),  _W_D,   (),              (),                   'w',  'bittest'),
+    'bts':     (('rm', 'ri'),  2, ('rw', 'r'),  _W_D,   (),              (),                   'w',  'bittest'),
+    'bsf':     (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   'w',  'bitscan'),
+    'bsr':     (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   'w',  'bitscan'),
+    'popcnt':  (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   'w',  'bitscan'),
+    'lzcnt':   (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   'w',  'bitscan'),
+    'tzcnt':   (('r', 'rm'),   2, ('w', 'r'),   _W_D,   (),              (),                   'w',  'bitscan'),
+
+    # control transfer (jcc are added below)
+    'jmp':     (('lrm', ),     1, ('r', ),      _D,     (),              (),                   '',   'branch'),
+    'call':    (('l', ),       1, ('r', ),      (),     ('sp', ),       ('sp', ),             'w',  'branch'),
+    'loop':    (('l', ),       1, ('r', ),      (),     ('c', ),        ('c', ),              '',   'branch'),
+    'jecxz':   (('l', ),       1, ('r', ),      (),     ('c', ),        (),                   '',   'branch'),
+
+    # flags
+    'clc':     ((),            0, (),           (),     (),              (),                   'w',  'alu'),
+    'stc':     ((),            0, (),           (),     (),              (),                   'w',  'alu'),
+    'cmc':     ((),            0, (),           (),     (),              (),                   'rw', 'alu'),
+    'cld':     ((),            0, (),           (),     (),              (),                   'w',  'alu'),
+    'std':     ((),            0, (),           (),     (),              (),                   'w',  'alu'),
+    'lahf':    ((),            0, (),           (),     (),              ('a', ),              'r',  'alu'),
+    'sahf':    ((),            0, (),           (),     ('a', ),        (),                   'w',  'alu'),
+
+    # miscellaneous
+    'nop':     ((),            0, (),           (),     (),              (),                   '',   'nop'),
+    'pause':   ((),            0, (),           (),     (),              (),                   '',   'nop'),
+    'cpuid':   ((),            0, (),           (),     ('a', 'c'),     ('a', 'b', 'c', 'd'), '',   'serialize'),
+    'rdtsc':   ((),            0, (),           (),     (),              ('a', 'd'),           '',   'serialize'),
+    'lfence':  ((),            0, (),           (),     (),              (),                   '',   'serialize'),
+    'sfence':  ((),            0, (),           (),     (),              (),                   '',   'serialize'),
+    'mfence':  ((),            0, (),           (),     (),              (),                   '',   'serialize'),
+}
+
+# conditional instructions: one entry for each condition code
+for _condition in _CONDITIONS:
+    _ISA['j' + _condition] = (('l', ), 1, ('r', ), (), (), (), 'r', 'branch')
+    _ISA['set' + _condition] = (('rm', ), 1, ('w', ), (8, ), (), (), 'r', 'alu')
+    _ISA['cmov' + _condition] = (('r', 'rm'), 2, ('rw', 'r'), _W_D, (), (), 'r', 'alu')
+
+del _condition
+
+
+class OperandKind(IntFlag):
+    '''
+    This class representes class of operand: kind of operand and its possible widths.
+
+    Each operand is classified once (asm._base_intruction._classify) to combination of one kind
+    and widths: register eax is REGISTER | W32, number 1 is IMMEDIATE | W8 | W16 | W32 | W64
+    (number fits to operand of each width). Instructions have masks with allowed kinds and widths
+    for each position, so operand is valid if (class & mask) has kind bit and width bit.
+    '''
+    REGISTER = 1
+    MEMORY = 2
+    IMMEDIATE = 4
+    LABEL = 8
+
+    W8 = 16
+    W16 = 32
+    W32 = 64
+    W64 = 128
+
+    KINDS = REGISTER | MEMORY | IMMEDIATE | LABEL
+    WIDTHS = W8 | W16 | W32 | W64
+
+
+# masks are stored as int, since operations with int are faster than operations with IntFlag
+
+# kinds of operands in _ISA -> bits of OperandKind
+_KIND_BITS:Dict[str, int] = {'r': int(OperandKind.REGISTER),
+                             'm': int(OperandKind.MEMORY),
+                             'i': int(OperandKind.IMMEDIATE),
+                             'l': int(OperandKind.LABEL)}
+
+# widths in bits -> bits of OperandKind
+_WIDTH_BITS:Dict[int, int] = {8:  int(OperandKind.W8),
+                              16: int(OperandKind.W16),
+                              32: int(OperandKind.W32),
+                              64: int(OperandKind.W64)}
+
+# widths of second operand for instructions with operands of different widths
+# (other instructions with two operands require operands of the same width, like mov eax, ebx)
+_SOURCE_WIDTHS:Dict[str, tuple] = {'movzx': (8, 16),
+                                   'movsx': (8, 16),
+                                   'lea':   (8, 16, 32, 64),
+                                   'shl':   (8, ),
+                                   'shr':   (8, ),
+                                   'sal':   (8, ),
+                                   'sar':   (8, ),
+                                   'rol':   (8, ),
+                                   'ror':   (8, ),
+                                   'rcl':   (8, ),
+                                   'rcr':   (8, )}
+
+
+def _width_mask(widths:tuple) -> int:
+    '''
+    Returns bits of widths (empty tuple means any width).
+    '''
+    if len(widths) == 0:
+        return int(OperandKind.WIDTHS)
+
+    mask:int = 0
+
+    for width in widths:
+        mask |= _WIDTH_BITS[width]
+
+    return mask
+
+
+# implicit registers of forms with other number of operands: mnemonic -> {number of operands: (implicit reads, implicit writes)}
+# implicit registers in _ISA are registers of form with minimal number of operands
+# (one-operand imul multiplies eax and writes edx:eax, two-operand imul writes only its destination)
+_IMPLICIT_FORMS:Dict[str, Dict[int, tuple]] = {'imul': {2: ((), ())}}
+
+
+class InstructionSpec(object):
+    '''
+    This class representes description of instruction from instruction set (asm._isa._ISA).
+
+    Fields defined here:
+        mnemonic:str - name of instruction like 'add'.
+        operands:tuple - kinds of operands like ('rm', 'rmi'): r - register, m - variable, i - number, l - label.
+        min_operands:int - number of required operands (imul has one or two operands).
+        access:tuple - access to operands: 'r', 'w' or 'rw'.
+        widths:tuple - supported widths of destination in bits.
+        implicit_reads:tuple, implicit_writes:tuple - families of implicitly used registers (like ('a', 'd') for div)
+                                                      of form with minimal number of operands (see implicit()).
+        implicit_forms:dict - implicit registers of other forms: number of operands -> (implicit reads, implicit writes).
+        flags:str - access to flags: '', 'r', 'w' or 'rw'.
+        latency_class:str - class of instruction for asm._estimate.
+        masks:tuple - allowed kinds and widths (bits of OperandKind) for each operand.
+        same_width:bool - True if operands should have the same width (like mov eax, ebx).
+    '''
+
+    __slots__ = ('mnemonic', 'operands', 'min_operands', 'access', 'widths',
+                 'implicit_reads', 'implicit_writes', 'implicit_forms', 'flags', 'latency_class', 'masks', 'same_width')
+
+
+    def __init__(self, mnemonic:str, operands:tuple, min_operands:int, access:tuple, widths:tuple,
+                       implicit_reads:tuple, implicit_writes:tuple, flags:str, latency_class:str):
+
+        self.mnemonic:str = mnemonic
+        self.operands:tuple = operands
+        self.min_operands:int = min_operands
+        self.access:tuple = access
+        self.widths:tuple = widths
+        self.implicit_reads:tuple = implicit_reads
+        self.implicit_writes:tuple = implicit_writes
+        self.implicit_forms:Dict[int, tuple] = _IMPLICIT_FORMS.get(mnemonic, {})
+        self.flags:str = flags
+        self.latency_class:str = latency_class
+
+        # masks are precomputed once, so validation of arguments is only bitwise operations
+        masks:List[int] = list()
+
+        for i, kinds in enumerate(operands):
+            kind_mask:int = 0
+
+            for kind in kinds:
+                kind_mask |= _KIND_BITS[kind]
+
+            if i == 0:
+                masks.append(kind_mask | _width_mask(widths))
+            else:
+                masks.append(kind_mask | _width_mask(_SOURCE_WIDTHS.get(mnemonic, widths)))
+
+        self.masks:tuple = tuple(masks)
+        self.same_width:bool = len(operands) == 2 and mnemonic not in _SOURCE_WIDTHS
+
+
+    def implicit(self, operands:int) -> Tuple[tuple, tuple]:
+        '''
+        Returns implicit reads and implicit writes of form with given number of operands.
+        '''
+        return self.implicit_forms.get(operands, (self.implicit_reads, self.implicit_writes))
+
+
+    def __repr__(self) -> str:
+        return f'InstructionSpec(mnemonic=\'{self.mnemonic}\', operands={self.operands})'
+
+
+# specs are created on first request
+_specs:Dict[str, InstructionSpec] = dict()
+
+
+def spec(mnemonic:str) -> Union[InstructionSpec, None]:
+    '''
+    Returns description of instruction or None if instruction is not in instruction set.
+    Mnemonic is case insensitive.
+    '''
+    mnemonic:str = mnemonic.lower()
+    instruction_spec:Union[InstructionSpec, None] = _specs.get(mnemonic)
+
+    if instruction_spec is None and mnemonic in _ISA:
+        instruction_spec = InstructionSpec(mnemonic, *_ISA[mnemonic])
+        _specs[mnemonic] = instruction_spec
+
+    return instruction_spec
+
+
+def available_instructions() -> List[str]:
+    '''
+    Returns sorted list with mnemonics of instruction set.
+    '''
+    return sorted(_ISA)
@@ -0,0 +1,134 @@
+import threading
+from typing import Dict, List, Union
+
+
+# number of buckets of histogram of latencies: bucket i counts calls with latency < 2 ** i ns
+# (and >= 2 ** (i - 1) ns), the last bucket counts all longer calls
+_BUCKETS:int = 40
+
+
+class FunctionMetrics(object):
+    '''
+    This class representes metrics of calls of compiled function (see Function.enable_metrics()):
+    number of calls, number of processed elements (rows of Function.batch(), one for other calls),
+    number of errors and histogram of latencies measured with perf_counter_ns with log2 buckets.
+
+    Recording of call updates only sum of latencies and one bucket (number of calls is sum of buckets),
+    so it is cheap enough to leave metrics on. Counters are updated without locks, so concurrent calls
+    from many threads can rarely lose an update.
+
+    Attributes:
+        name:str - name of function in metrics.
+        errors:int - number of calls which raised exception.
+        total_ns:int - sum of latencies of calls in nanoseconds.
+        buckets:List[int] - histogram of latencies: buckets[i] is number of calls with latency
+                            from 2 ** (i - 1) to 2 ** i ns.
+        calls:int - (property) number of calls (including calls with errors).
+        elements:int - (property) number of processed elements.
+    '''
+
+    __slots__ = ('name', 'errors', 'total_ns', 'buckets', '__batch_elements')
+
+
+    def __init__(self, name:str):
+        self.name:str = name
+
+        self.errors:int = 0
+        self.total_ns:int = 0
+        self.buckets:List[int] = [0] * _BUCKETS
+
+        # elements of batches except one element of each batch (it is counted as call)
+        self.__batch_elements:int = 0
+
+
+    def __repr__(self) -> str:
+        return f"FunctionMetrics(name='{self.name}', calls={self.calls}, elements={self.elements}, errors={self.errors})"
+
+
+    @property
+    def calls(self) -> int:
+        return sum(self.buckets)
+
+
+    @property
+    def elements(self) -> int:
+        return self.calls + self.__batch_elements
+
+
+    def _record(self, elapsed_ns:int) -> None:
+        '''
+        Records one call with its latency.
+        '''
+        self.total_ns += elapsed_ns
+
+        # number of bits of latency is index of log2 bucket
+        bucket:int = elapsed_ns.bit_length()
+        self.buckets[bucket if bucket < _BUCKETS else _BUCKETS - 1] += 1
+
+
+    def _record_batch(self, elapsed_ns:int, elements:int) -> None:
+        '''
+        Records one call of Function.batch(), which processed given number of elements.
+        '''
+        self._record(elapsed_ns)
+
+        self.__batch_elements += elements - 1
+
+
+    def _record_error(self) -> None:
+        '''
+        Records call which raised exception (its latency is recorded with FunctionMetrics._record()).
+        '''
+        self.errors += 1
+
+
+    def _snapshot(self) -> dict:
+        '''
+        Returns copy of counters: dict with calls, elements, errors, total_ns and buckets
+        (list of (upper bound of bucket in ns, number of calls), upper bound of the last bucket is None).
+        '''
+        buckets:List[int] = list(self.buckets)
+        calls:int = sum(buckets)
+
+        return {'calls':    calls,
+                'elements': calls + self.__batch_elements,
+                'errors':   self.errors,
+                'total_ns': self.total_ns,
+                'buckets':  [(2 ** i if i != _BUCKETS - 1 else None, count) for i, count in enumerate(buckets)]}
+
+
+# metrics of all instrumented functions: name -> metrics
+_registry:Dict[str, FunctionMetrics] = dict()
+_registry_lock:threading.Lock = threading.Lock()
+
+
+def _metrics_for(name:str) -> FunctionMetrics:
+    '''
+    Returns metrics with given name, functions with the same name share metrics.
+    '''
+    with _registry_lock:
+        metrics:Union[FunctionMetrics, None] = _registry.get(name)
+
+        if metrics is None:
+            metrics:FunctionMetrics = FunctionMetrics(name)
+            _registry[name] = metrics
+
+        return metrics
+
+
+def _snapshot() -> Dict[str, dict]:
+    '''
+    Returns counters of all instrumented functions: name -> dict from FunctionMetrics._snapshot().
+    '''
+    with _registry_lock:
+        metrics:List[FunctionMetrics] = list(_registry.values())
+
+    return {function_metrics.name: function_metrics._snapshot() for function_metrics in metrics}
+
+
+def _reset() -> None:
+    '''
+    Removes metrics of all functions from registry (functions keep recording to their metrics objects).
+    '''
+    with _registry_lock:
+        _registry.clear()
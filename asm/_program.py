@@ -0,0 +1,196 @@
+from typing import Dict, Iterable, List, Union
+
+from ._errors import ArgumentTypeError, ArgumentValueError, LabelIsNotDefinedError
+from ._stream import InstructionStream
+from ._base_intruction import Instruction, InstructionInstance, Label
+from ._isa import spec
+from . import _instructions
+
+
+class ProgramLabel(Label):
+    '''
+    This class representes label of Program. It is created with Program.label().
+
+    Label can be used in instructions before its definition (forward reference).
+    It is defined at current position of program with Program.place(label) or with
+    'with' statement, which defines label at beginning of block.
+    '''
+
+    __slots__ = ('__program', )
+
+
+    def __init__(self, program:'Program'):
+        super().__init__()
+
+        self.__program:Program = program
+
+
+    def __enter__(self) -> 'ProgramLabel':
+        self.__program.place(self)
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+
+def _emitter(instruction:Instruction) -> object:
+    '''
+    Returns method of Program which validates arguments of instruction and appends it to stream
+    (InstructionInstance is not created).
+    '''
+    name:str = instruction._name
+    validate:object = instruction._validate
+
+    def emit(self, *args) -> None:
+        validate(args)
+        self._stream.append(name, args)
+
+    emit.__name__ = name
+    emit.__doc__ = f'Appends instruction {name} to program.'
+
+    return emit
+
+
+def _stream_emitter(instruction:object) -> object:
+    '''
+    Returns method of Program for instruction, which is expanded to stream of instructions (like call).
+    '''
+    name:str = instruction._name
+
+    def emit(self, *args) -> None:
+        self._stream.extend(instruction(*args))
+
+    emit.__name__ = name
+    emit.__doc__ = f'Appends instruction {name} to program.'
+
+    return emit
+
+
+# methods of Program for instructions: name of instruction -> function
+# (they are created on first access like instructions of asm._instructions, class of Program is not changed)
+_emitters:Dict[str, object] = dict()
+
+
+class Program(object):
+    '''
+    This class representes builder of program: instructions are appended to compact InstructionStream
+    as they are produced, so list of instructions is not built.
+
+    Instructions from asm._isa are methods of program: p.mov(eax, 1) appends "mov eax, 1;".
+    Arguments are validated like in asm._instructions.
+
+    label(self) -> ProgramLabel:
+        Returns new label. Label is defined at current position with 'with' statement or with place().
+        Labels can be used before definition, all used labels are checked at the end of program.
+
+    place(self, label:ProgramLabel):
+        Defines label at current position.
+
+    extend(self, instructions):
+        Appends instructions from iterable (generators are consumed lazily) or from InstructionStream.
+
+    Example:
+        with Program() as p:
+            done = p.label()
+
+            p.mov(ecx, n)
+            p.xor(eax, eax)
+
+            with p.label() as loop:
+                p.add(eax, ecx)
+                p.dec(ecx)
+                p.jne(loop)
+
+            p.place(done)
+            p.mov(result, eax)
+
+        f = Function(p)
+    '''
+
+    __slots__ = ('_stream', '__placed')
+
+
+    def __init__(self):
+
+        self._stream:InstructionStream = InstructionStream()
+
+        # names of labels defined in program
+        self.__placed:set = set()
+
+
+    def __enter__(self) -> 'Program':
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        # program with exception is not checked
+        if exc_type is None:
+            self._finish()
+
+        return False
+
+
+    def __getattr__(self, name:str) -> object:
+        emit:Union[object, None] = _emitters.get(name)
+
+        if emit is None:
+            # only instructions from instruction set are methods (not other names of asm._instructions)
+            if name.startswith('_') or spec(name) is None:
+                raise AttributeError(f'\'Program\' object has no attribute \'{name}\'')
+
+            instruction:object = getattr(_instructions, name)
+
+            emit:object = _emitter(instruction) if isinstance(instruction, Instruction) else _stream_emitter(instruction)
+            _emitters[name] = emit
+
+        return emit.__get__(self, Program)
+
+
+    def __len__(self) -> int:
+        return len(self._stream)
+
+
+    def __repr__(self) -> str:
+        return f'Program(instructions={len(self._stream)})'
+
+
+    def label(self) -> ProgramLabel:
+        '''
+        Returns new label of program.
+        '''
+        return ProgramLabel(self)
+
+
+    def place(self, label:ProgramLabel) -> None:
+        '''
+        Defines label at current position of program.
+        '''
+        if not isinstance(label, Label) or not label._is_position():
+            raise ArgumentTypeError(f'Only label without instructions can be placed in program (got {type(label)}).')
+
+        if repr(label) in self.__placed:
+            raise ArgumentValueError(f'Label {repr(label)} is already defined in program.')
+
+        self.__placed.add(repr(label))
+        self._stream.define_label(label)
+
+
+    def extend(self, instructions:Union[Iterable[InstructionInstance], InstructionStream]) -> None:
+        '''
+        Appends instructions from iterable or stream. Generators are not materialized.
+        '''
+        self._stream.extend(instructions)
+
+
+    def _finish(self) -> InstructionStream:
+        '''
+        Checks that all used labels without instructions are defined and returns stream of program.
+        Used in Program.__exit__() and Function.__init__().
+        '''
+        for label in self._stream._labels():
+            if label._is_position() and repr(label) not in self.__placed:
+                raise LabelIsNotDefinedError(f'Label {repr(label)} is used in program, but it is not defined with place().')
+
+        return self._stream
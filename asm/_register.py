@@ -1,40 +1,93 @@
-from _errors import ArgumentValueError
+from typing import List, Tuple
+
+from ._errors import ArgumentValueError
+
+
+# classes of registers
+GPR:str = 'gpr'
+MMX:str = 'mmx'
+SEGMENT:str = 'segment'
+
+
+# table of registers: name -> (width, family, offset of bits in family, encoding number, class)
+# registers of one family alias each other if their bits overlap (al and ah do not overlap, al and eax do)
+_REGISTERS_TABLE:Tuple[tuple] = (('eax', 32, 'a', 0, 0, GPR), ('ax', 16, 'a', 0, 0, GPR), ('al', 8, 'a', 0, 0, GPR), ('ah', 8, 'a', 8, 4, GPR),
+                                 ('ecx', 32, 'c', 0, 1, GPR), ('cx', 16, 'c', 0, 1, GPR), ('cl', 8, 'c', 0, 1, GPR), ('ch', 8, 'c', 8, 5, GPR),
+                                 ('edx', 32, 'd', 0, 2, GPR), ('dx', 16, 'd', 0, 2, GPR), ('dl', 8, 'd', 0, 2, GPR), ('dh', 8, 'd', 8, 6, GPR),
+                                 ('ebx', 32, 'b', 0, 3, GPR), ('bx', 16, 'b', 0, 3, GPR), ('bl', 8, 'b', 0, 3, GPR), ('bh', 8, 'b', 8, 7, GPR),
+                                 ('esp', 32, 'sp', 0, 4, GPR), ('sp', 16, 'sp', 0, 4, GPR),
+                                 ('ebp', 32, 'bp', 0, 5, GPR), ('bp', 16, 'bp', 0, 5, GPR),
+                                 ('esi', 32, 'si', 0, 6, GPR), ('si', 16, 'si', 0, 6, GPR),
+                                 ('edi', 32, 'di', 0, 7, GPR), ('di', 16, 'di', 0, 7, GPR),
+                                 ('es', 16, 'es', 0, 0, SEGMENT), ('cs', 16, 'cs', 0, 1, SEGMENT), ('ss', 16, 'ss', 0, 2, SEGMENT),
+                                 ('ds', 16, 'ds', 0, 3, SEGMENT), ('fs', 16, 'fs', 0, 4, SEGMENT), ('gs', 16, 'gs', 0, 5, SEGMENT),
+                                 *((f'mmx{i}', 64, f'mmx{i}', 0, i, MMX) for i in range(8)))
+
 
-# TODO: update bool methods
 class Register(object):
     '''
     This class representes register in Assembly.
 
-    __init__(self, name:str):
-        name:str - name of register.
+    Registers are interned: there is only one instance for each name, so Register('eax') is Register('eax').
+    Metadata of registers is precomputed in _REGISTERS_TABLE.
+
+    __new__(cls, name:str):
+        name:str - name of register. Lookup of register is O(1).
 
-    is_segment(self) -> bool:
-        returns True if current register is segment register.
+    width(self) -> int:
+        returns width of register in bits.
 
-    is_mmx(self) -> bool:
-        returns True if current register is mmx register.
+    family(self) -> str:
+        returns family of register (for example, al, ah, ax and eax have family 'a').
+
+    number(self) -> int:
+        returns encoding number of register.
+
+    kind(self) -> str:
+        returns class of register: 'gpr', 'mmx' or 'segment'.
+
+    aliases(self, register:Register) -> bool:
+        returns True if current register and given register share bits.
     '''
-    
-    __available_names:list = ['eax', 'ebx', 'edx', 'ecx',
-                              'ebp', 'esp', 'esi', 'edi',
-                              'ax', 'bx', 'dx', 'cx',
-                              'ah', 'bh', 'dh', 'ch',
-                              'al', 'al', 'dl', 'cl'
-                              'esi', 'si', 'edi', 'di',
-                              'esp', 'sp', 'ebp', 'bp'
-                              'cs', 'ss', 'ds', 'fs', 'gs', 'es'
-                              'mmx0', 'mmx1', 'mmx2', 'mmx3',
-                              'mmx4', 'mmx5', 'mmx6', 'mmx7']
-
-
-    def __init__(self, name:str):
-        
-        if name not in Register.__available_names:
-            raise ArgumentValueError('Uknown name for register. Use Register.available_names() to get list of available names.')
-        
-        self.__name:str = name
-
-    
+
+    __slots__ = ('__name', '__width', '__family', '__offset', '__number', '__kind')
+
+    # name -> Register, filled after definition of class
+    __registers:dict = dict()
+
+
+    def __new__(cls, name:str) -> 'Register':
+
+        register:Register = Register.__registers.get(name)
+
+        if register is None:
+            raise ArgumentValueError(f'Uknown name for register: {name}. Use Register.available_names() to get list of available names.')
+
+        return register
+
+
+    @classmethod
+    def _define(cls, name:str, width:int, family:str, offset:int, number:int, kind:str) -> None:
+        '''
+        Creates register and adds it to table of registers. Used only in this module.
+        '''
+        register:Register = object.__new__(cls)
+
+        register.__name = name
+        register.__width = width
+        register.__family = family
+        register.__offset = offset
+        register.__number = number
+        register.__kind = kind
+
+        Register.__registers[name] = register
+
+
+    def __reduce__(self) -> tuple:
+        # unpickled register is the same interned instance
+        return (Register, (self.__name, ))
+
+
     def __repr__(self) -> str:
         return self.__name
 
@@ -47,49 +100,91 @@ class Register(object):
         return self.__name
 
 
+    def width(self) -> int:
+        return self.__width
+
+
+    def family(self) -> str:
+        return self.__family
+
+
+    def number(self) -> int:
+        return self.__number
+
+
+    def kind(self) -> str:
+        return self.__kind
+
+
+    def aliases(self, register:'Register') -> bool:
+        '''
+        Returns True if registers share bits. For example, al aliases ax and eax, but does not alias ah.
+        '''
+        if self.__family != register.__family:
+            return False
+
+        return self.__offset < register.__offset + register.__width and \
+               register.__offset < self.__offset + self.__width
+
+
+    def is_gpr(self) -> bool:
+        return self.__kind == GPR
+
+
     def is_segment(self) -> bool:
-        return self.__name.endswith('s')
+        return self.__kind == SEGMENT
 
 
     def is_mmx(self) -> bool:
-        return self.__name.startswith('mmx')
+        return self.__kind == MMX
 
 
     def is_accumulator(self) -> bool:
-        return 'a' in self.__name
+        return self.__family == 'a'
 
 
     def is_base(self) -> bool:
-        return 'b' in self.__name
+        return self.__family == 'b'
 
 
     def is_counter(self) -> bool:
-        if self.__name != 'cs':
-            return 'c' in self.__name
-
-        return False
+        return self.__family == 'c'
 
 
     def is_data(self) -> bool:
-        return 'd' in self.__name
+        return self.__family == 'd'
 
 
     def is_source_index(self) -> bool:
-        return self.__name == 'esi' or self.__name == 'si'
+        return self.__family == 'si'
+
 
-    
     def is_destination_index(self) -> bool:
-        return self.__name == 'edi' or self.__name == 'di'
+        return self.__family == 'di'
+
 
-    
     def is_stack_pointer(self) -> bool:
-        return self.__name == 'esp' or self.__name == 'sp'
+        return self.__family == 'sp'
+
 
-    
     def is_base_pointer(self) -> bool:
-        return self.__name == 'ebp' or self__name == 'bp'
+        return self.__family == 'bp'
+
 
-    
     @classmethod
-    def available_names(cls):
-        return Register.__available_names
\ No newline at end of file
+    def available_names(cls) -> List[str]:
+        return list(Register.__registers)
+
+
+    @classmethod
+    def available_registers(cls) -> List[str]:
+        '''
+        Returns list with all available names for registers (the same as Register.available_names()).
+        '''
+        return Register.available_names()
+
+
+for row in _REGISTERS_TABLE:
+    Register._define(*row)
+
+del row
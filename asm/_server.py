@@ -0,0 +1,320 @@
+'''
+Local compile server shared by Python processes of host (see asm.server) and its client used by Function.compile().
+
+Protocol: client connects to Unix socket and sends one JSON line with job {"source", "toolchain", "flags"},
+server answers one JSON line {"path": path to cached shared library} or {"error", "output"}.
+Shared libraries are cached in directory of server by hash of job, identical jobs which are compiled
+at the same time are compiled once.
+
+Socket and cache are in private directory of user ($XDG_RUNTIME_DIR/pyxasm or pyxasm-UID in temporary directory).
+Client uses server only if socket is owned by current user and other users have no access to it,
+and it loads only libraries, which are private files of user in private directory (see _is_private()).
+'''
+import os
+import json
+import stat
+import socket
+import tempfile
+import warnings
+import threading
+import socketserver
+from hashlib import sha256
+from subprocess import run as run_command, PIPE
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Union
+
+from ._errors import ArgumentValueError, CompilationError
+from ._toolchain import Toolchain
+from ._typehints import SystemProcess
+from ._warns import UnsafeServerWarning
+
+
+# environment variable with path to socket of server (empty value disables server)
+_SOCKET_VARIABLE:str = 'PYXASM_COMPILE_SERVER'
+
+# timeout of connection to server in seconds (compilation itself is not limited)
+_CONNECT_TIMEOUT:float = 1.0
+
+
+def _runtime_directory() -> str:
+    '''
+    Returns private directory of server for current user: $XDG_RUNTIME_DIR/pyxasm
+    (runtime directory of user) or pyxasm-UID in temporary directory.
+    '''
+    runtime:Union[str, None] = os.environ.get('XDG_RUNTIME_DIR')
+
+    if runtime:
+        return os.path.join(runtime, 'pyxasm')
+
+    return os.path.join(tempfile.gettempdir(), f'pyxasm-{os.getuid()}')
+
+
+def _default_socket() -> str:
+    '''
+    Returns default path to socket of server for current user.
+    '''
+    return os.path.join(_runtime_directory(), 'server.sock')
+
+
+def _default_cache() -> str:
+    '''
+    Returns default directory of cached shared libraries for current user.
+    '''
+    return os.path.join(_runtime_directory(), 'cache')
+
+
+def _is_private(info:os.stat_result) -> bool:
+    '''
+    Returns True if file is owned by current user and other users have no access to it (mode 0o700 or 0o600).
+    '''
+    return info.st_uid == os.getuid() and info.st_mode & 0o077 == 0
+
+
+def _private_directory(path:str) -> None:
+    '''
+    Creates private directory of current user with mode 0o700 or checks existing directory.
+    Raises ArgumentValueError if directory is owned by other user or other users have access to it.
+    '''
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    info:os.stat_result = os.lstat(path)
+
+    if not stat.S_ISDIR(info.st_mode) or not _is_private(info):
+        raise ArgumentValueError(f'{path} is not private directory of current user (expected directory of user with mode 0o700).')
+
+
+def _socket_path() -> Union[str, None]:
+    '''
+    Returns path to socket of server (None if server is disabled or Unix sockets are not supported).
+    '''
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    return os.environ.get(_SOCKET_VARIABLE, _default_socket()) or None
+
+
+def _job_key(source:str, toolchain:dict, flags:list) -> str:
+    '''
+    Returns hash of job: shared library is the same for the same source, toolchain and flags.
+    '''
+    return sha256(json.dumps([source, toolchain, flags], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    '''
+    This class representes compile server: it accepts jobs from Unix socket, compiles them
+    with bounded pool of compiler processes and returns paths to cached shared libraries.
+
+    __init__(self, socket_path:str, cache:str, jobs:int):
+        socket_path - path to Unix socket.
+        cache - directory of cached shared libraries.
+        jobs - maximal number of compiler processes.
+
+    Identical jobs which are compiled at the same time share one compilation (future of first job).
+    '''
+
+    daemon_threads:bool = True
+
+
+    def __init__(self, socket_path:str, cache:str, jobs:int):
+
+        if not isinstance(jobs, int) or jobs < 1:
+            raise ArgumentValueError(f'Invalid number of jobs (got {jobs}, expected int > 0).')
+
+        # libraries from cache are loaded by clients, so other users can not have access to it
+        _private_directory(cache)
+
+        # socket of stopped server is removed
+        if os.path.exists(socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                if connection.connect_ex(socket_path) == 0:
+                    raise ArgumentValueError(f'Compile server is already running on {socket_path}.')
+
+            os.remove(socket_path)
+
+        # only user of server can connect to socket (socket is created with mode 0o600)
+        umask:int = os.umask(0o177)
+
+        try:
+            super().__init__(socket_path, _JobHandler)
+        finally:
+            os.umask(umask)
+
+        os.chmod(socket_path, 0o600)
+
+        self.socket_path:str = socket_path
+        self.cache:str = cache
+
+        self.__pool:ThreadPoolExecutor = ThreadPoolExecutor(max_workers=jobs)
+
+        # compiled jobs: hash of job -> future with path to shared library
+        self.__in_flight:Dict[str, Future] = dict()
+        self.__lock:threading.Lock = threading.Lock()
+
+
+    def compile(self, source:str, toolchain:dict, flags:list) -> str:
+        '''
+        Returns path to shared library compiled from source. Raises CompilationError with output of compiler.
+        '''
+        key:str = _job_key(source, toolchain, flags)
+        library_filename:str = os.path.join(self.cache, f'pyxasm_{key}.so')
+
+        if os.path.exists(library_filename):
+            info:os.stat_result = os.lstat(library_filename)
+
+            if stat.S_ISREG(info.st_mode) and _is_private(info):
+                return library_filename
+
+            # file, which is not private library of user, is not served and it is compiled again
+            os.remove(library_filename)
+
+        with self.__lock:
+            future:Union[Future, None] = self.__in_flight.get(key)
+            is_new:bool = future is None
+
+            if is_new:
+                future:Future = self.__pool.submit(self.__compile, source, Toolchain.create(**toolchain), flags, library_filename)
+                self.__in_flight[key] = future
+
+        # callback of done future is called immediately, so it is added without lock
+        if is_new:
+            future.add_done_callback(lambda _: self.__forget(key))
+
+        return future.result()
+
+
+    def __forget(self, key:str) -> None:
+        with self.__lock:
+            self.__in_flight.pop(key, None)
+
+
+    def __compile(self, source:str, toolchain:Toolchain, flags:list, library_filename:str) -> str:
+        '''
+        Compiles source in process of compiler. Library is renamed to its path in cache after compilation,
+        so other jobs do not read incomplete library.
+        '''
+        prefix:str = library_filename[:-3] + f'_{threading.get_ident()}'
+
+        with open(prefix + '.c', 'w') as c_file:
+            c_file.write(source)
+
+        try:
+            result:SystemProcess = run_command(toolchain._command(prefix + '.c', prefix + '.so', tuple(flags)),
+                                               stdout=PIPE,
+                                               stderr=PIPE,
+                                               text=True)
+
+            if result.returncode != 0:
+                raise CompilationError(result.stdout + result.stderr)
+
+            os.chmod(prefix + '.so', 0o600)
+            os.replace(prefix + '.so', library_filename)
+        finally:
+            for filename in (prefix + '.c', prefix + '.so'):
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+        return library_filename
+
+
+    def server_close(self) -> None:
+        super().server_close()
+
+        self.__pool.shutdown(wait=False)
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    '''
+    This class representes handler of one connection: one job and one answer.
+    '''
+
+    def handle(self) -> None:
+        line:bytes = self.rfile.readline()
+
+        # connection without job (check of running server)
+        if len(line) == 0:
+            return
+
+        try:
+            job:dict = json.loads(line)
+            answer:dict = {'path': self.server.compile(job['source'], job['toolchain'], job['flags'])}
+        except CompilationError as error:
+            answer:dict = {'error': 'compilation', 'output': str(error)}
+        except Exception as error:
+            answer:dict = {'error': 'job', 'output': f'{type(error).__name__}: {error}'}
+
+        try:
+            self.wfile.write(json.dumps(answer).encode('utf-8') + b'\n')
+        except OSError:
+            # client does not wait for answer, library is cached anyway
+            pass
+
+
+def _read_library(path:str) -> Union[bytes, None]:
+    '''
+    Returns bytes of shared library from cache of server. Library and its directory should be private
+    (owned by current user, other users have no access), otherwise None is returned and warning is shown.
+    '''
+    directory_info:os.stat_result = os.lstat(os.path.dirname(path))
+
+    # symbolic link is not followed, file is checked after opening, so it can not be replaced after check
+    with open(path, 'rb', opener=lambda name, flags: os.open(name, flags | getattr(os, 'O_NOFOLLOW', 0))) as library_file:
+        info:os.stat_result = os.fstat(library_file.fileno())
+
+        if stat.S_ISDIR(directory_info.st_mode) and _is_private(directory_info) and \
+           stat.S_ISREG(info.st_mode) and _is_private(info):
+            return library_file.read()
+
+    warnings.warn(f'Library {path} from compile server is not private file of current user, ' + \
+                  'function is compiled in process.', UnsafeServerWarning)
+
+    return None
+
+
+def _compile_remote(source:str, toolchain:Toolchain, flags:tuple) -> Union[bytes, None]:
+    '''
+    Compiles source with compile server and returns bytes of shared library.
+    Returns None if server is not reachable (then function is compiled in process),
+    raises CompilationError if source is not compiled by server.
+    '''
+    socket_path:Union[str, None] = _socket_path()
+
+    if socket_path is None or not os.path.exists(socket_path):
+        return None
+
+    # socket of other user can be planted to run its code in this process
+    info:os.stat_result = os.lstat(socket_path)
+
+    if not stat.S_ISSOCK(info.st_mode) or not _is_private(info):
+        warnings.warn(f'Socket {socket_path} is not owned by current user or other users have access to it, ' + \
+                      'compile server is not used.', UnsafeServerWarning)
+        return None
+
+    job:bytes = json.dumps({'source': source, 'toolchain': toolchain._description(), 'flags': list(flags)}).encode('utf-8')
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(_CONNECT_TIMEOUT)
+            connection.connect(socket_path)
+
+            # compilation can take long time
+            connection.settimeout(None)
+            connection.sendall(job + b'\n')
+
+            with connection.makefile('rb') as answer_file:
+                answer:dict = json.loads(answer_file.readline())
+
+        if 'path' in answer:
+            return _read_library(answer['path'])
+    except (OSError, ValueError):
+        return None
+
+    # job of other version of package is compiled in process
+    if answer.get('error') != 'compilation':
+        return None
+
+    # output of compiler is in message of error, library does not write to stderr of process
+    raise CompilationError(f'Compilation with {toolchain.name} on compile server was unsuccessful. Output of compiler:\n{answer["output"]}')
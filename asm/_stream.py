@@ -0,0 +1,306 @@
+from array import array
+from typing import Callable, Iterable, Iterator, List, Union
+from collections.abc import Iterable as IterableObject
+
+from ._errors import ArgumentTypeError
+from ._variable import Variable
+from ._register import Register
+from ._base_intruction import InstructionInstance, Label
+
+
+# operand id for empty operand slot (instruction with less than two arguments)
+_NO_OPERAND:int = 0xFFFFFFFF
+
+# table of mnemonics shared by all streams, opcode id is index in _mnemonics
+_mnemonics:List[str] = list()
+_mnemonic_ids:dict = dict()
+
+# pseudo instruction which defines label at its position in stream (label is its operand)
+_LABEL_MNEMONIC:str = ':'
+
+
+def _opcode(name:str) -> int:
+    '''
+    Returns id of mnemonic. Adds mnemonic to table of mnemonics if it is new.
+    '''
+    opcode:Union[int, None] = _mnemonic_ids.get(name)
+
+    if opcode is None:
+        opcode = len(_mnemonics)
+        _mnemonics.append(name)
+        _mnemonic_ids[name] = opcode
+
+    return opcode
+
+
+def _att_operand(operand:object) -> str:
+    '''
+    Returns operand in AT&T syntax: registers have prefix % (%% in assembly insertion with operands),
+    numbers have prefix $. Variables (%[name]) and labels are the same in both syntaxes.
+    '''
+    if type(operand) is Register:
+        return f'%%{repr(operand)}'
+
+    if isinstance(operand, (int, float)):
+        return f'${repr(operand)}'
+
+    return repr(operand)
+
+
+def _operand_key(operand:object) -> object:
+    '''
+    Returns key for interning of operand.
+
+    Numbers are interned by value (1 and 1.0 are different operands),
+    other operands (registers, variables, labels) are interned by identity.
+    '''
+    if isinstance(operand, (int, float)):
+        return (type(operand), operand)
+
+    return id(operand)
+
+
+class InstructionStream(object):
+    '''
+    This class representes compact program: sequence of instructions stored in array.array columns.
+
+    Each instruction is stored as opcode id and two operand ids. Operands are interned,
+    so register eax used in million instructions is stored once in table of operands.
+
+    __init__(self, instructions=None):
+        instructions - iterable with objects of type InstructionInstance or InstructionStream.
+
+    append(self, name:str, args:tuple=()):
+        Appends instruction without creating InstructionInstance.
+
+    extend(self, instructions):
+        Appends instructions from iterable. Generators are consumed lazily.
+
+    define_label(self, label:Label):
+        Defines label at current position (label without instructions, see asm._program.Program).
+
+    _source(self, syntax:str='intel') -> str:
+        Returns source of instructions for assembly insertion in syntax 'intel' or 'att'. Used in Function.compile().
+
+    Example:
+        stream = InstructionStream()
+
+        for i in range(1000000):
+            stream.append('add', (eax, i))
+
+        f = Function(stream)
+    '''
+
+    __slots__ = ('_opcodes', '_first', '_second', '_operands', '_operand_ids')
+
+
+    def __init__(self, instructions:Union[Iterable[InstructionInstance], None]=None):
+
+        # columns of program: opcode id, id of first operand and id of second operand
+        self._opcodes:array = array('H')
+        self._first:array = array('I')
+        self._second:array = array('I')
+
+        # table of interned operands
+        self._operands:List[object] = list()
+        self._operand_ids:dict = dict()
+
+        if instructions is not None:
+            self.extend(instructions)
+
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+
+    def __iter__(self) -> Iterator[InstructionInstance]:
+        '''
+        Materializes instructions as InstructionInstance objects one by one.
+        Function.compile() does not use this method.
+        '''
+        for i in range(len(self._opcodes)):
+            yield InstructionInstance(_mnemonics[self._opcodes[i]], self._args(i))
+
+
+    def __repr__(self) -> str:
+        return f'InstructionStream(instructions={len(self)}, operands={len(self._operands)})'
+
+
+    def __getstate__(self) -> tuple:
+        '''
+        Returns state for pickle. Opcode ids are indexes in table of mnemonics of this process,
+        so used mnemonics are pickled by name.
+        '''
+        used:dict = {opcode: i for i, opcode in enumerate(sorted(set(self._opcodes)))}
+
+        return ([_mnemonics[opcode] for opcode in used],
+                array('H', (used[opcode] for opcode in self._opcodes)),
+                self._first,
+                self._second,
+                self._operands)
+
+
+    def __setstate__(self, state:tuple) -> None:
+        names, opcodes, self._first, self._second, self._operands = state
+
+        # map opcodes of pickled stream to table of mnemonics of this process
+        remap:List[int] = [_opcode(name) for name in names]
+
+        self._opcodes:array = array('H', (remap[opcode] for opcode in opcodes))
+        self._operand_ids:dict = {_operand_key(operand): i for i, operand in enumerate(self._operands)}
+
+
+    def _operand(self, operand:object) -> int:
+        '''
+        Returns id of operand in table of operands. Adds operand to table if it is new.
+        '''
+        key:object = _operand_key(operand)
+        operand_id:Union[int, None] = self._operand_ids.get(key)
+
+        if operand_id is None:
+            operand_id = len(self._operands)
+            self._operands.append(operand)
+            self._operand_ids[key] = operand_id
+
+        return operand_id
+
+
+    def _args(self, index:int) -> tuple:
+        '''
+        Returns arguments of instruction with given index.
+        '''
+        first:int = self._first[index]
+        second:int = self._second[index]
+
+        if first == _NO_OPERAND:
+            return tuple()
+        elif second == _NO_OPERAND:
+            return (self._operands[first], )
+        else:
+            return (self._operands[first], self._operands[second])
+
+
+    def _forms(self) -> set:
+        '''
+        Returns used forms of instructions: set of (mnemonic, number of operands).
+        '''
+        return {(_mnemonics[opcode], (first != _NO_OPERAND) + (second != _NO_OPERAND))
+                for opcode, first, second in zip(self._opcodes, self._first, self._second)}
+
+
+    def append(self, name:str, args:tuple=()) -> None:
+        '''
+        Appends instruction with given name and arguments (no more than two).
+        '''
+        if len(args) > 2:
+            raise ArgumentTypeError(f'{name}: instruction can not have more than two arguments (got {len(args)}).')
+
+        self._opcodes.append(_opcode(name))
+        self._first.append(self._operand(args[0]) if len(args) > 0 else _NO_OPERAND)
+        self._second.append(self._operand(args[1]) if len(args) > 1 else _NO_OPERAND)
+
+
+    def define_label(self, label:Label) -> None:
+        '''
+        Appends pseudo instruction which defines label at current position: "label:".
+        '''
+        if not isinstance(label, Label):
+            raise ArgumentTypeError(f'Object of type {type(label)} is not of type Label.')
+
+        self._opcodes.append(_opcode(_LABEL_MNEMONIC))
+        self._first.append(self._operand(label))
+        self._second.append(_NO_OPERAND)
+
+
+    def extend(self, instructions:Union[Iterable[InstructionInstance], 'InstructionStream']) -> None:
+        '''
+        Appends instructions from iterable with objects of type InstructionInstance (or InstructionStream) or from other stream.
+        '''
+        if isinstance(instructions, InstructionStream):
+            self._extend_mapped(instructions)
+            return
+
+        if not isinstance(instructions, IterableObject):
+            raise ArgumentTypeError('Can not iter object with instructions.')
+
+        for i, instruction in enumerate(instructions):
+            # instructions like call are expanded to streams
+            if isinstance(instruction, InstructionStream):
+                self._extend_mapped(instruction)
+                continue
+
+            if not isinstance(instruction, InstructionInstance):
+                raise ArgumentTypeError(f'Object with index {i} in instructions is not of type InstructionInstance.')
+
+            self.append(instruction._name(), instruction._args())
+
+
+    def _extend_mapped(self, instructions:'InstructionStream', mapping:Union[Callable[[object], object], None]=None) -> None:
+        '''
+        Appends instructions from other stream. If mapping is given, each operand of other stream is replaced
+        with mapping(operand) (it is called once for each unique operand). Used in extend() and in fuse().
+        '''
+        operands:Iterable[object] = instructions._operands if mapping is None else map(mapping, instructions._operands)
+
+        # remap operand ids of other stream to ids of this stream
+        remap:array = array('I', (self._operand(operand) for operand in operands))
+
+        self._opcodes.extend(instructions._opcodes)
+        self._first.extend(remap[i] if i != _NO_OPERAND else _NO_OPERAND for i in instructions._first)
+        self._second.extend(remap[i] if i != _NO_OPERAND else _NO_OPERAND for i in instructions._second)
+
+
+    def _variables(self) -> Iterator[Variable]:
+        '''
+        Returns unique operands that are instances of Variable class.
+        '''
+        return (operand for operand in self._operands if isinstance(operand, Variable))
+
+
+    def _labels(self) -> Iterator[Label]:
+        '''
+        Returns unique operands that are instances of Label class.
+        '''
+        return (operand for operand in self._operands if isinstance(operand, Label))
+
+
+    def _defined_labels(self) -> Iterator[Label]:
+        '''
+        Returns labels defined in stream with define_label().
+        '''
+        label_opcode:Union[int, None] = _mnemonic_ids.get(_LABEL_MNEMONIC)
+
+        return (self._operands[self._first[i]] for i in range(len(self._opcodes)) if self._opcodes[i] == label_opcode)
+
+
+    def _source_lines(self, syntax:str='intel') -> Iterator[str]:
+        '''
+        Returns generator with string representations of instructions like "mov eax, 2;"
+        (or "mov $2, %%eax;" in AT&T syntax, where destination is the last operand).
+        '''
+        att:bool = syntax == 'att'
+
+        # representation of each operand is built once
+        operands:List[str] = [_att_operand(operand) if att else repr(operand) for operand in self._operands]
+        mnemonics:List[str] = _mnemonics
+
+        label_opcode:Union[int, None] = _mnemonic_ids.get(_LABEL_MNEMONIC)
+
+        for opcode, first, second in zip(self._opcodes, self._first, self._second):
+            if opcode == label_opcode:
+                yield f'"{operands[first]}:"'
+            elif first == _NO_OPERAND:
+                yield f'"{mnemonics[opcode]};"'
+            elif second == _NO_OPERAND:
+                yield f'"{mnemonics[opcode]} {operands[first]};"'
+            elif att:
+                yield f'"{mnemonics[opcode]} {operands[second]}, {operands[first]};"'
+            else:
+                yield f'"{mnemonics[opcode]} {operands[first]}, {operands[second]};"'
+
+
+    def _source(self, syntax:str='intel') -> str:
+        '''
+        Returns source of all instructions for assembly insertion (one instruction per line).
+        '''
+        return '\n'.join(self._source_lines(syntax))
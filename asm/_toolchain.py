@@ -0,0 +1,300 @@
+'''
+Toolchains of Function.compile(): drivers of C compilers, which compile sources of functions to shared libraries.
+
+Available drivers are gcc, clang and tcc (TinyCC). Each driver has its own flags, level of optimization (-O0 .. -O3)
+and -march=native. TinyCC supports only AT&T syntax of assembly insertions, so functions compiled with it
+are emitted in AT&T syntax (gcc and clang support both syntaxes).
+
+available_toolchains() detects drivers, which can compile 32-bit shared library with assembly insertion on this machine.
+fastest_toolchain() compiles small function with each available driver and returns the fastest one
+(TinyCC compiles much faster than gcc, so it is useful in development).
+
+Example:
+    f.compile([a, b], [], [c], toolchain='tcc')
+    f.compile([a, b], [], [c], toolchain=Toolchain.create('gcc', optimization=2, native=True))
+    f.compile([a, b], [], [c], toolchain='auto')
+'''
+import os
+import shutil
+import tempfile
+import threading
+from time import perf_counter_ns
+from subprocess import run as run_command, PIPE
+from typing import Dict, List, Union
+
+from ._errors import ArgumentTypeError, ArgumentValueError, CompilationError
+from ._typehints import SystemProcess
+
+
+# syntaxes of assembly insertions
+_SYNTAXES:tuple = ('intel', 'att')
+
+# small function for detection and self-benchmark of toolchains (the same instruction in both syntaxes)
+_PROBE_SOURCE:str = 'void pyxasm_probe(int * a, int b){\n__asm__("add %[b], %[a];" : [a]"+r"(*a) : [b]"r"(b) : "cc");\n}\n'
+
+
+class Toolchain(object):
+    '''
+    This class representes driver of C compiler (base class for drivers gcc, clang and tcc).
+
+    __init__(self, optimization=0, native=False, syntax=None, executable=None):
+        optimization - (default:0) level of optimization from 0 to 3 (-O0 .. -O3).
+        native - (default:False) if True, code is compiled for processor of this machine (-march=native).
+        syntax - (default:None) syntax of assembly insertions: 'intel' or 'att' (default syntax of driver if None).
+        executable - (default:None) name or path of executable of compiler (name of driver if None).
+
+    create(name, **options) -> Toolchain:
+        Creates toolchain with name of driver ('gcc', 'clang' or 'tcc').
+
+    Attributes:
+        name:str - name of driver.
+        optimization:int - level of optimization.
+        native:bool - is code compiled for processor of this machine.
+        syntax:str - syntax of assembly insertions ('intel' or 'att').
+        executable:str - name or path of executable of compiler.
+    '''
+
+    # name of driver and syntaxes of assembly insertions which are supported by driver (first is default)
+    name:str = ''
+    _syntaxes:tuple = _SYNTAXES
+
+    # drivers: name -> class
+    _drivers:Dict[str, type] = dict()
+
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        Toolchain._drivers[cls.name] = cls
+
+
+    def __init__(self, optimization:int=0, native:bool=False, syntax:Union[str, None]=None, executable:Union[str, None]=None):
+
+        if not isinstance(optimization, int) or not 0 <= optimization <= 3:
+            raise ArgumentValueError(f'Invalid level of optimization (got {optimization}, expected int from 0 to 3).')
+
+        if syntax is None:
+            syntax:str = self._syntaxes[0]
+
+        if syntax not in self._syntaxes:
+            raise ArgumentValueError(f'Toolchain {self.name} does not support syntax {syntax} (expected one of {", ".join(self._syntaxes)}).')
+
+        self.optimization:int = optimization
+        self.native:bool = bool(native)
+        self.syntax:str = syntax
+        self.executable:str = executable or self.name
+
+
+    @staticmethod
+    def create(name:str, **options) -> 'Toolchain':
+        '''
+        Creates toolchain with name of driver ('gcc', 'clang' or 'tcc') and options of Toolchain.__init__().
+        '''
+        if name not in Toolchain._drivers:
+            raise ArgumentValueError(f'Unknown toolchain: {name} (expected one of {", ".join(Toolchain._drivers)}).')
+
+        return Toolchain._drivers[name](**options)
+
+
+    def __repr__(self) -> str:
+        return f"Toolchain.create('{self.name}', optimization={self.optimization}, native={self.native}, syntax='{self.syntax}')"
+
+
+    def __eq__(self, other:object) -> bool:
+        return isinstance(other, Toolchain) and self._key() == other._key()
+
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+
+    def _key(self) -> tuple:
+        return (self.name, self.optimization, self.native, self.syntax, self.executable)
+
+
+    def _description(self) -> dict:
+        '''
+        Returns description of toolchain for manifest of bundle and for compile server (see Toolchain.create()).
+        '''
+        return {'name':         self.name,
+                'optimization': self.optimization,
+                'native':       self.native,
+                'syntax':       self.syntax,
+                'executable':   self.executable}
+
+
+    def _flags(self, flags:tuple) -> List[str]:
+        '''
+        Returns flags of driver for shared library with assembly insertions in its syntax (flags are additional flags
+        of backend like -fopenmp).
+        '''
+        return ['-fPIC',
+                '-shared',
+                '-m32',
+                *(['-masm=intel'] if self.syntax == 'intel' else []),
+                f'-O{self.optimization}',
+                *(['-march=native'] if self.native else []),
+                *flags]
+
+
+    def _command(self, source_filename:str, library_filename:str, flags:tuple=()) -> List[str]:
+        '''
+        Returns command, which compiles source file to shared library.
+        '''
+        return [self.executable, *self._flags(flags), '-o', library_filename, source_filename]
+
+
+    def _compile(self, source_filename:str, library_filename:str, flags:tuple=()) -> None:
+        '''
+        Compiles source file to shared library. Raises CompilationError if compiler returns error.
+        '''
+        try:
+            result:SystemProcess = run_command(self._command(source_filename, library_filename, flags),
+                                               stdout=PIPE,
+                                               cwd=os.getcwd(),
+                                               text=True)
+        except FileNotFoundError:
+            raise CompilationError(f'Compiler {self.executable} is not found.') from None
+
+        # if returncode is equal to 0, file was compiled
+        if result.returncode != 0:
+            raise CompilationError(f'Compilation with {self.name} was unsuccessful. Error code: {result.returncode}. See details above.')
+
+
+class GccToolchain(Toolchain):
+    '''
+    This class representes driver of gcc.
+    '''
+    name:str = 'gcc'
+
+
+class ClangToolchain(Toolchain):
+    '''
+    This class representes driver of clang (-masm=intel selects dialect of assembly insertions too).
+    '''
+    name:str = 'clang'
+
+
+class TinyCCToolchain(Toolchain):
+    '''
+    This class representes driver of TinyCC. It supports only AT&T syntax of assembly insertions
+    and it does not optimize code (levels of optimization and -march=native are ignored), OpenMP is not supported.
+    '''
+    name:str = 'tcc'
+    _syntaxes:tuple = ('att', )
+
+
+    def _flags(self, flags:tuple) -> List[str]:
+        if '-fopenmp' in flags:
+            raise CompilationError('TinyCC does not support OpenMP, use gcc or clang for parallel batch.')
+
+        return ['-shared', '-m32', *flags]
+
+
+# results of detection: toolchain -> True if it compiles probe source
+_detected:Dict[Toolchain, bool] = dict()
+
+# toolchain picked by fastest_toolchain()
+_fastest:Union[Toolchain, None] = None
+_detection_lock:threading.Lock = threading.Lock()
+
+
+def _probe(toolchain:Toolchain) -> int:
+    '''
+    Compiles probe source with toolchain and returns time of compilation in nanoseconds.
+    Raises CompilationError if toolchain can not compile it.
+    '''
+    directory:str = tempfile.mkdtemp(prefix='pyxasm_probe_')
+    source_filename:str = os.path.join(directory, 'pyxasm_probe.c')
+    library_filename:str = os.path.join(directory, 'pyxasm_probe.so')
+
+    try:
+        with open(source_filename, 'w') as c_file:
+            c_file.write(_PROBE_SOURCE)
+
+        start:int = perf_counter_ns()
+
+        # output of compiler is not shown while probing
+        result:SystemProcess = run_command(toolchain._command(source_filename, library_filename),
+                                           stdout=PIPE,
+                                           stderr=PIPE,
+                                           text=True)
+
+        if result.returncode != 0:
+            raise CompilationError(f'Toolchain {toolchain.name} can not compile 32-bit shared library.')
+
+        return perf_counter_ns() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def available_toolchains() -> List[Toolchain]:
+    '''
+    Returns toolchains with default options, which are found in PATH and which compile 32-bit shared library
+    with assembly insertion. Result of detection is cached.
+    '''
+    toolchains:List[Toolchain] = list()
+
+    with _detection_lock:
+        for driver in Toolchain._drivers.values():
+            toolchain:Toolchain = driver()
+
+            if toolchain not in _detected:
+                if shutil.which(toolchain.executable) is None:
+                    _detected[toolchain] = False
+                else:
+                    try:
+                        _probe(toolchain)
+                        _detected[toolchain] = True
+                    except CompilationError:
+                        _detected[toolchain] = False
+
+            if _detected[toolchain]:
+                toolchains.append(toolchain)
+
+    return toolchains
+
+
+def fastest_toolchain(repeat:int=3) -> Toolchain:
+    '''
+    Returns available toolchain, which compiles probe source fastest (best time of repeat compilations).
+    Result is cached, so benchmark is run once in process. Used by Function.compile(toolchain='auto').
+    '''
+    global _fastest
+
+    if not isinstance(repeat, int) or repeat < 1:
+        raise ArgumentValueError(f'Invalid value of repeat argument (got {repeat}, expected int > 0).')
+
+    if _fastest is not None:
+        return _fastest
+
+    toolchains:List[Toolchain] = available_toolchains()
+
+    if len(toolchains) == 0:
+        raise CompilationError(f'No toolchain can compile 32-bit shared library (tried: {", ".join(Toolchain._drivers)}).')
+
+    times:Dict[str, int] = {toolchain.name: min(_probe(toolchain) for _ in range(repeat)) for toolchain in toolchains}
+
+    _fastest = min(toolchains, key=lambda toolchain: times[toolchain.name])
+
+    return _fastest
+
+
+def _resolve_toolchain(toolchain:Union[Toolchain, str, None]) -> Toolchain:
+    '''
+    Returns toolchain for argument toolchain of Function.compile(): Toolchain, name of driver,
+    'auto' (fastest available toolchain) or None (gcc).
+    '''
+    if toolchain is None:
+        return GccToolchain()
+
+    if isinstance(toolchain, Toolchain):
+        return toolchain
+
+    if not isinstance(toolchain, str):
+        raise ArgumentTypeError(f'Unsupported type of toolchain argument (got {type(toolchain)}, expected Toolchain or str).')
+
+    if toolchain == 'auto':
+        return fastest_toolchain()
+
+    return Toolchain.create(toolchain)
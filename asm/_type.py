@@ -1,4 +1,7 @@
-from ctypes import (c_int,    
+from ctypes import (sizeof,
+                    c_void_p,
+                    c_char as c_byte_buffer,
+                    c_int,    
                     c_long,   
                     c_char,   
                     c_double, 
@@ -10,13 +13,21 @@ from ctypes import (c_int,
                     c_ulong,
                     c_ulonglong) 
 
+from copy import copy
+from itertools import chain
 from typing import Union, List, Tuple
 from collections.abc import Iterable as IterableObject
 import warnings
 
-from _errors import ArgumentTypeError, ArgumentValueError
-from _warns import TypeRangeWarning
-from _typing import CArray, CType, CValue, ArrayType
+# NumPy is optional: ndarrays are passed to arrays without copying if it is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ._errors import ArgumentTypeError, ArgumentValueError
+from ._warns import TypeRangeWarning
+from ._typehints import CArray, CType, CValue, ArrayType
 
 
 class Type(object):
@@ -83,6 +94,16 @@ class Type(object):
         return self._ctype
 
 
+    def _dtype(self) -> object:
+        '''
+        Returns NumPy dtype of given type (like dtype('int32') for int). Requires NumPy.
+        '''
+        if numpy is None:
+            raise ArgumentTypeError('NumPy is not installed, dtype of type is not available.')
+
+        return numpy.dtype(self._ctype)
+
+
     def _get_default_value(self) -> CValue:
         '''
         Returns default value for given type.
@@ -119,14 +140,7 @@ class Type(object):
         if value is not None:
 
             # check whole types
-            if self._base_type_name in ('int', 
-                                        'short', 
-                                        'long', 
-                                        'long long', 
-                                        'unsigned short', 
-                                        'unsigned int', 
-                                        'unsigned long', 
-                                        'unsigned long long'):
+            if self._base_type_name in Type.__int_rages:
 
                 # check type of python object
                 if not isinstance(value, int):
@@ -136,7 +150,7 @@ class Type(object):
                 type_range:tuple = Type.__int_rages[self._base_type_name]
 
                 if not (type_range[0] <= value and value <= type_range[1]):
-                    warnings.warn(f"{value} is not in range of '{self._base_type_name}' ([{type_range[0]}, {type_range[1]}]).")
+                    warnings.warn(f"{value} is not in range of '{self._base_type_name}' ([{type_range[0]}, {type_range[1]}]).", TypeRangeWarning)
 
             # check float and double types
             elif self._base_type_name in ('float', 'double'):
@@ -145,34 +159,113 @@ class Type(object):
                 if not (isinstance(value, float) or isinstance(value, int)):
                     raise ArgumentTypeError(f"Value is not of type '{self._base_type_name}' (unsuposed type {type(value)}, expected 'int' or 'float').")
 
-            # check char type
+            # check char type (value of char is bytes with one byte, like value of c_char)
             else:
 
                 # check type
-                if not isinstance(value, str):
-                    raise ArgumentTypeError(f"Value is not of type '{self._base_type_name}' (unsuposed type {type(value)}, expected 'str').")
+                if not isinstance(value, bytes):
+                    raise ArgumentTypeError(f"Value is not of type '{self._base_type_name}' (unsuposed type {type(value)}, expected 'bytes').")
 
-                # check len of Python string
+                # check len of Python bytes
                 if len(value) != 1:
-                    raise ArgumentTypeError(f"Can not convert Python string with lenght = {len(value)} to char (expected lenght = 1).")
+                    raise ArgumentTypeError(f"Can not convert Python bytes with lenght = {len(value)} to char (expected lenght = 1).")
         else:
             raise ArgumentTypeError(f'Can not convert object of type NoneType to {repr(self._base_type_name)}.')
 
 
+    def _check_values(self, values:List[object]) -> None:
+        '''
+        Checks all elements of array (flat list) at once. Used in Array class.
+        Types of elements are checked by set of their Python types, range of whole types is checked
+        with minimum and maximum of elements, so one asm.TypeRangeWarning is raised for whole array.
+        Can raise asm.ArgumentTypeError, if some element is incorrect for given type.
+        '''
+        if len(values) == 0:
+            return
+
+        types:set = set(map(type, values))
+
+        # check whole types
+        if self._base_type_name in Type.__int_rages:
+            if not all(issubclass(value_type, int) for value_type in types):
+                raise ArgumentTypeError(f"Array has elements which are not of type '{self._base_type_name}' (unsuposed types {types}, expected 'int').")
+
+            # check range of values
+            type_range:tuple = Type.__int_rages[self._base_type_name]
+            minimum, maximum = min(values), max(values)
+
+            if minimum < type_range[0] or maximum > type_range[1]:
+                count:int = sum(1 for value in values if not type_range[0] <= value <= type_range[1])
+
+                warnings.warn(f"{count} of {len(values)} elements are not in range of '{self._base_type_name}' " + \
+                              f"([{type_range[0]}, {type_range[1]}], got elements from {minimum} to {maximum}).", TypeRangeWarning)
+
+        # check float and double types
+        elif self._base_type_name in ('float', 'double'):
+            if not all(issubclass(value_type, (int, float)) for value_type in types):
+                raise ArgumentTypeError(f"Array has elements which are not of type '{self._base_type_name}' (unsuposed types {types}, expected 'int' or 'float').")
+
+        # check char type
+        else:
+            if not all(issubclass(value_type, bytes) for value_type in types):
+                raise ArgumentTypeError(f"Array has elements which are not of type '{self._base_type_name}' (unsuposed types {types}, expected 'bytes').")
+
+            if set(map(len, values)) != {1}:
+                raise ArgumentTypeError(f"Can not convert Python bytes with lenght != 1 to char (expected lenght = 1).")
+
+
+    def _check_ndarray(self, value:object) -> None:
+        '''
+        Checks NumPy array with other dtype for given type (kind of dtype and range of values with minimum
+        and maximum of array). Used in Array class.
+        '''
+        kinds:str = 'biu' if self._base_type_name in Type.__int_rages else 'biuf' if self._base_type_name in ('float', 'double') else 'S'
+
+        if value.dtype.kind not in kinds:
+            raise ArgumentTypeError(f"Can not convert NumPy array with dtype {value.dtype} to '{self._base_type_name}' array.")
+
+        if self._base_type_name in Type.__int_rages and value.size != 0:
+            type_range:tuple = Type.__int_rages[self._base_type_name]
+            minimum, maximum = value.min(), value.max()
+
+            if minimum < type_range[0] or maximum > type_range[1]:
+                warnings.warn(f"Elements of array are not in range of '{self._base_type_name}' " + \
+                              f"([{type_range[0]}, {type_range[1]}], got elements from {minimum} to {maximum}).", TypeRangeWarning)
+
+
     def _get_c_value(self, value:object) -> object:
 
         # WARNING! value is already validated in Type.get_variable_definition
         return self._ctype(value)
 
 
+    def _check_and_get_c_value(self, value:object, trusted:bool=False) -> CValue:
+        '''
+        Checks is value correct for given type and returns value builded using ctypes. Used in Variable class.
+        If trusted is True, value is not checked.
+        '''
+        if not trusted:
+            self._check_value(value)
+
+        return self._get_c_value(value)
+
+
 class Array(object):
     '''
     This class representes C array type.
 
     Methods defined here:
-        __init__(ctype:object, size=None)
+        __init__(ctype:object, size=None, contiguous=True)
             ctype is instance of asm.Type or asm.Array.
             size is size of given instance (size should be a whole number and be greater than zero).
+            contiguous is flag: if it is True, kernel gets C-contiguous data (strided NumPy views are copied),
+            else strided views are passed without copying and kernel gets shape and strides of array
+            (see Variable.shape() and Variable.strides()).
+
+        _marshal(value:object) -> tuple
+            Returns (argument, shape, strides) for value of input array: ctypes object which points to data,
+            shape in elements and strides in bytes. NumPy arrays and objects with buffer protocol
+            are not copied (if they have correct type), nested lists are converted to ctypes array.
 
         ___check_value(value:object) -> None
             Checks is value is correct for array.
@@ -188,14 +281,19 @@ class Array(object):
         _size:tuple - size of array. Includes whole numbers or None values.
         _base_type:object - type from ctypes (like c_short, c_char etc.).
         _base_type_name - name of type of array (like 'short', 'char' etc.)
+        _contiguous:bool - is C-contiguous data required by kernel.
     '''
 
-    def __init__(self, ctype:Union[Type, ArrayType], size=None):
+    def __init__(self, ctype:Union[Type, ArrayType], size=None, contiguous:bool=True):
 
         # check type of ctype argument
         if isinstance(ctype, Type):
             self._base_type:Type = ctype
             self._base_type_name:str = ctype._base_type_name
+        elif isinstance(ctype, TypeVar):
+            # concrete type of array is picked at call time (see TypeVar)
+            self._base_type:TypeVar = ctype
+            self._base_type_name:str = ctype._name
         elif isinstance(ctype, Array):
             self._base_type:Type = ctype._base_type
             self._base_type_name:str = ctype._base_type_name
@@ -211,8 +309,13 @@ class Array(object):
             if size < 1:
                 raise ArgumentValueError(f"Invalid value of size argument (got {size}, expected size > 0).")
 
+        if not isinstance(contiguous, bool):
+            raise ArgumentTypeError(f"Unsupposed type of contiguous argument (got {type(contiguous)}, expected 'bool').")
+
+        self._contiguous:bool = contiguous
+
         # build size field
-        if isinstance(ctype, Type):
+        if isinstance(ctype, (Type, TypeVar)):
             self._size:tuple = (size, )
         elif isinstance(ctype, Array):
             self._size:tuple = (size, *ctype._size)
@@ -224,37 +327,123 @@ class Array(object):
 
     def _get_variable_definition(self, var_name:str, with_pointer:bool=False) -> str:
         '''
-        Returns definition of variable with its size as function argument by reference.  Used in Variable class.
+        Returns definition of variable as function argument: pointer to first element of array. Used in Variable class.
+        Array of any dimensionality is passed as pointer, so kernel does not depend on sizes of dimensions.
 
         For example, if arr is defined as:
             arr_type:Array = Array(Array(c_int, 3), 4)
             var:Variable = Variable(arr_type)
         then this method will return:
-            int * var[4][3]
+            int * var
         '''
-
-        if with_pointer:
-            definition:str = f'{self._base_type_name} {var_name}'
-        else:
-            definition:str = f'{self._base_type_name} * {var_name}'
-
-        for dim in self._size:
-            definition += f'[{dim}]'
-
-        return definition
+        return f'{self._base_type_name} * {var_name}'
 
 
     def _get_type(self) -> ArrayType:
         # get ctype type for value
-        c_type_arr:Ctype = self._base_type._ctype
+        c_type_arr:CType = self._base_type._ctype
+
+        for dim in self._size[::-1]:
+            if dim is None:
+                raise ArgumentTypeError(f'One of dimensions in array is uknown, can not get ctypes type of {str(self)}.')
 
-        for dim in total_size[::-1]:
             c_type_arr:ArrayType = c_type_arr * dim
 
         return c_type_arr
 
 
-    def _get_default_value(self) -> CArray:
+    def _dtype(self) -> object:
+        '''
+        Returns NumPy dtype of elements of array. Requires NumPy.
+        '''
+        return self._base_type._dtype()
+
+
+    def _marshal(self, value:object, trusted:bool=False) -> Tuple[object, Tuple[int], Tuple[int]]:
+        '''
+        Returns argument of kernel for value of input array, shape (in elements) and strides (in bytes).
+        Argument is ctypes object which points to data of value and keeps value alive while kernel runs.
+
+        Python does not iterate over elements of NumPy arrays and buffers: they are passed without copying
+        (strided NumPy views too, if array has contiguous=False) or copied to contiguous memory in C.
+        If trusted is True, elements of value are not checked.
+        '''
+        itemsize:int = sizeof(self._base_type._ctype)
+
+        if numpy is not None and isinstance(value, numpy.ndarray):
+            self.__check_shape(value.shape)
+
+            value:numpy.ndarray = self.__convert_ndarray(value, trusted)
+
+            # copy is made only if kernel requires contiguous data
+            if self._contiguous and not value.flags['C_CONTIGUOUS']:
+                value:numpy.ndarray = numpy.ascontiguousarray(value)
+
+            # pointer keeps reference to array
+            return value.ctypes.data_as(c_void_p), value.shape, value.strides
+
+        view:Union[memoryview, None] = self.__buffer_view(value)
+
+        if view is not None:
+            # only writable C-contiguous buffers are passed without copying
+            if view.readonly or not view.c_contiguous:
+                view:memoryview = memoryview(bytearray(view.tobytes())).cast(view.format.lstrip('@=<>!'), view.shape)
+
+            return (c_byte_buffer * view.nbytes).from_buffer(view), view.shape, _c_strides(view.shape, itemsize)
+
+        # nested lists are converted to ctypes array (size of this type is not changed)
+        c_value:CArray = copy(self)._check_and_get_c_value(value, trusted)
+        shape:Tuple[int] = _ctypes_shape(c_value)
+
+        return c_value, shape, _c_strides(shape, itemsize)
+
+
+    def __convert_ndarray(self, value:object, trusted:bool) -> object:
+        '''
+        Converts NumPy array with other dtype to dtype of elements of array (whole array is checked at once).
+        '''
+        if value.dtype == self._dtype():
+            return value
+
+        if not trusted:
+            self._base_type._check_ndarray(value)
+
+        return value.astype(self._dtype())
+
+
+    def __buffer_view(self, value:object) -> Union[memoryview, None]:
+        '''
+        Returns memoryview of value with checked format and shape or None if value does not support buffer protocol.
+        '''
+        try:
+            view:memoryview = memoryview(value)
+        except TypeError:
+            return None
+
+        # bytes are viewed as array of char
+        if isinstance(value, (bytes, bytearray)):
+            view:memoryview = view.cast(self._base_type._ctype._type_)
+        elif view.format.lstrip('@=<>!') != self._base_type._ctype._type_:
+            raise ArgumentTypeError(f'Invalid format of buffer (got {repr(view.format)}, expected {repr(self._base_type._ctype._type_)} for {str(self)}).')
+
+        self.__check_shape(view.shape)
+
+        return view
+
+
+    def __check_shape(self, shape:Tuple[int]) -> None:
+        '''
+        Checks number of dimensions and known sizes of dimensions.
+        '''
+        if len(shape) != len(self._size):
+            raise ArgumentValueError(f'Invalid number of dimensions of array (got {len(shape)}, expected {len(self._size)} for {str(self)}).')
+
+        for dim, expected in zip(shape, self._size):
+            if expected is not None and dim != expected:
+                raise ArgumentValueError(f'Invalid shape of array (got {tuple(shape)}, expected {self._size} for {str(self)}).')
+
+
+    def _get_default_value(self) -> Union[CArray, None]:
         '''
         Returns array with default value for given type.
 
@@ -264,6 +453,10 @@ class Array(object):
             {{0, 0}, {0, 0}, {0, 0}}
         '''
 
+        # type of array of type variable (or array with unknown size) is unknown, so it has not default value
+        if isinstance(self._base_type, TypeVar) or None in self._size:
+            return None
+
         # get ctype type for value
         c_type_arr:Ctype = self._base_type._ctype
 
@@ -279,101 +472,245 @@ class Array(object):
 
 
 
-    def _check_and_get_c_value(self, value:object) -> CArray:
+    def _check_and_get_c_value(self, value:object, trusted:bool=False) -> CArray:
         '''
         This method checks is value valid for variable's type and returns value of ctypes array. Uses in Variable class.
+        Elements are checked at once (see Type._check_values()), if trusted is True, they are not checked.
 
         Changes self._size for definition of variable. For example, if arr_type defined in the following way:
             arr_type:Array = Array(Array(c_int, None), 2)
         and var defined as:
             var:Variable = Variable(arr_type, [[1, 2, 3, 4], [5, 6, 7, 8]])
-        then size of type of var will be (4, 2) and this variable will be defined as int var[2][4]
+        then size of type of var will be (2, 4) and this variable will be defined as int var[2][4]
         '''
 
-        # validate value
-        total_size:List[int] = list(self._size)
+        if isinstance(self._base_type, TypeVar):
+            raise ArgumentValueError(f'Variable of array of type variable {self._base_type._name} can not have value.')
 
-        # here total_size is changing and after
-        # calling this method it has not NoneType values
-        self.__validate_array(value, self._size, total_size)
+        # NumPy arrays with other dtype are converted with NumPy
+        if numpy is not None and isinstance(value, numpy.ndarray):
+            self.__check_shape(value.shape)
 
-        # get ctype type for value
-        c_type_arr:Ctype = self._base_type._ctype
+            value:numpy.ndarray = self.__convert_ndarray(value, trusted)
 
-        for dim in total_size[::-1]:
-            c_type_arr:ArrayType = c_type_arr * dim
+        # buffers (NumPy arrays, array.array, ctypes arrays) of known size are copied without iteration over elements
+        if not isinstance(value, (list, tuple)):
+            view:Union[memoryview, None] = self.__buffer_view(value)
 
-        def to_tuple_recursive(obj:Union[IterableObject, object]) -> tuple:
-            '''
-            This function converts each iterable object to tuple of tuples of tuples... recursively.
-
-            Example:
-            arr:list = [[1, 2, 3], [1, 2, 3], [1, 2, 3]]
-            >>> to_tuple_recursive(arr)
-                ((1, 2, 3), (1, 2, 3), (1, 2, 3))
-            '''
-            if isinstance(obj, IterableObject):
-                return tuple(to_tuple_recursive(elem) for elem in obj)
-            else:
-                return obj
+            if view is not None:
+                self._size:tuple = tuple(view.shape)
 
-        # convert value to tuple
-        value:tuple = to_tuple_recursive(value)
+                return self._get_type().from_buffer_copy(view.tobytes())
 
-        # get c_value
-        return c_type_arr(*value)
+        # elements of array in C order
+        elements, total_size = self.__flatten(value)
 
+        if not trusted:
+            self._base_type._check_values(elements)
 
-    
-    def __validate_array(self, value:object, size:Tuple[int], total_size:List[int], total_size_index:int=0) -> None:
+        # modify size of array
+        self._size:tuple = tuple(total_size)
+
+        # ctypes array is built from flat array, nested type views its memory
+        flat:CArray = (self._base_type._ctype * len(elements))(*elements)
+
+        return self._get_type().from_buffer(flat)
+
+
+    def __flatten(self, value:object) -> Tuple[list, List[int]]:
         '''
-        This method recursively validates array and changes total_size, if some value in given size is equal to None.
+        Returns elements of (nested) value in C order and sizes of dimensions.
+        Each dimension is validated for all rows at once.
 
         Example, for:
             arr_type:Array = Array(Array(Array(int, 2), None), 3)
-        total_size for:
+        and
             arr:list = [[[1, 2], [1, 2], [1, 2]], [[3, 4], [3, 4], [3, 4]], [[5, 6], [5, 6], [5, 6]]]
-        will look like:
-        (3, 3, 2)
+        sizes of dimensions will look like:
+        [3, 3, 2]
         '''
-        
-        if not isinstance(value, IterableObject):
-            raise ArgumentTypeError(f'Can not convert {repr(value)} to array.')
-        else:
-            value:List[object] = list(value)
+        rows:list = [value]
+        total_size:List[int] = list()
 
-        if self._size[0] is not None:
-            if len(value) != size[0]:
-                raise ArgumentTypeError(f'Can not convert {repr(value)} to {self._base_type_name} array (got lenght {len(value)}, expected {size[0]}).')
+        for dim in self._size:
+            for row in rows:
+                if not isinstance(row, IterableObject):
+                    raise ArgumentTypeError(f'Can not convert {repr(row)} to array.')
 
-        # check 1d array
-        if len(size) == 1:
-            if size[0] is not None:
-                if len(value) != size[0]:
-                    raise ArgumentTypeError(f'Can not convert {repr(value)} to {self._base_type_name} array (got lenght {len(value)}, expected {size[0]}).')
-            else:
-                if len(value) != 0:
-                    total_size[total_size_index]:int = len(value)
-                else:
-                    raise ArgumentTypeError(f'Can not convert empty list to {self._base_type_name}.')
-                
-            for final_element in value:
-                self._base_type._check_value(final_element)
+            rows:List[list] = [list(row) for row in rows]
+            lenghts:set = set(map(len, rows))
 
-        # check n-dimensional array
-        else:
-            for i in range(len(value)):
-
-                element:object = value[i]
-                    
-                if i == 0:
-                    cur_lenght:int = len(element)
-                    total_size[total_size_index]:int = len(value)
-                else:
-                    if len(element) != cur_lenght:
-                        raise ArgumentTypeError(f'Can not convert {repr(element)} to {self._base_type_name} array (got lenght {len(element)}, expected {cur_lenght}).')
-            
-                self.__validate_array(element, size[1:], total_size, total_size_index + 1)
+            if len(lenghts) != 1:
+                raise ArgumentTypeError(f'Can not convert {repr(value)} to {self._base_type_name} array (got rows with lenghts {sorted(lenghts)}).')
 
-        # modify size of array
-        self._size:tuple = tuple(total_size)
\ No newline at end of file
+            lenght:int = lenghts.pop()
+
+            if dim is not None and lenght != dim:
+                raise ArgumentTypeError(f'Can not convert {repr(value)} to {self._base_type_name} array (got lenght {lenght}, expected {dim}).')
+
+            if lenght == 0:
+                raise ArgumentTypeError(f'Can not convert empty list to {self._base_type_name}.')
+
+            total_size.append(lenght)
+            rows:list = list(chain.from_iterable(rows))
+
+        return rows, total_size
+
+
+class TypeVar(object):
+    '''
+    This class representes type variable: C type of variable is picked at call time from types of arguments.
+
+    Methods defined here:
+        __init__(name:str, *typenames:str)
+            name is name of type variable (it is used in messages of errors).
+            typenames are names of candidate types in order of preference (like 'int', 'long long', 'unsigned int').
+
+        _resolve(values:list) -> Type
+            Returns first candidate, which can hold all values (Python numbers, one-byte bytes for char,
+            lists or objects with buffer protocol, which are matched by format code).
+
+    Example:
+        T = TypeVar('T', 'int', 'long long', 'double')
+        a = Variable(T)
+        b = Variable(Array(T, 4))
+
+    Fields defined here:
+        _name:str - name of type variable.
+        _candidates:tuple - candidate types (instances of asm.Type).
+    '''
+
+    def __init__(self, name:str, *typenames:str):
+
+        if not isinstance(name, str):
+            raise ArgumentTypeError(f"Unsupposed type of name argument (got {type(name)}, expected 'str').")
+
+        if len(typenames) == 0:
+            raise ArgumentValueError(f'Type variable {name} should have at least one candidate type.')
+
+        self._name:str = name
+        self._candidates:tuple = tuple(Type(typename) for typename in typenames)
+
+
+    def __str__(self) -> str:
+        return f"TypeVar(name='{self._name}', candidates={tuple(ctype._base_type_name for ctype in self._candidates)})"
+
+
+    def _widths(self) -> Tuple[int]:
+        '''
+        Returns widths of candidate types in bits.
+        '''
+        return tuple(sizeof(ctype._ctype) * 8 for ctype in self._candidates)
+
+
+    def _get_default_value(self) -> None:
+        # type of variable is unknown, so it has not default value
+        return None
+
+
+    def _check_and_get_c_value(self, value:object, trusted:bool=False) -> None:
+        raise ArgumentValueError(f'Variable of type variable {self._name} can not have value.')
+
+
+    def _resolve(self, values:List[object]) -> Type:
+        '''
+        Returns first candidate type which can hold all values.
+        '''
+        for candidate in self._candidates:
+            if all(_holds(candidate, value) for value in values):
+                return candidate
+
+        raise ArgumentTypeError(f'Type variable {self._name} has no candidate type for arguments {values}.')
+
+
+def _holds(ctype:Type, value:object) -> bool:
+    '''
+    Returns True if value (or each element of value) can be converted to given type without overflow.
+    Buffers (array.array, numpy arrays, ctypes arrays) are matched by format code.
+    '''
+    if isinstance(value, bool):
+        return ctype._base_type_name not in ('float', 'double', 'char')
+
+    if isinstance(value, int):
+        if ctype._base_type_name in ('float', 'double', 'char'):
+            return False
+
+        bits:int = sizeof(ctype._ctype) * 8
+
+        if ctype._base_type_name.startswith('unsigned'):
+            return 0 <= value < 2 ** bits
+
+        return -2 ** (bits - 1) <= value < 2 ** (bits - 1)
+
+    if isinstance(value, float):
+        return ctype._base_type_name in ('float', 'double')
+
+    if isinstance(value, bytes) and len(value) == 1:
+        return ctype._base_type_name == 'char'
+
+    # str is iterable of str, it is not value of any type (value of char is bytes)
+    if isinstance(value, str):
+        return False
+
+    try:
+        view:memoryview = memoryview(value)
+    except TypeError:
+        view:None = None
+
+    if view is not None:
+        return view.format.lstrip('@=<>!') == ctype._ctype._type_
+
+    if isinstance(value, IterableObject):
+        return all(_holds(ctype, element) for element in value)
+
+    return False
+
+
+def _c_strides(shape:Tuple[int], itemsize:int) -> Tuple[int]:
+    '''
+    Returns strides in bytes of C-contiguous array with given shape.
+    '''
+    strides:List[int] = list()
+    stride:int = itemsize
+
+    for dim in reversed(shape):
+        strides.append(stride)
+        stride *= dim
+
+    return tuple(reversed(strides))
+
+
+def _ctypes_shape(value:CArray) -> Tuple[int]:
+    '''
+    Returns shape of (nested) ctypes array.
+    '''
+    shape:List[int] = list()
+    array_type:type = type(value)
+
+    while hasattr(array_type, '_length_'):
+        shape.append(array_type._length_)
+        array_type = array_type._type_
+
+    return tuple(shape)
+
+
+def _is_generic(ctype:object) -> bool:
+    '''
+    Returns True if type is type variable or array of type variable.
+    '''
+    return isinstance(ctype, TypeVar) or (isinstance(ctype, Array) and isinstance(ctype._base_type, TypeVar))
+
+
+def _specialize_type(ctype:Union[TypeVar, Array], binding:dict) -> Union[Type, Array]:
+    '''
+    Returns concrete type for type variable (or array of type variable). binding is dict like {name of type variable: Type}.
+    '''
+    if isinstance(ctype, TypeVar):
+        return binding[ctype._name]
+
+    concrete:Union[Type, Array] = binding[ctype._base_type._name]
+
+    for dim in ctype._size[::-1]:
+        concrete:Array = Array(concrete, dim, contiguous=ctype._contiguous)
+
+    return concrete
@@ -1,6 +1,6 @@
-from _register import Register
-from _variable import Variable
-from _base_intruction import Label
+from ._register import Register
+from ._variable import Variable
+from ._base_intruction import Label
 
 def is_number(x:object) -> bool:
     '''
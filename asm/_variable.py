@@ -1,18 +1,21 @@
 from copy import copy
 from typing import Union
-from ctypes import byref, POINTER as pointer
+from ctypes import byref, c_void_p, POINTER as pointer
 
-from _type import Type, Array
-from _errors import ArgumentTypeError
-from _typing import CArray, CValue, CArrayByRef, CValueByRef, CType, ArrayType
+from ._type import Type, Array, TypeVar
+from ._errors import ArgumentTypeError
+from ._typehints import CArray, CValue, CArrayByRef, CValueByRef, CType, ArrayType
 
 class Variable(object):
 
-    def __init__(self, ctype:Union[Type, Array], value=None):
+    __slots__ = ('__ctype', '__value', '__has_value', '__name', '__trusted')
+
+
+    def __init__(self, ctype:Union[Type, Array], value=None, trusted:bool=False):
 
         # validate ctype argument
-        if not (isinstance(ctype, Type) or isinstance(ctype, Array)):
-            raise ArgumentTypeError(f'Unsuposed type of ctype argument (got {type(ctype)}, expected asm.Type or asm.Array).')
+        if not (isinstance(ctype, Type) or isinstance(ctype, Array) or isinstance(ctype, TypeVar)):
+            raise ArgumentTypeError(f'Unsuposed type of ctype argument (got {type(ctype)}, expected asm.Type, asm.Array or asm.TypeVar).')
 
         # copy ArrayType to change its size
         if isinstance(ctype, Array):
@@ -20,8 +23,14 @@ class Variable(object):
         else:
             self.__ctype:Type = ctype
 
+        if not isinstance(trusted, bool):
+            raise ArgumentTypeError(f'Unsuposed type of trusted argument (got {type(trusted)}, expected bool).')
+
+        # values of trusted variable (its value and arguments of calls) are not checked
+        self.__trusted:bool = trusted
+
         if value is not None:
-            self.__value:Union[CValue, CArray] = self.__ctype._check_and_get_c_value(value)
+            self.__value:Union[CValue, CArray] = self.__ctype._check_and_get_c_value(value, trusted)
             self.__has_value:bool = True
         else:
             self.__value:Union[CValue, CArray] = self.__ctype._get_default_value()
@@ -45,11 +54,48 @@ class Variable(object):
         return self.__name == var.__name
 
 
+    def __hash__(self) -> int:
+        '''
+        Variables are hashed by names (like in Variable.__eq__()), so they can be keys of dict (see Function.bind()).
+        '''
+        return hash(self.__name)
+
+
+    @classmethod
+    def _restore(cls, ctype:Union[Type, Array], value:object, name:str, trusted:bool=False) -> 'Variable':
+        '''
+        Creates variable with given name. Used for functions loaded from bundles, since
+        names of variables are used in compiled source of assembly insertion.
+        '''
+        var:Variable = cls(ctype, value, trusted)
+        var.__name = name
+
+        return var
+
+
     def _name(self) -> str:
         return self.__name
 
 
+    def _renamed(self, name:str) -> 'Variable':
+        '''
+        Returns copy of variable (with the same type and value) with given name. Used in fuse().
+        '''
+        var:Variable = copy(self)
+        var.__name = name
+
+        return var
+
+
+    def _type(self) -> Union[Type, Array]:
+        return self.__ctype
+
+
     def _get_type(self, is_pointer=False) -> Union[CType, ArrayType]:
+        # array of any dimensionality is passed as pointer to its first element
+        if isinstance(self.__ctype, Array):
+            return c_void_p
+
         base_type:CType = self.__ctype._get_type()
 
         if is_pointer:
@@ -79,6 +125,46 @@ class Variable(object):
         return self.__ctype._get_variable_definition(self.__name, with_pointer=with_pointer)
 
 
+    def shape(self) -> 'Variable':
+        '''
+        Returns variable with shape of array (array of long with one element for each dimension).
+        Available for arrays with contiguous=False: shape and strides are passed to kernel with pointer to data,
+        so kernel can work with strided NumPy views without copying.
+
+        For example:
+        >>> a = Variable(Array(Array(Type('int'), None), None, contiguous=False))
+        >>> f = Function([mov(ebx, a.shape()), ...])    # ebx is pointer to shape of array
+        '''
+        return self.__layout('shape')
+
+
+    def strides(self) -> 'Variable':
+        '''
+        Returns variable with strides of array in bytes (array of long with one element for each dimension).
+        Available for arrays with contiguous=False (see Variable.shape()).
+        '''
+        return self.__layout('strides')
+
+
+    def __layout(self, kind:str) -> 'Variable':
+        if not isinstance(self.__ctype, Array) or self.__ctype._contiguous:
+            raise ArgumentTypeError(f'Variable {repr(self)} is not array with contiguous=False, it has not {kind}.')
+
+        # variables are compared by names, so the same variable is returned by each call
+        return Variable._restore(Array(Type('long'), len(self.__ctype._size)), None, f'{self.__name}_{kind}')
+
+
+    def _layout_variables(self) -> tuple:
+        '''
+        Returns variables with shape and strides of array with contiguous=False (empty tuple for other variables).
+        Used in Function.compile().
+        '''
+        if not isinstance(self.__ctype, Array) or self.__ctype._contiguous:
+            return ()
+
+        return (self.shape(), self.strides())
+
+
     def has_value(self) -> bool:
         '''
         Returns True if current instance has value else False. Used in Function.compile()
@@ -102,8 +188,13 @@ class Variable(object):
         return byref(self.__value) if by_ref else self.__value
 
 
-    def _check_and_get_c_value(self, value:object) -> Union[CValue, CArray]:
+    def _check_and_get_c_value(self, value:object, trusted:bool=False) -> Union[CValue, CArray]:
         ''''
         Validates value for current instance and converts it to value builded using ctypes.
+        Value is not validated if trusted is True or variable was created with trusted=True.
         '''
-        return self.__ctype._check_and_get_c_value(value)
\ No newline at end of file
+        return self.__ctype._check_and_get_c_value(value, trusted or self.__trusted)
+
+
+    def _is_trusted(self) -> bool:
+        return self.__trusted
\ No newline at end of file
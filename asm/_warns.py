@@ -1,3 +1,8 @@
 class TypeRangeWarning(UserWarning):
-    def __init__(self):
-        UserWarning.__init__(self)
\ No newline at end of file
+    def __init__(self, text:str):
+        UserWarning.__init__(self, text)
+
+
+class UnsafeServerWarning(UserWarning):
+    def __init__(self, text:str):
+        UserWarning.__init__(self, text)
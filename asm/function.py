@@ -1,7 +1,164 @@
 import os
+import mmap
+import stat
+import struct
+import tempfile
+import weakref
+from hashlib import sha256
+from subprocess import run, PIPE
 
 from asm.variable import Variable
 
+
+# number of elements of local arrays without value (N in .cpp source)
+_ARRAY_SIZE = 50
+
+# header of buffer: number of records and records (offset, length, dtype code) for each variable
+_COUNT_FORMAT = 'I'
+_RECORD_FORMAT = '3I'
+
+# offsets of values in buffer are aligned to 8 bytes
+_ALIGNMENT = 8
+
+# compiler and its flags for .exe files and for runtime
+_COMPILER = 'g++'
+_FLAGS = ['-masm=intel', '-std=c++17']
+
+# declarations of runtime for source of function (runtime is compiled once to object file)
+_RUNTIME_HEADER = '''#include <string.h>
+
+struct record { unsigned int offset; unsigned int length; unsigned int dtype; };
+
+char * map_buffer(const char * name, size_t * size);
+void unmap_buffer(char * buffer, size_t size);
+
+'''
+
+# cpp source of runtime: mapping of buffer file to memory
+_RUNTIME_SOURCE = '''#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#endif
+#include <stddef.h>
+
+char * map_buffer(const char * name, size_t * size)
+{
+#ifdef _WIN32
+HANDLE file = CreateFileA(name, GENERIC_READ | GENERIC_WRITE, FILE_SHARE_READ | FILE_SHARE_WRITE, NULL, OPEN_EXISTING, 0, NULL);
+if (file == INVALID_HANDLE_VALUE) return NULL;
+*size = GetFileSize(file, NULL);
+HANDLE mapping = CreateFileMappingA(file, NULL, PAGE_READWRITE, 0, 0, NULL);
+CloseHandle(file);
+if (mapping == NULL) return NULL;
+char * buffer = (char *)MapViewOfFile(mapping, FILE_MAP_ALL_ACCESS, 0, 0, 0);
+CloseHandle(mapping);
+return buffer;
+#else
+int file = open(name, O_RDWR);
+if (file < 0) return NULL;
+struct stat info;
+fstat(file, &info);
+*size = info.st_size;
+void * buffer = mmap(NULL, *size, PROT_READ | PROT_WRITE, MAP_SHARED, file, 0);
+close(file);
+return buffer == MAP_FAILED ? NULL : (char *)buffer;
+#endif
+}
+
+void unmap_buffer(char * buffer, size_t size)
+{
+#ifdef _WIN32
+UnmapViewOfFile(buffer);
+#else
+munmap(buffer, size);
+#endif
+}
+
+'''
+
+
+# toolchain (compiler and flags) -> path to object file of runtime
+_runtime_objects = {}
+
+
+def _private_directory():
+    '''
+    Returns directory of current user for object files of runtime and for files of functions (.exe, .bin and .cpp).
+    Directory is created with mode 0o700, existing directory is used only if it is owned by current user
+    and other users can not write to it.
+    '''
+    # temporary directory of Windows belongs to user
+    if not hasattr(os, 'getuid'):
+        return tempfile.gettempdir()
+
+    directory = os.path.join(tempfile.gettempdir(), f'pyxasm-runtime-{os.getuid()}')
+
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    info = os.lstat(directory)
+
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077 != 0:
+        raise RuntimeError(f'Directory {directory} is not private directory of current user.')
+
+    return directory
+
+
+def _runtime_object():
+    '''
+    Returns path to object file of runtime for current toolchain. Object file is compiled once
+    and cached in private directory of user: its name contains hash of version of compiler, flags and source of runtime.
+    Path is memoized per process, so compiler is not run for next functions.
+    '''
+    toolchain = (_COMPILER, *_FLAGS)
+
+    if toolchain in _runtime_objects:
+        return _runtime_objects[toolchain]
+
+    version = run([_COMPILER, '--version'], stdout=PIPE, stderr=PIPE, universal_newlines=True).stdout
+
+    key = sha256((version + ' '.join(_FLAGS) + _RUNTIME_SOURCE).encode()).hexdigest()[:16]
+
+    object_file_name = os.path.join(_private_directory(), f'pyxasm_runtime_{key}.o')
+
+    if not os.path.exists(object_file_name):
+        source_file_name = object_file_name[:-2] + f'_{os.getpid()}.cpp'
+
+        with open(source_file_name, 'w') as f:
+            f.write(_RUNTIME_SOURCE)
+
+        try:
+            # compile to temporary file and rename it, so other processes do not use incomplete object file
+            if run([_COMPILER, *_FLAGS, '-c', '-o', source_file_name[:-4] + '.o', source_file_name]).returncode != 0:
+                raise RuntimeError('Runtime of functions could not be compiled.')
+
+            os.replace(source_file_name[:-4] + '.o', object_file_name)
+        finally:
+            os.remove(source_file_name)
+
+    _runtime_objects[toolchain] = object_file_name
+
+    return object_file_name
+
+
+def _remove_files(*file_names):
+    '''
+    Removes files of collected function (they can be already removed).
+    '''
+    for file_name in file_names:
+        if os.path.exists(file_name):
+            os.remove(file_name)
+
+
+def _align(offset):
+    '''
+    Returns offset aligned to _ALIGNMENT bytes.
+    '''
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
 class Function(object):
     '''
     The main class of package. This class creates .exe file from commands from asm.instructions and runs it.
@@ -18,7 +175,8 @@ class Function(object):
     
     def __call__(self, *args):
         '''
-        Magic __call__() method. Writes its arguments to buffer .txt, runs .exe file and reads result from buffer file.
+        Magic __call__() method. Writes its arguments to binary buffer, runs .exe file and reads result from buffer.
+        Buffer is file, which is mapped to memory by Python and by .exe file, so values are not converted to text.
 
         Returns tuple with values of output variables.
 
@@ -32,29 +190,68 @@ class Function(object):
         if len(args) != len(self.__input_vars):
             raise IndexError('Length of args is not equal to length of input variables.')
 
-        # write input to buffer file
-        with open(self.__buffer_file_name + '.txt', 'w') as f:
-            for arg in args:
-                f.write(str(arg) + '\n')
+        # records of header (offset, length, dtype code) and binary values of input variables
+        records = []
+        values = []
+
+        offset = _align(struct.calcsize(_COUNT_FORMAT) + struct.calcsize(_RECORD_FORMAT) * (len(args) + 1))
+
+        for var, arg in zip(self.__input_vars, args):
+            value = var._pack(arg)
+            length = len(arg) if var._is_array() else 1
 
-        # run .exe file
-        os.system(f'{self.__buffer_file_name + ".exe"}')
+            records.append((offset, length, var._dtype_code()))
+            values.append(value)
+
+            offset = _align(offset + len(value))
+
+        # place for output variable (output array has length of its value)
+        if self.__output_var is not None:
+            length = self.__output_var._length() if self.__output_var._is_array() else 1
+
+            records.append((offset, length, self.__output_var._dtype_code()))
+
+            offset += self.__output_var._size(length)
 
         try:
-            # reading result
-            with open(self.__buffer_file_name + '.txt', 'r') as f:
-                
-                # reading result and converting to Python objects
-                if self.__output_var is not None:
-                    result = self.__output_var._to_type()(f.read())
-                else:
-                    result = None
+            with open(self.__buffer_file_name + '.bin', 'w+b') as f:
+                f.truncate(offset)
+
+                with mmap.mmap(f.fileno(), offset) as buffer:
+                    # write header
+                    struct.pack_into(_COUNT_FORMAT, buffer, 0, len(records))
+
+                    for i, record in enumerate(records):
+                        struct.pack_into(_RECORD_FORMAT, buffer, self.__record_offset(i), *record)
+
+                    # write input to buffer
+                    for (position, _, _), value in zip(records, values):
+                        buffer[position:position + len(value)] = value
+
+                    # run .exe file (it returns not zero, if it can not map buffer or types of values are wrong)
+                    if run([os.path.abspath(self.__buffer_file_name + '.exe')]).returncode != 0:
+                        raise RuntimeError('Executable file could not read arguments from buffer.')
+
+                    # reading result (.exe file writes length of output array to its record)
+                    if self.__output_var is not None:
+                        position, length, _ = struct.unpack_from(_RECORD_FORMAT, buffer, self.__record_offset(len(records) - 1))
+
+                        result = self.__output_var._unpack(buffer, position, length)
+                    else:
+                        result = None
         finally:
             # delete buffer file
-            os.remove(self.__buffer_file_name + '.txt')
+            os.remove(self.__buffer_file_name + '.bin')
 
         return result
 
+
+    def __record_offset(self, index):
+        '''
+        Returns offset of record with given index in header of buffer.
+        '''
+        return struct.calcsize(_COUNT_FORMAT) + struct.calcsize(_RECORD_FORMAT) * index
+
         
     def __build_asm(self) -> str:
         '''
@@ -81,6 +278,8 @@ class Function(object):
         This method compiles function for later use.
         input_vars, output_vars and local_vars have to be indexable objects.
         Method builds source for .cpp file, compiles it and creates .exe file.
+        Files of function are in private temporary directory of user, .exe file is removed when function is collected
+        (.cpp file is kept there if delete_cpp is False).
         '''
 
         if input_vars is None:
@@ -89,18 +288,23 @@ class Function(object):
         if local_vars is None:
             local_vars = []
 
-        # name for output text file
-        self.__buffer_file_name = '1'
+        # unique name of .exe, .bin and .cpp files in private directory of user (.exe file is reserved by mkstemp)
+        descriptor, exe_file_name = tempfile.mkstemp(prefix='pyxasm_function_', suffix='.exe', dir=_private_directory())
+        os.close(descriptor)
+
+        self.__buffer_file_name = exe_file_name[:-4]
 
-        # creating unique name of file
-        while os.path.exists(self.__buffer_file_name + '.txt'):
-            self.__buffer_file_name = '1' + self.__buffer_file_name
+        # files of function are removed when function is collected
+        weakref.finalize(self, _remove_files, exe_file_name, self.__buffer_file_name + '.bin')
 
         # str variable for building cpp source
         source = str()
 
         # add headers and defining of main function
-        source += '#include <stdio.h>\n#include <stdlib.h>\n#include <iostream>\n#include <fstream>\n#include <string>\n#include <vector>\n\n#define N 50\n\nusing namespace std;\n\n'
+        source += f'#define N {_ARRAY_SIZE}\n\n'
+
+        # add declarations of runtime (functions for mapping of buffer are in prebuilt object file)
+        source += _RUNTIME_HEADER
 
         # count for indexing in assembly insertion like %i
         count = 0
@@ -116,17 +320,13 @@ class Function(object):
             if not isinstance(output_var, Variable):
                 raise TypeError('Output variable is not of type asm.variable.Variable.')
 
+            # output array is declared with length of its value, so its length is known before call
+            if output_var._is_array() and not output_var.has_value():
+                raise ValueError('Output array variable should have value (length of value is length of output array).')
+
             # set index for variable
             output_var._set_index(count) 
 
-            # add defining of the variable to source
-            source += output_var._to_str()
-
-            # add cpp function
-            exec(f'from asm.__to_str import {output_var._to_str_func()}\nfunc = {output_var._to_str_func()}', globals())
-
-            source += func + '\n'
-
             # add variable to output variables list
             output_row += output_var._name() + ')'
         else:
@@ -146,12 +346,6 @@ class Function(object):
             if var.has_value():
                 raise TypeError('Input variable can not have a value.')
 
-            # add cpp function
-            exec(f'from asm.__from_str import {var._from_str_func()}\nfunc = {var._from_str_func()}', globals())
-
-            if func not in source:
-                source += func + '\n'
-
             # set index for variable
             var._set_index(count)
 
@@ -178,17 +372,22 @@ class Function(object):
             count += 1
 
         # add defining main function
-        source += 'int main()\n{\nstring line;\n'
+        source += 'int main()\n{\nsize_t size;\n'
 
-        # add reading buffer 
-        source += f'ifstream buffer;\nbuffer.open("{self.__buffer_file_name + ".txt"}");\n\n'
-            
-        # add reading of input variables from command-line arguments
-        for var in self.__input_vars:
-            source += var._to_str_input()
+        # add mapping of buffer (backslashes of path are escaped in C string)
+        buffer_path = (self.__buffer_file_name + '.bin').replace('\\', '\\\\')
+
+        source += f'char * buffer = map_buffer("{buffer_path}", &size);\n'
+        source += 'if (buffer == NULL) return 1;\n'
+        source += 'record * records = (record *)(buffer + sizeof(unsigned int));\n\n'
 
-        # add closing buffer file
-        source += 'buffer.close();\n'
+        # add reading of input variables from buffer (records of input variables are first)
+        for i, var in enumerate(self.__input_vars):
+            source += var._to_bin_input(i)
+
+        # output variable is defined after reading of input variables
+        if output_var is not None:
+            source += output_var._to_str()
 
         for var in local_vars:
             # add defining of the variable to source
@@ -215,16 +414,12 @@ class Function(object):
         # we already don't need this variable
         del asm_source
 
-        # add opening buffer file
-        source += '\nofstream f;\n'
-        source += f'f.open("{self.__buffer_file_name + ".txt"}");\n'
-
-        # add writing output to buffer file
+        # add writing output to buffer (record of output variable is last)
         if self.__output_var is not None:
-            source += 'f << ' + self.__output_var._to_str_output() + ' + \'\\n\';\n'
+            source += '\n' + self.__output_var._to_bin_output(len(self.__input_vars))
 
-        # add closing buffer file
-        source += 'f.close();\n'
+        # add unmapping of buffer
+        source += 'unmap_buffer(buffer, size);\n'
 
         # end of main function
         source += '}'
@@ -238,17 +433,24 @@ class Function(object):
     
     def __create_exe(self, source:str, delete_cpp=True) -> None:
         '''
-        This method compiles created .cpp file and deletes .cpp file.
+        This method compiles created .cpp file with prebuilt runtime and deletes .cpp file.
         '''
 
+        runtime_object = _runtime_object()
+
         # write source to .cpp file
         with open(self.__buffer_file_name + '.cpp', 'w') as f:
             f.write(source)
 
-        # compile .cpp file
-        # with intel assembly syntax and CPP-17
-        os.system(f'g++ -masm=intel -std=c++17  -o {self.__buffer_file_name}.exe {self.__buffer_file_name}.cpp') 
+        try:
+            # compile .cpp file
+            # with intel assembly syntax and CPP-17
+            result = run([_COMPILER, *_FLAGS, '-o', self.__buffer_file_name + '.exe', self.__buffer_file_name + '.cpp', runtime_object])
+
+            if result.returncode != 0:
 
-        # delete .cpp file
-        if delete_cpp:
-            os.remove(self.__buffer_file_name + '.cpp')
+                raise RuntimeError(f'Function could not be compiled. Error code: {result.returncode}. See details above.')
+        finally:
+            # delete .cpp file
+            if delete_cpp:
+                os.remove(self.__buffer_file_name + '.cpp')
@@ -0,0 +1,174 @@
+'''
+Metrics of calls of compiled functions and their export in Prometheus text format.
+
+Metrics are turned on for each function with Function.enable_metrics(name). Each function has counters
+of calls, processed elements and errors and histogram of latencies with log2 buckets (see asm._metrics).
+
+snapshot() returns counters of all instrumented functions.
+prometheus_text() returns them in Prometheus text format, write_prometheus(path) writes them to file
+(atomically, for textfile collector of node_exporter) and PrometheusExporter writes file periodically.
+
+Example:
+    import asm.metrics
+
+    f.enable_metrics('decode')
+    exporter = asm.metrics.PrometheusExporter('/var/lib/node_exporter/pyxasm.prom', interval=15)
+    exporter.start()
+
+    asm.metrics.snapshot()['decode']['calls']
+'''
+import os
+import threading
+from typing import Dict, List, Union
+
+from ._errors import ArgumentValueError
+from ._metrics import FunctionMetrics, _snapshot, _reset
+
+
+# names of metrics in Prometheus text format
+_PREFIX:str = 'pyxasm_function'
+
+
+def snapshot() -> Dict[str, dict]:
+    '''
+    Returns counters of all instrumented functions: name of function -> dict with keys
+    calls, elements, errors, total_ns and buckets (list of (upper bound in ns or None, number of calls)).
+    '''
+    return _snapshot()
+
+
+def reset() -> None:
+    '''
+    Removes metrics of all functions (functions with enabled metrics keep recording, but they are not exported
+    until Function.enable_metrics() is called again).
+    '''
+    _reset()
+
+
+def _label(name:str) -> str:
+    '''
+    Returns value of label in Prometheus text format (backslash, quote and new line are escaped).
+    '''
+    return name.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text() -> str:
+    '''
+    Returns metrics of all instrumented functions in Prometheus text format: counters
+    pyxasm_function_calls_total, pyxasm_function_elements_total, pyxasm_function_errors_total
+    and histogram pyxasm_function_latency_seconds with label function.
+    '''
+    functions:Dict[str, dict] = snapshot()
+    lines:List[str] = list()
+
+    for metric, description in (('calls', 'Number of calls of compiled function.'),
+                                ('elements', 'Number of elements processed by compiled function.'),
+                                ('errors', 'Number of calls of compiled function which raised exception.')):
+        lines.append(f'# HELP {_PREFIX}_{metric}_total {description}')
+        lines.append(f'# TYPE {_PREFIX}_{metric}_total counter')
+
+        for name, counters in functions.items():
+            lines.append(f'{_PREFIX}_{metric}_total{{function="{_label(name)}"}} {counters[metric]}')
+
+    lines.append(f'# HELP {_PREFIX}_latency_seconds Latency of calls of compiled function.')
+    lines.append(f'# TYPE {_PREFIX}_latency_seconds histogram')
+
+    for name, counters in functions.items():
+        label:str = _label(name)
+        cumulative:int = 0
+
+        # buckets of histogram in Prometheus are cumulative
+        for bound, count in counters['buckets']:
+            cumulative += count
+            le:str = '+Inf' if bound is None else repr(bound / 1e9)
+
+            lines.append(f'{_PREFIX}_latency_seconds_bucket{{function="{label}",le="{le}"}} {cumulative}')
+
+        lines.append(f'{_PREFIX}_latency_seconds_sum{{function="{label}"}} {counters["total_ns"] / 1e9!r}')
+        lines.append(f'{_PREFIX}_latency_seconds_count{{function="{label}"}} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path:str) -> None:
+    '''
+    Writes metrics of all instrumented functions in Prometheus text format to file.
+    File is replaced atomically, so collector does not read incomplete file.
+    '''
+    temporary_path:str = f'{path}.{os.getpid()}.tmp'
+
+    with open(temporary_path, 'w') as metrics_file:
+        metrics_file.write(prometheus_text())
+
+    os.replace(temporary_path, path)
+
+
+class PrometheusExporter(object):
+    '''
+    This class representes exporter, which writes metrics to file in Prometheus text format
+    every interval seconds in daemon thread (see write_prometheus()).
+
+    __init__(self, path:str, interval:float=15.0):
+        path - path to file with metrics.
+        interval - (default:15.0) interval between writes in seconds.
+
+    start(self) -> PrometheusExporter:
+        Starts thread of exporter.
+
+    stop(self) -> None:
+        Stops thread of exporter and writes metrics last time.
+
+    Exporter can be used as context manager.
+    '''
+
+    def __init__(self, path:str, interval:float=15.0):
+
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ArgumentValueError(f'Invalid interval of exporter (got {interval}, expected number > 0).')
+
+        self.path:str = path
+        self.interval:float = interval
+
+        self.__stopped:threading.Event = threading.Event()
+        self.__thread:Union[threading.Thread, None] = None
+
+
+    def __repr__(self) -> str:
+        return f"PrometheusExporter(path='{self.path}', interval={self.interval})"
+
+
+    def __enter__(self) -> 'PrometheusExporter':
+        return self.start()
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+    def start(self) -> 'PrometheusExporter':
+        if self.__thread is not None:
+            raise ArgumentValueError('Exporter is already started.')
+
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, name='pyxasm-metrics-exporter', daemon=True)
+        self.__thread.start()
+
+        return self
+
+
+    def stop(self) -> None:
+        if self.__thread is None:
+            return
+
+        self.__stopped.set()
+        self.__thread.join()
+        self.__thread = None
+
+        write_prometheus(self.path)
+
+
+    def __run(self) -> None:
+        while not self.__stopped.is_set():
+            write_prometheus(self.path)
+
+            self.__stopped.wait(self.interval)
@@ -1,49 +1,14 @@
-class Register(object):
-    '''
-    This class representes register.
+'''
+Registers for instructions of asm.Function.
 
-    You can create Register class instance by Register(name).
-    Parameter 'name' has to be str and has to be in Register.names() 
-    '''
+Each register is the interned instance of Register from asm._register, so registers from this module
+are the same objects as Register(name) and they are used in validation of operands and in clobber lists.
+'''
+from ._register import Register
 
-    __names = ['ah', 'al', 'ax', 'eax', 'dh', 'dl', 'dx', 
-               'edx', 'ch', 'cl', 'cx', 'ecx', 'bh', 'bl', 
-               'bx', 'ebx', 'bp', 'ebp', 'si', 'esi', 'di', 
-               'edi', 'sp', 'esp', 'mmx0', 'mmx1', 'mmx2', 
-               'mmx3', 'mmx4', 'mmx5', 'mmx6', 'mmx7']
 
-
-    def __init__(self, name:str) -> None:
-
-        # if name is not available name for register
-        if name in Register.__names:
-            self.__name = name
-        else:
-            raise NameError(f'Register {name} is unknown. Use Register.available_registers() to get all available names for registers.')
-
-
-    def __str__(self) -> str:
-        '''
-        Returns name of register.
-        '''
-        return self.__name
-
-    
-    def __repr__(self) -> str:
-        '''
-        Returns name of register.
-        '''
-        return self.__name
-
-
-    @classmethod
-    def available_registers(cls):
-        '''
-        Returns list with all available names for registers.
-        '''
-        return Register.__names
+__all__ = ['Register', *Register.available_names()]
 
 
 # define all registers
-for reg in Register.available_registers():
-    exec(f'{reg} = Register("{reg}")')
+globals().update({name: Register(name) for name in Register.available_names()})
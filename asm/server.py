@@ -0,0 +1,58 @@
+'''
+Local compile server shared by all Python processes of host (for example, by workers of gunicorn).
+
+Usage:
+    python -m asm.server [-s SOCKET] [-c CACHE] [-j JOBS]
+
+Server listens on Unix socket SOCKET (PYXASM_COMPILE_SERVER or server.sock in private directory of user
+$XDG_RUNTIME_DIR/pyxasm or pyxasm-UID in temporary directory by default) and compiles sources of functions
+with at most JOBS compiler processes. Shared libraries are cached in private directory CACHE (cache in private
+directory of user by default), identical jobs which are compiled at the same time are compiled once.
+
+Function.compile() uses server if its socket exists (path from PYXASM_COMPILE_SERVER, empty value disables server),
+otherwise function is compiled in process.
+'''
+import os
+import sys
+import signal
+import argparse
+
+from ._server import CompileServer, _default_cache, _socket_path, _runtime_directory, _private_directory
+
+
+def main(argv:list=None) -> int:
+    parser:argparse.ArgumentParser = argparse.ArgumentParser(prog='python -m asm.server')
+    parser.add_argument('-s', '--socket', default=None, help='path to Unix socket of server')
+    parser.add_argument('-c', '--cache', default=_default_cache(), help='directory of cached shared libraries')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='maximal number of compiler processes')
+
+    args:argparse.Namespace = parser.parse_args(argv)
+
+    socket_path:str = args.socket or _socket_path()
+
+    if socket_path is None:
+        parser.error('Unix sockets are not supported or server is disabled with empty PYXASM_COMPILE_SERVER, use --socket')
+
+    # default socket and cache are in private directory of user
+    if os.path.dirname(socket_path) == _runtime_directory() or args.cache == _default_cache():
+        _private_directory(_runtime_directory())
+
+    server:CompileServer = CompileServer(socket_path, args.cache, args.jobs)
+
+    # socket is removed when server is stopped with SIGTERM
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f'Compile server: {socket_path} (cache {args.cache}, jobs {args.jobs})', flush=True)
+
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
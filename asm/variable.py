@@ -1,6 +1,5 @@
-from asm.__type import Type
-from asm.__checking import *
-from asm.__convertations import *
+import struct
+from array import array
 
 # TODO: add types of char, char[], char[][] and 2d numeral arrays.
 
@@ -9,32 +8,33 @@ class Variable(object):
     This class representes variable.
     '''
 
-    # available types
-    __types = {'int':                   Type('int', 'num_to_str', 'str_to_num', int, check_int),
-               'short int':             Type('short int', 'num_to_str', 'str_to_num', int, check_int),
-               'unsigned short int':    Type('unsigned short int', 'str_to_num', 'str_to_un_short', int, check_int),
-               'unsigned int':          Type('unsigned int', 'num_to_str', 'str_to_num', int, check_int),
-               'long int':              Type('long int', 'num_to_str', 'str_to_num', int, check_int),
-               'unsigned long int':     Type('unsigned long int', 'num_to_str', 'str_to_num', int, check_int),
-               'long long int':         Type('long long int', 'num_to_str', 'str_to_num', int, check_int),
-               'unsigned long long int':Type('unsigned long long int', 'num_to_str', 'str_to_num', int, check_int),
- 
+    # available types: name of type -> (CPP type, format character of modules struct and array for values in binary buffer)
+    # values are checked by packing them with their format (struct and array check type and range of value)
+    __types = {'int':                       ('int', 'i'),
+               'short int':                 ('short int', 'h'),
+               'unsigned short int':        ('unsigned short int', 'H'),
+               'unsigned int':              ('unsigned int', 'I'),
+               'long int':                  ('long int', 'l'),
+               'unsigned long int':         ('unsigned long int', 'L'),
+               'long long int':             ('long long int', 'q'),
+               'unsigned long long int':    ('unsigned long long int', 'Q'),
+
                # int array types
-               'int[]':                     Type('int []', 'num_arr_to_str', 'str_to_int_arr', arr, check_int_arr),
-               'short int[]':               Type('short int []', 'num_arr_to_str', 'str_to_short_int_arr', arr, check_int_arr),
-               'unsiged short int[]':       Type('unsidned short int []', 'num_arr_to_str', 'str_to_un_short_int_arr', arr, check_int_arr),
-               'unsigned int[]':            Type('unsigned int []', 'num_arr_to_str', 'str_to_un_int_arr', arr, check_int_arr),
-               'long int[]':                Type('long int []', 'num_arr_to_str', 'str_to_long_int_arr', arr, check_int_arr),
-               'unsigned long int[]':       Type('unsigned long int []', 'num_arr_to_str', 'str_to_us_long_int_arr', arr, check_int_arr),
-               'long long int[]':           Type('long long int []', 'num_arr_to_str', 'str_to_long_long_int_arr', arr, check_int_arr),
-               'unsigned long long int[]':  Type('unsigned long long int []', 'num_arr_to_str', 'str_to_un_long_long_int_arr', arr, check_int_arr),
-  
+               'int[]':                     ('int', 'i'),
+               'short int[]':               ('short int', 'h'),
+               'unsigned short int[]':      ('unsigned short int', 'H'),
+               'unsigned int[]':            ('unsigned int', 'I'),
+               'long int[]':                ('long int', 'l'),
+               'unsigned long int[]':       ('unsigned long int', 'L'),
+               'long long int[]':           ('long long int', 'q'),
+               'unsigned long long int[]':  ('unsigned long long int', 'Q'),
+
                # float and double types
-               'float':      Type('float', 'num_to_str', 'str_to_float', float, check_float),
-               'double':     Type('double', 'num_to_str', 'str_to_double', float, check_float),
-               'float[]':    Type('float []', 'num_arr_to_str', 'str_to_float_arr', arr, check_float_arr),
-               'double[]':   Type('double []', 'num_arr_to_str', 'str_to_double_arr', arr, check_float_arr),
-              }  
+               'float':                     ('float', 'f'),
+               'double':                    ('double', 'd'),
+               'float[]':                   ('float', 'f'),
+               'double[]':                  ('double', 'd'),
+              }
 
 
     def __init__(self, dtype:str, value=None):
@@ -47,12 +47,13 @@ class Variable(object):
         if not dtype in Variable.__types:
             raise ValueError(f'Unknown type {dtype}. To get all available types, use Variable.available_types().')
 
-        self.__type = Variable.__types[dtype]
+        # name of type for binary buffer
+        self.__dtype = dtype
 
         # check user's input for variable
         if value is not None:
-            # this function raises exceptions, if value is wrong for dtype
-            value = self.__type._check(value)
+            # this method raises exceptions, if value is wrong for dtype
+            value = self.__check(value)
 
         self.__value = value
 
@@ -74,13 +75,31 @@ class Variable(object):
         return self.__str__()
 
 
+    def __check(self, value):
+        '''
+        Checks value of variable by packing it to binary representation. Returns value (list for arrays).
+        '''
+        if self._is_array():
+            if not isinstance(value, (list, tuple)):
+                raise TypeError(f'Value of variable with type {self.__dtype} should be list or tuple.')
+
+            value = list(value)
+
+        try:
+            self._pack(value)
+        except (TypeError, OverflowError, struct.error) as error:
+            raise ValueError(f'Invalid value for variable with type {self.__dtype}: {error}.') from None
+
+        return value
+
+
     def _to_str(self) -> str:
         '''
         Returns string representation of defining variable in CPP.
         '''
 
         # copy dtype name to other variable
-        type_name = self.__type._name()
+        type_name = self._c_type() + ('[]' if self._is_array() else '')
 
         # TODO: rename string_representation variable
 
@@ -91,6 +110,9 @@ class Variable(object):
             # if variable is 2d array:
             if type_name.endswith('[][]'): 
                 string_representation = f'{type_name[:-4]} a{self.__index}[N][N]'
+            # array with value has length of value, array without value has N elements
+            elif self.has_value():
+                string_representation = f'{type_name[:-2]} a{self.__index}[{len(self.__value)}]'
             else:
                 string_representation = f'{type_name[:-2]} a{self.__index}[N]'
         # if variable is not array
@@ -136,76 +158,111 @@ class Variable(object):
         return string_representation
 
 
-    def _to_str_input(self) -> str:
+    def _is_array(self) -> bool:
         '''
-        This method builds string representation of reading input variable from buffer file.
+        Returns True if variable is array.
         '''
+        return self.__dtype.endswith('[]')
 
-        # str variable for building command
-        # TODO: change name of this variable
-        reading_str = f'getline(buffer, line);\n'
 
-        # if variable is array
-        if self.__type._name().endswith('[]'):
-            
-            # if variable is 2d array
-            if self.__type._name().endswith('[][]'):
-                # string like 'int n1_a1; int n2_a1; int ** a1 = str_to_num_2d_arr<int>(a1, n1_a1, n2_a2);'
-                reading_str += 'int n1_a' + self._name() + '; int n2_a' + self._name() + ';\n'
-                reading_str += self.__type._name()[:-4] + ' ** a' + self._name()
-                reading_str += ' = ' + self.__type._from_str() + '<' + self.__type._name()[::-4] + '>(line, n1_a' + self._name() + 'n2_a' + self._name() + ');\n' 
-            # if variable is 1d array
-            else:
-                reading_str += 'int n_a' + self._name() + ';\n'
-                reading_str += ' = ' + self.__type._from_str() + '<' + self.__type._name()[::-4] + '>(line, n1_a' + self._name() + ');\n'  
-        # if variable is not array
-        else:
-            reading_str += self.__type._name() + ' ' + self._name() + ' = ' + self.__type._from_str() + '<' + self.__type._name() + '>(line);\n'
+    def _format(self) -> str:
+        '''
+        Returns format character of modules struct and array for one element of variable.
+        '''
+        # the same format for array and its elements
+        return Variable.__types[self.__dtype][1]
 
-        return reading_str
+
+    def _dtype_code(self) -> int:
+        '''
+        Returns code of type in header of binary buffer (index of type in Variable.available_types()).
+        '''
+        return list(Variable.__types.keys()).index(self.__dtype)
 
 
-    def _to_str_output(self):
+    def _c_type(self) -> str:
         '''
-        This method builds string representation of writing output variable to .txt file
+        Returns CPP type of variable or of elements of array variable.
         '''
+        return Variable.__types[self.__dtype][0]
 
-        var_name = f'a{(self.__index)}'
 
-        # variable is array
-        if self.__type._name().endswith('[]'):
-            # variable is 2d array
-            if self.__type._name().endswith('[][]'):
-                # string like num_arr_2d_to_str(a1, n1_a1, n2_a1);
-                return f'{self.__type._to_str()}({var_name}, n1_{var_name}, n2_{var_name})'
-            # variable is 1d array
-            else:
-                # string like num_arr_to_str(a1, n_a1);
-                return f'{self.__type._to_str()}({var_name}, n_{var_name})'
+    def _size(self, length:int) -> int:
+        '''
+        Returns size of value in binary buffer in bytes (length is number of elements of array).
+        '''
+        return struct.calcsize(self._format()) * length
 
-        # string like num_to_arr(a1);
-        return f'{self.__type._to_str()}({var_name})'
 
-    
-    def _from_str_func(self):
+    def _pack(self, value) -> bytes:
         '''
-        Returns name of CPP function for converting string to CPP object.
+        Returns binary representation of value for buffer.
         '''
-        return self.__type._from_str()
+        if self._is_array():
+            return array(self._format(), value).tobytes()
 
-    
-    def _to_str_func(self):
+        return struct.pack(self._format(), value)
+
+
+    def _unpack(self, buffer, offset:int, length:int):
         '''
-        Returns name of CPP function for converting CPP object to its string representation.
+        Reads value of variable from binary buffer (length is number of elements of array).
+        Returns Python object.
         '''
-        return self.__type._to_str()
+        if self._is_array():
+            return array(self._format(), buffer[offset:offset + self._size(length)]).tolist()
 
-    
-    def _to_type(self):
+        return struct.unpack_from(self._format(), buffer, offset)[0]
+
+
+    def _to_bin_input(self, record:int) -> str:
+        '''
+        This method builds string representation of reading input variable from binary buffer
+        with given index of its record in header.
+        Arrays are not copied: variable is pointer to buffer.
+        '''
+
+        var_name = self._name()
+        c_type = self._c_type()
+
+        # check of dtype code, which is written by Python
+        reading_str = f'if (records[{record}].dtype != {self._dtype_code()}) return 2;\n'
+
+        # if variable is array
+        if self._is_array():
+            # string like 'int * a1 = (int *)(buffer + records[0].offset); int n_a1 = records[0].length;'
+            reading_str += f'{c_type} * {var_name} = ({c_type} *)(buffer + records[{record}].offset);\n'
+            reading_str += f'int n_{var_name} = records[{record}].length;\n'
+        # if variable is not array
+        else:
+            reading_str += f'{c_type} {var_name} = *({c_type} *)(buffer + records[{record}].offset);\n'
+
+        return reading_str
+
+
+    def _to_bin_output(self, record:int) -> str:
+        '''
+        This method builds string representation of writing output variable to binary buffer
+        with given index of its record in header.
+        '''
+
+        var_name = self._name()
+
+        # variable is array: write its length to record and copy its elements
+        if self._is_array():
+            writing_str = f'records[{record}].length = sizeof({var_name}) / sizeof({var_name}[0]);\n'
+            writing_str += f'memcpy(buffer + records[{record}].offset, {var_name}, sizeof({var_name}));\n'
+
+            return writing_str
+
+        return f'*({self._c_type()} *)(buffer + records[{record}].offset) = {var_name};\n'
+
+
+    def _length(self) -> int:
         '''
-        Returns function for converting string to Python object.
+        Returns number of elements of value of array variable.
         '''
-        return self.__type._to_type()
+        return len(self.__value)
 
 
     def has_value(self) -> bool:
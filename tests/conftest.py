@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# tests import package from repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def compiler(tmp_path_factory):
+    '''
+    Skips test if functions can not be compiled on this host (compiler or libraries of 32-bit target are not available).
+    '''
+    from asm import Function, Variable, Type, CompilationError
+    from asm._instructions import mov
+    from asm.registers import eax
+
+    a, c = Variable(Type('int')), Variable(Type('int'))
+    cwd:str = os.getcwd()
+
+    # source file of unsuccessful compilation is kept in working directory
+    os.chdir(tmp_path_factory.mktemp('compiler'))
+
+    try:
+        Function([mov(eax, a), mov(c, eax)]).compile([a], [], [c])
+    except CompilationError:
+        pytest.skip('functions can not be compiled on this host')
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,97 @@
+from array import array
+from ctypes import c_int, addressof
+
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm._type import _c_strides, _ctypes_shape
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+def test_layout_helpers():
+    assert _c_strides((2, 3, 4), 4) == (48, 16, 4)
+    assert _c_strides((), 4) == ()
+    assert _ctypes_shape(((c_int * 3) * 2)()) == (2, 3)
+
+
+def test_nested_lists_are_converted():
+    matrix = Array(Array(Type('short'), 3), 2)
+
+    value, shape, strides = matrix._marshal([[1, 2, 3], [4, 5, 6]])
+
+    assert [list(row) for row in value] == [[1, 2, 3], [4, 5, 6]]
+    assert (shape, strides) == ((2, 3), (6, 2))
+
+
+def test_writable_buffers_are_not_copied():
+    buffer = array('i', [1, 2, 3, 4])
+
+    value, shape, strides = Array(Type('int'), None)._marshal(buffer)
+
+    assert addressof(value) == buffer.buffer_info()[0]
+    assert (shape, strides) == ((4, ), (4, ))
+
+
+def test_read_only_buffers_are_copied():
+    data = b'abc'
+
+    value, shape, strides = Array(Type('char'), 3)._marshal(data)
+
+    assert bytes(value) == data
+    assert shape == (3, )
+
+
+def test_buffers_are_checked():
+    with pytest.raises(ArgumentTypeError):
+        Array(Type('short'), 4)._marshal(array('i', [1, 2, 3, 4]))
+
+    with pytest.raises(ArgumentValueError):
+        Array(Type('int'), 5)._marshal(array('i', [1, 2, 3, 4]))
+
+    with pytest.raises(ArgumentValueError):
+        Array(Array(Type('int'), 2), 2)._marshal(array('i', [1, 2, 3, 4]))
+
+
+def test_layout_variables():
+    strided = Variable(Array(Array(Type('int'), None), None, contiguous=False))
+
+    assert strided.shape() == strided.shape()
+    assert strided._layout_variables() == (strided.shape(), strided.strides())
+    assert Variable(Array(Type('int'), 4))._layout_variables() == ()
+
+    with pytest.raises(ArgumentTypeError):
+        Variable(Array(Type('int'), 4)).shape()
+
+
+def test_numpy_views():
+    numpy = pytest.importorskip('numpy')
+
+    matrix = numpy.arange(12, dtype=numpy.int32).reshape(3, 4)
+    column = matrix[:, 1]
+
+    value, shape, strides = Array(Type('int'), None, contiguous=False)._marshal(column)
+
+    # strided view is passed without copying
+    assert value.value == column.ctypes.data
+    assert (shape, strides) == ((3, ), (16, ))
+
+    value, shape, strides = Array(Type('int'), None)._marshal(column)
+
+    assert strides == (4, )
+
+    with pytest.raises(ArgumentValueError):
+        Array(Type('short'), None)._marshal(numpy.array([2 ** 20]))
+
+
+def test_arrays_of_compiled_function(compiler):
+    a = Variable(Array(Array(Type('int'), None), None, contiguous=False))
+
+    # shape and strides of array are passed with pointer to data
+    f = Function([])
+    f.compile([a], [], [])
+
+    assert f([[1, 2], [3, 4]]) == ()
+    assert f(memoryview(array('i', [1, 2, 3, 4])).cast('B').cast('i', (2, 2))) == ()
+
+    with pytest.raises(ArgumentValueError):
+        f(array('i', [1, 2]))
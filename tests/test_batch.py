@@ -0,0 +1,71 @@
+from array import array
+from ctypes import c_int
+
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._batch import _batch_source, _column
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+def test_batch_source():
+    a, b, c = Variable(Type('int')), Variable(Type('short')), Variable(Type('int'))
+    source = _batch_source([c, a, b], [['o'], ['i'], []], '__asm__("nop;");')
+
+    assert f'void batch_function(long long pyxasm_n, int pyxasm_threads, int * out_{c._name()}, int * in_{a._name()}, short local_{b._name()})' in source
+    assert f'int * {c._name()} = &value_{c._name()};' in source
+    assert f'out_{c._name()}[pyxasm_i] = value_{c._name()};' in source
+    assert 'omp' not in source
+
+
+def test_parallel_batch_source():
+    a = Variable(Type('int'))
+    source = _batch_source([a], [['i', 'o']], '__asm__("nop;");', parallel=True, schedule='dynamic')
+
+    assert source.startswith('#include <omp.h>')
+    assert '#pragma omp parallel for schedule(dynamic)' in source
+    assert f'int value_{a._name()} = in_{a._name()}[pyxasm_i];' in source
+
+    with pytest.raises(ArgumentValueError):
+        _batch_source([a], [['i']], '', schedule='auto')
+
+    with pytest.raises(ArgumentTypeError):
+        _batch_source([Variable(Array(Type('int'), 2))], [['i']], '')
+
+
+def test_columns():
+    buffer = array('i', [1, 2, 3])
+
+    # buffer with the same format is not copied
+    column = _column(c_int, buffer, 3)
+    column[0] = 10
+    assert buffer[0] == 10
+
+    assert list(_column(c_int, [4, 5], 2)) == [4, 5]
+
+    with pytest.raises(ArgumentValueError):
+        _column(c_int, [1, 2], 3)
+
+    with pytest.raises(ArgumentTypeError):
+        _column(c_int, [0, 0, 0], 3, writable=True)
+
+
+def test_batch_of_compiled_function(compiler):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    assert list(f.batch(array('i', range(100)))[0]) == list(range(1, 101))
+
+    out = array('i', [0] * 3)
+    assert f.batch([1, 2, 3], out=[out]) == (out, )
+    assert list(out) == [2, 3, 4]
+
+    columns = f.batch(array('i', range(1000)), parallel=True, threads=4, schedule='guided')
+    assert list(columns[0]) == list(range(1, 1001))
+
+    with pytest.raises(ArgumentValueError):
+        f.batch()
@@ -0,0 +1,50 @@
+import pytest
+
+from asm import Function, Variable, Type
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._benchmark import BenchmarkResult, _benchmark_source
+from asm._errors import ArgumentValueError
+
+
+def test_measured_block_is_volatile():
+    source = _benchmark_source('int a1, int * a2', '__asm__(\n"add eax, 1;"\n);')
+
+    assert '__asm__ __volatile__(\n"add eax, 1;"' in source
+    assert 'void benchmark_function(int a1, int * a2, unsigned long long pyxasm_n, unsigned long long * pyxasm_cycles)' in source
+    assert 'void overhead_function(unsigned long long pyxasm_n, unsigned long long * pyxasm_cycles)' in source
+    assert 'void empty_function(int a1, int * a2){}' in source
+
+
+def test_benchmark_source_without_parameters():
+    source = _benchmark_source('', '__asm__("nop;");')
+
+    assert 'void benchmark_function(unsigned long long pyxasm_n' in source
+    assert 'void empty_function(){}' in source
+
+
+def test_statistics_of_result():
+    result = BenchmarkResult([12, 10, 14, 11, 9], timer_overhead=10, call_overhead_ns=50.0)
+
+    # overhead is subtracted, negative values are clamped
+    assert result.cycles == (2, 0, 4, 1, 0)
+    assert result.repeat == 5
+    assert (result.min, result.max, result.median, result.mean) == (0, 4, 1.0, 1.4)
+    assert result.percentiles[50] == 1
+    assert result.percentiles[99] == 4
+
+    assert BenchmarkResult([1, 2, 3, 4], 0, 0.0).median == 2.5
+
+
+def test_benchmark_of_compiled_function(compiler):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+    f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    result = f.benchmark(1, repeat=50, warmup=5)
+
+    assert result.repeat == 50
+    assert result.min <= result.median <= result.max
+
+    with pytest.raises(ArgumentValueError):
+        f.benchmark(1, repeat=0)
@@ -0,0 +1,88 @@
+from threading import Thread
+
+import pytest
+
+from asm import Function, Variable, Type
+from asm.registers import eax
+from asm._instructions import mov, add, sub
+from asm._errors import ArgumentTypeError, ArgumentValueError, FunctionIsNotCompiledError
+
+
+a, b, c = Variable(Type('int')), Variable(Type('int')), Variable(Type('int'))
+
+
+def _difference(backend:str='ctypes') -> Function:
+    f = Function([mov(eax, a), sub(eax, b), mov(c, eax)])
+    f.compile([a, b], [], [c], backend=backend)
+
+    return f
+
+
+def test_function_should_be_compiled():
+    with pytest.raises(FunctionIsNotCompiledError):
+        Function([mov(eax, a)]).bind({0: 1})
+
+
+def test_fixed_arguments(compiler):
+    f = _difference()
+
+    assert f.bind({0: 10})(3) == (7, )
+    assert f.bind({b: 10})(3) == (-7, )
+    assert f.bind({a: 5, b: 2})() == (3, )
+    assert f.bind()(5, 2) == (3, )
+
+
+def test_invalid_fixed_arguments(compiler):
+    f = _difference()
+
+    with pytest.raises(ArgumentValueError):
+        f.bind({2: 1})
+
+    with pytest.raises(ArgumentValueError):
+        f.bind({c: 1})
+
+    with pytest.raises(ArgumentValueError):
+        f.bind({0: 1, a: 2})
+
+    with pytest.raises(ArgumentTypeError):
+        f.bind({True: 1})
+
+    with pytest.raises(ArgumentTypeError):
+        f.bind([1])
+
+    with pytest.raises(ArgumentValueError):
+        f.bind({0: 1})(1, 2)
+
+
+def test_fixed_input_and_output(compiler):
+    # fixed value of variable, which is input and output, is restored before each call
+    f = Function([add(a, b)])
+    f.compile([a, b], [], [a])
+
+    accumulate = f.bind({a: 100})
+
+    assert accumulate(1) == (101, )
+    assert accumulate(2) == (102, )
+
+
+def test_threads_have_own_outputs(compiler):
+    subtract = _difference().bind({b: 1})
+    results = dict()
+
+    def run(start):
+        results[start] = [subtract(x)[0] for x in range(start, start + 500)]
+
+    threads = [Thread(target=run, args=(start, )) for start in (0, 1000, 2000)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    for start, values in results.items():
+        assert values == [x - 1 for x in range(start, start + 500)]
+
+
+def test_extension_backend(compiler):
+    assert _difference('extension').bind({1: 4})(10) == (6, )
@@ -0,0 +1,94 @@
+import os
+import json
+
+import pytest
+
+from asm import Function, Variable, Type, Array, build_bundle
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._bundle import _checksum, _describe_variable, _restore_variable, _read_bundle
+from asm._errors import ArgumentTypeError, ArgumentValueError, ChecksumError
+
+
+class _Entry(object):
+    '''
+    This class representes object with entry of bundle (like compiled Function).
+    '''
+
+    def _bundle_entry(self) -> tuple:
+        asm = '__asm__("nop;");'
+
+        return {'asm': asm, 'checksum': _checksum(asm)}, b'library ' + _checksum(asm).encode('ascii')
+
+
+def test_variables_round_trip():
+    for var in (Variable(Type('int'), 5),
+                Variable(Type('char'), b'a', trusted=True),
+                Variable(Array(Array(Type('char'), 2), 2), [[b'a', b'b'], [b'c', b'd']]),
+                Variable(Array(Type('double'), 3, contiguous=False))):
+        restored = _restore_variable(json.loads(json.dumps(_describe_variable(var))))
+
+        assert restored._name() == var._name()
+        assert str(restored._type()) == str(var._type())
+        assert _describe_variable(restored) == _describe_variable(var)
+
+
+def test_manifest_round_trip(tmp_path):
+    path = build_bundle({'kernel': _Entry()}, str(tmp_path))
+
+    entry, library = _read_bundle(path, 'kernel')
+
+    assert entry['library'] == 'kernel.so'
+    assert library == _Entry()._bundle_entry()[1]
+
+    with pytest.raises(ArgumentValueError):
+        _read_bundle(path, 'other')
+
+    with pytest.raises(ArgumentValueError):
+        _read_bundle(str(tmp_path / 'missing'), 'kernel')
+
+
+def test_tampered_manifest(tmp_path):
+    path = build_bundle({'kernel': _Entry()}, str(tmp_path))
+    manifest_filename = os.path.join(path, 'manifest.json')
+
+    with open(manifest_filename) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    # source of assembly insertion is changed without its checksum
+    manifest['functions']['kernel']['asm'] = '__asm__("int3;");'
+
+    with open(manifest_filename, 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    with pytest.raises(ChecksumError):
+        _read_bundle(path, 'kernel')
+
+
+def test_tampered_library(tmp_path):
+    path = build_bundle({'kernel': _Entry()}, str(tmp_path))
+
+    with open(os.path.join(path, 'kernel.so'), 'ab') as library_file:
+        library_file.write(b'\x00')
+
+    with pytest.raises(ChecksumError):
+        _read_bundle(path, 'kernel')
+
+
+def test_invalid_functions(tmp_path):
+    with pytest.raises(ArgumentValueError):
+        build_bundle({'not name': _Entry()}, str(tmp_path))
+
+    with pytest.raises(ArgumentTypeError):
+        build_bundle({'kernel': object()}, str(tmp_path))
+
+
+def test_load_compiled_function(compiler, tmp_path):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    path = build_bundle({'add_one': f}, str(tmp_path))
+
+    assert Function.load(path, 'add_one')(1) == (2, )
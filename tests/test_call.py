@@ -0,0 +1,105 @@
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm.registers import eax, ebx, esp, ax
+from asm._instructions import mov, add, call
+from asm._call import Routine, _check_operand, _routines
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+class _Callee(object):
+    '''
+    This class representes compiled function for Routine (it returns signature like Function._callee()).
+    '''
+
+    def __init__(self, variables:list, roles:list, inputs:list, syntax:str='intel'):
+        self.signature = (variables, roles, inputs, '__asm__("nop;");', {}, syntax)
+
+    def _callee(self) -> tuple:
+        return self.signature
+
+
+def test_thunk_of_routine():
+    a, b, c = Variable(Type('int')), Variable(Type('float'), float('inf')), Variable(Type('int'))
+    routine = Routine(_Callee([c, a, b], [['o'], ['i'], []], [1]))
+
+    assert (routine._inputs, routine._outputs) == (1, 1)
+    assert repr(routine).startswith('pyxasm_thunk_')
+
+    source = routine._sources[repr(routine)]
+
+    assert source.startswith('#include <math.h>\n')
+    assert f'{b._definition()} = HUGE_VAL;' in source
+    assert f'({a._definition()}, {c._definition(with_pointer=True)})' in source
+
+    # thunk is placed in section of code and section of compiler is restored after it
+    assert '".pushsection .text\\n"\n".p2align 4\\n"\n' in source
+    assert source.rstrip().endswith('".popsection\\n"\n);')
+    assert '"mov eax, DWORD PTR [ebp+8]\\n"' in source
+
+
+def test_thunk_in_att_syntax():
+    a = Variable(Type('int'))
+    routine = Routine(_Callee([a], [['i']], [0], syntax='att'))
+
+    # operands are in AT&T order
+    assert '"mov 8(%ebp), %eax\\n"' in routine._sources[repr(routine)]
+
+
+def test_the_same_function_has_one_thunk():
+    a = Variable(Type('int'))
+
+    assert repr(Routine(_Callee([a], [['i']], [0]))) == repr(Routine(_Callee([a], [['i']], [0])))
+
+
+def test_unsupported_variables():
+    with pytest.raises(ArgumentTypeError):
+        Routine(_Callee([Variable(Type('short'))], [['i']], [0]))
+
+    with pytest.raises(ArgumentTypeError):
+        Routine(_Callee([Variable(Type('int'))], [['i', 'o']], [0]))
+
+    with pytest.raises(ArgumentTypeError):
+        Routine(_Callee([Variable(Array(Type('int'), 2))], [['o']], []))
+
+    with pytest.raises(ArgumentTypeError):
+        Routine(_Callee([Variable(Array(Type('int'), 2))], [[]], []))
+
+
+def test_operands_of_call():
+    _check_operand(eax, 0, False)
+    _check_operand(1, 0, False)
+    _check_operand(Variable(Type('int')), 0, True)
+
+    with pytest.raises(ArgumentTypeError):
+        _check_operand(1, 0, True)
+
+    with pytest.raises(ArgumentTypeError):
+        _check_operand(ax, 0, False)
+
+    with pytest.raises(ArgumentTypeError):
+        _check_operand(esp, 0, False)
+
+    with pytest.raises(ArgumentTypeError):
+        call(_Callee([], [], []))
+
+
+def test_syntax_of_routines():
+    routine = Routine(_Callee([Variable(Type('int'))], [['i']], [0], syntax='att'))
+
+    assert repr(routine) in _routines([eax, routine], 'att')
+
+    with pytest.raises(ArgumentValueError):
+        _routines([routine], 'intel')
+
+
+def test_call_is_expanded(compiler):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    add_one = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    add_one.compile([a], [], [c])
+
+    stream = call(add_one, eax, ebx)
+    source = stream._source()
+
+    assert source.splitlines() == ['"sub esp, 4;"', '"push eax;"', f'"call {repr(stream._operands[3])};"', '"add esp, 4;"', '"pop ebx;"']
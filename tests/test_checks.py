@@ -0,0 +1,71 @@
+import warnings
+
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm._instructions import mov
+from asm._warns import TypeRangeWarning
+from asm._errors import ArgumentTypeError
+
+
+def test_array_is_checked_with_one_warning():
+    with pytest.warns(TypeRangeWarning) as record:
+        Type('short')._check_values([1, 40000, -40000, 2])
+
+    assert len(record) == 1
+    assert '2 of 4 elements' in str(record[0].message)
+
+
+def test_types_of_elements_are_checked():
+    with pytest.raises(ArgumentTypeError):
+        Type('int')._check_values([1, 2.5])
+
+    with pytest.raises(ArgumentTypeError):
+        Type('double')._check_values([1.5, 'a'])
+
+    with pytest.raises(ArgumentTypeError):
+        Type('char')._check_values([b'a', 'b'])
+
+    with pytest.raises(ArgumentTypeError):
+        Type('char')._check_values([b'a', b'bc'])
+
+    Type('double')._check_values([1, 2.5])
+    Type('char')._check_values([b'a', b'b'])
+    Type('int')._check_values([])
+
+
+def test_nested_arrays_are_checked():
+    with pytest.raises(ArgumentTypeError):
+        Variable(Array(Array(Type('int'), 2), 2), [[1, 2], [3, 'x']])
+
+    with pytest.warns(TypeRangeWarning):
+        Variable(Array(Array(Type('unsigned short'), 2), 2), [[1, 2], [3, -1]])
+
+
+def test_trusted_values_are_not_checked():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+
+        Variable(Array(Type('short'), 2), [1, 40000], trusted=True)
+        Array(Type('short'), 2)._marshal([1, 40000], trusted=True)
+
+    with pytest.raises(TypeError):
+        Variable(Type('int'), 'x', trusted=True)
+
+
+def test_trusted_function(compiler):
+    a, c = Variable(Type('short')), Variable(Type('short'))
+
+    checked = Function([mov(c, a)])
+    checked.compile([a], [], [c])
+
+    trusted = Function([mov(c, a)])
+    trusted.compile([a], [], [c], trusted=True)
+
+    with pytest.warns(TypeRangeWarning):
+        checked(40000)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+
+        assert trusted(40000) == (40000 - 65536, )
@@ -0,0 +1,80 @@
+import pytest
+
+from asm import Function
+from asm.registers import eax, ebx, ecx, edx, ah
+from asm._instructions import add, imul, jmp
+from asm._variable import Variable
+from asm._type import Type
+from asm._base_intruction import Label
+from asm._program import Program
+from asm._estimate import available_profiles, _ports, _resource
+from asm._errors import ArgumentValueError
+
+
+def test_independent_instructions_are_bound_by_ports():
+    estimate = Function([add(eax, 1), add(ebx, 1), add(ecx, 1), add(edx, 1)]).estimate('skylake')
+
+    assert estimate.instructions == 4
+    assert estimate.uops == 4
+    assert estimate.cycles == 1.0
+    assert estimate.port_pressure == {'p0': 1.0, 'p1': 1.0, 'p5': 1.0, 'p6': 1.0}
+
+
+def test_dependency_chain_is_bound_by_latency():
+    estimate = Function([imul(eax, ebx), imul(eax, ebx), imul(eax, ebx)]).estimate('skylake')
+
+    assert estimate.instructions == 3
+    assert estimate.cycles == 12.0
+    assert estimate.latency == 12
+    assert estimate.bottleneck == 'latency'
+    assert estimate.port_pressure == {'p1': 3.0, 'p5': 3.0}
+    assert len(estimate.critical_chain) == 3
+
+
+def test_bodies_of_labels_are_estimated():
+    loop = Label([imul(eax, ebx), imul(eax, ebx), imul(eax, ebx), jmp(Label([add(ebx, 1)]))])
+    estimate = Function([jmp(loop)]).estimate()
+
+    # jmp, three imul, jmp and add from nested label
+    assert estimate.instructions == 6
+    assert estimate.cycles == 12.0
+
+
+def test_definitions_of_labels_are_not_instructions():
+    program = Program()
+    top = program.label()
+
+    program.place(top)
+    program.add(eax, ebx)
+    program.jmp(top)
+
+    assert Function(program).estimate().instructions == 2
+
+
+def test_profiles():
+    assert {'skylake', 'zen2', 'generic'} <= set(available_profiles())
+
+    with pytest.raises(ArgumentValueError):
+        Function([add(eax, 1)]).estimate('pentium')
+
+    with pytest.raises(ArgumentValueError):
+        Function([add(eax, 1)]).estimate(iterations=1)
+
+
+def test_implicit_registers_of_forms():
+    # one-operand imul writes edx, so add depends on it
+    assert len(Function([imul(ebx), add(edx, 1)]).estimate().critical_chain) == 2
+    assert len(Function([imul(eax, ebx), add(edx, 1)]).estimate().critical_chain) == 1
+
+
+def test_resources_and_ports():
+    a = Variable(Type('int'))
+
+    assert _ports('p0156') == ('p0', 'p1', 'p5', 'p6')
+    assert _ports('alu') == ('alu', )
+
+    # registers of one family are one resource
+    assert _resource(ah) == _resource(eax) == 'a'
+    assert _resource(a) == a._name()
+    assert _resource(1) is None and _resource(Label()) is None
+
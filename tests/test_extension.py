@@ -0,0 +1,56 @@
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._extension import _extension_source, _literal
+from asm._errors import ArgumentTypeError
+
+
+def test_literals_of_local_variables():
+    assert _literal(Variable(Type('int'), -5)) == '-5'
+    assert _literal(Variable(Type('char'), b'A')) == '65'
+    assert _literal(Variable(Type('double'), 0.1)) == (0.1).hex()
+    assert _literal(Variable(Type('double'), float('inf'))) == 'HUGE_VAL'
+    assert _literal(Variable(Type('double'), float('-inf'))) == '(-HUGE_VAL)'
+    assert _literal(Variable(Type('float'), float('nan'))) == 'NAN'
+
+
+def test_extension_source():
+    a, data = Variable(Type('short')), Variable(Array(Type('int'), 4))
+    local, c = Variable(Type('double'), 1.5), Variable(Type('int'))
+
+    source = _extension_source('pyxasm_test', [c, a, data, local], [['o'], ['i'], ['i'], []], [1, 2], '__asm__("nop;");')
+
+    assert '#include <math.h>' in source
+    assert 'PyMODINIT_FUNC PyInit_pyxasm_test(void)' in source
+    assert 'METH_FASTCALL' in source
+    assert 'if (nargs != 2)' in source
+
+    # short is checked against its limits, array is taken with buffer protocol
+    assert 'pyxasm_value < SHRT_MIN || pyxasm_value > SHRT_MAX' in source
+    assert f'PyObject_GetBuffer(args[1], &view_{data._name()}' in source
+    assert f'{local._name()} = {(1.5).hex()};' in source
+    assert f'PyLong_FromLong(value_{c._name()})' in source
+
+    # assembly insertion runs without GIL
+    assert 'Py_BEGIN_ALLOW_THREADS\n__asm__("nop;");\nPy_END_ALLOW_THREADS' in source
+
+
+def test_arrays_are_only_inputs():
+    data = Variable(Array(Type('int'), 4))
+
+    with pytest.raises(ArgumentTypeError):
+        _extension_source('pyxasm_test', [data], [['o']], [], '')
+
+
+def test_extension_backend(compiler):
+    a, b = Variable(Type('int')), Variable(Type('char'))
+
+    f = Function([mov(eax, a), add(eax, 1), mov(a, eax)])
+    f.compile([a, b], [], [a, b], backend='extension')
+
+    assert f(41, b'x') == (42, b'x')
+
+    with pytest.raises(ArgumentTypeError):
+        f(1, 'x')
@@ -0,0 +1,96 @@
+import pytest
+
+from asm import Function, Variable, Type, fuse
+from asm.registers import eax
+from asm._instructions import mov, add, jmp
+from asm._base_intruction import Label
+from asm._stream import InstructionStream
+from asm._fuse import _wiring, _append_stage
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+def _stage(inputs:list, outputs:list) -> tuple:
+    return (InstructionStream(), inputs, [], outputs)
+
+
+def test_default_wiring():
+    a, b, x, y = (Variable(Type('int')) for _ in range(4))
+    stages = [_stage([a], [b]), _stage([x], [y])]
+
+    # outputs are connected to first inputs of next function
+    assert _wiring(stages, None) == {(1, x._name()): (0, b._name())}
+
+
+def test_explicit_wiring():
+    a, b, x, y = (Variable(Type('int')) for _ in range(4))
+    stages = [_stage([a], [b]), _stage([x, a], [y])]
+
+    assert _wiring(stages, {x: b}) == {(1, x._name()): (0, b._name())}
+    assert _wiring(stages, {(1, a): (0, b)}) == {(1, a._name()): (0, b._name())}
+
+    # variable is input of two functions
+    with pytest.raises(ArgumentValueError):
+        _wiring(stages, {a: b})
+
+    # output can be connected only to next functions
+    with pytest.raises(ArgumentValueError):
+        _wiring(stages, {(0, a): (0, b)})
+
+    with pytest.raises(ArgumentValueError):
+        _wiring(stages, {(2, x): b})
+
+    with pytest.raises(ArgumentTypeError):
+        _wiring(stages, [(x, b)])
+
+
+def test_types_of_connected_variables():
+    a, b, x = Variable(Type('int')), Variable(Type('int')), Variable(Type('short'))
+
+    with pytest.raises(ArgumentTypeError):
+        _wiring([_stage([a], [b]), _stage([x], [])], {x: b})
+
+
+def test_variables_and_labels_are_renamed():
+    a, c, renamed = Variable(Type('int')), Variable(Type('int')), Variable(Type('int'))
+    body = Label([add(eax, 1), mov(c, eax)])
+
+    stage = InstructionStream()
+    stage.extend([mov(eax, a), jmp(body)])
+
+    result = InstructionStream()
+    _append_stage(result, stage, {a._name(): renamed})
+    _append_stage(result, stage, {a._name(): renamed})
+
+    source = result._source()
+
+    assert a._name() not in source and renamed._name() in source
+    assert repr(body) not in source
+
+    # each stage has its own labels, body of label is placed after instructions of stage
+    labels = [line for line in source.splitlines() if line.endswith(':"')]
+
+    assert len(labels) == 2 and labels[0] != labels[1]
+    assert source.splitlines()[2] == labels[0]
+
+
+def test_invalid_functions():
+    with pytest.raises(ArgumentValueError):
+        fuse()
+
+    with pytest.raises(ArgumentTypeError):
+        fuse(object())
+
+
+def test_fused_function(compiler):
+    def add_one():
+        a, c = Variable(Type('int')), Variable(Type('int'))
+
+        f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+        f.compile([a], [], [c])
+
+        return f
+
+    first, second = add_one(), add_one()
+
+    assert fuse(first, second)(1) == (3, )
+    assert fuse(first, second, first, backend='extension')(1) == (4, )
@@ -0,0 +1,44 @@
+import pytest
+
+import asm.instructions
+from asm import Function, _instructions
+from asm.registers import eax, ebx
+from asm._isa import spec, available_instructions
+
+
+def test_instructions_are_generated_from_isa():
+    assert 'mov' in available_instructions()
+    assert spec('mov').mnemonic == 'mov'
+    assert spec('unknown') is None
+
+    # instruction is created once
+    assert _instructions.mov is _instructions.mov
+
+    with pytest.raises(AttributeError):
+        _instructions.unknown
+
+
+def test_keywords_are_in_upper_case():
+    assert _instructions.AND(eax, 1)._name() == 'and'
+    assert 'AND' in _instructions.__all__
+
+
+def test_legacy_instructions_build_commands():
+    assert asm.instructions.mov(eax, 1)() == '"mov eax, 1;"\n'
+    assert asm.instructions.AND(eax, ebx)() == '"and eax, ebx;"\n'
+
+
+def test_implicit_registers_depend_on_form():
+    # one-operand imul writes edx:eax, two-operand imul writes only its destination
+    assert spec('imul').implicit(1) == (('a', ), ('a', 'd'))
+    assert spec('imul').implicit(2) == ((), ())
+    assert spec('div').implicit(1) == (('a', 'd'), ('a', 'd'))
+
+
+def test_clobbers_of_implicit_registers():
+    one_operand = Function([_instructions.imul(ebx)])
+    two_operands = Function([_instructions.imul(eax, ebx)])
+
+    assert two_operands._Function__instructions._forms() == {('imul', 2)}
+    assert one_operand._Function__clobbers([]) == ['eax', 'ebx', 'edx', 'cc']
+    assert two_operands._Function__clobbers([]) == ['eax', 'ebx', 'cc']
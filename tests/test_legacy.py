@@ -0,0 +1,142 @@
+import gc
+import os
+import shutil
+import struct
+import tempfile
+
+import pytest
+
+import asm.function
+from asm.function import Function, _RUNTIME_HEADER, _align, _private_directory, _remove_files, _runtime_object
+from asm.variable import Variable
+from asm.instructions import mov, add
+from asm.registers import eax
+
+
+@pytest.fixture
+def legacy_compiler():
+    if shutil.which('g++') is None:
+        pytest.skip('g++ is not found')
+
+
+def test_scalar_values_are_packed():
+    var = Variable('short int')
+    data = var._pack(-2)
+
+    assert data == struct.pack('h', -2)
+    assert var._unpack(b'\x00\x00' + data, 2, 1) == -2
+    assert Variable('double')._unpack(Variable('double')._pack(0.5), 0, 1) == 0.5
+
+
+def test_arrays_are_packed():
+    var = Variable('unsigned int[]')
+    data = var._pack([1, 2, 3])
+
+    assert len(data) == var._size(3) == 12
+    assert var._unpack(data, 4, 2) == [2, 3]
+
+
+def test_values_are_checked_by_packing():
+    with pytest.raises(ValueError):
+        Variable('short int', 2 ** 20)
+
+    with pytest.raises(ValueError):
+        Variable('int', 1.5)
+
+    with pytest.raises(TypeError):
+        Variable('int[]', 5)
+
+    with pytest.raises(ValueError):
+        Variable('string')
+
+    assert Variable('int[]', (1, 2))._length() == 2
+
+
+def test_codes_of_types():
+    assert Variable('int')._dtype_code() == 0
+    assert Variable('int[]')._dtype_code() != Variable('int')._dtype_code()
+
+
+def test_offsets_are_aligned():
+    assert [_align(offset) for offset in (0, 1, 8, 9)] == [0, 8, 8, 16]
+
+
+def test_removed_files_are_skipped(tmp_path):
+    existing = tmp_path / 'function.exe'
+    existing.write_bytes(b'')
+
+    _remove_files(str(existing), str(tmp_path / 'function.bin'))
+
+    assert not existing.exists()
+
+
+def test_legacy_function(legacy_compiler):
+    a, out = Variable('int'), Variable('int')
+
+    f = Function([mov(eax, a), add(eax, 1), mov(out, eax)])
+    f.compile(input_vars=[a], output_var=out)
+
+    assert f(41) == 42
+
+    # executable is in private directory and it is removed with function
+    executable = f._Function__buffer_file_name + '.exe'
+
+    assert os.path.exists(executable)
+    assert os.path.dirname(executable) != os.getcwd()
+
+    del f
+    gc.collect()
+
+    assert not os.path.exists(executable)
+
+
+def test_private_directory(monkeypatch, tmp_path):
+    if not hasattr(os, 'getuid'):
+        pytest.skip('directory of Windows belongs to user')
+
+    monkeypatch.setattr(tempfile, 'gettempdir', lambda: str(tmp_path))
+
+    directory = _private_directory()
+
+    assert directory == _private_directory()
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    # other users can write to directory
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(RuntimeError):
+        _private_directory()
+
+
+def test_runtime_is_memoized(legacy_compiler, monkeypatch):
+    object_file_name = _runtime_object()
+
+    assert os.path.exists(object_file_name)
+    assert os.path.dirname(object_file_name) == _private_directory()
+
+    # compiler is not run for next functions
+    def fail(*args, **kwargs):
+        raise AssertionError('compiler is run')
+
+    monkeypatch.setattr(asm.function, 'run', fail)
+
+    assert _runtime_object() == object_file_name
+
+
+def test_source_has_minimal_prelude(legacy_compiler):
+    a, out = Variable('int'), Variable('int')
+
+    f = Function([mov(eax, a), mov(out, eax)])
+    f.compile(input_vars=[a], output_var=out, delete_cpp=False)
+
+    source_file_name = f._Function__buffer_file_name + '.cpp'
+
+    try:
+        with open(source_file_name) as source_file:
+            source = source_file.read()
+    finally:
+        os.remove(source_file_name)
+
+    # runtime is linked as object file, so its headers are not compiled with function
+    assert _RUNTIME_HEADER in source
+    assert 'sys/mman.h' not in source and 'iostream' not in source
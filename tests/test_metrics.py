@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+import asm.metrics
+from asm import Function, Variable, Type, TypeVar, kernel
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._metrics import _metrics_for
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    asm.metrics.reset()
+    yield
+    asm.metrics.reset()
+
+
+def test_snapshot_of_counters():
+    metrics = _metrics_for('decode')
+    metrics._record(100)
+    metrics._record(3000)
+    metrics._record_batch(5000, 10)
+    metrics._record_error()
+
+    counters = asm.metrics.snapshot()['decode']
+
+    assert counters['calls'] == 3
+    assert counters['elements'] == 12
+    assert counters['errors'] == 1
+    assert counters['total_ns'] == 8100
+    assert sum(count for _, count in counters['buckets']) == 3
+    assert counters['buckets'][-1][0] is None
+
+
+def test_functions_with_the_same_name_share_metrics():
+    assert _metrics_for('f') is _metrics_for('f')
+
+
+def test_prometheus_text():
+    metrics = _metrics_for('dec"ode')
+    metrics._record(100)
+    metrics._record(3000)
+
+    lines = asm.metrics.prometheus_text().splitlines()
+
+    assert '# TYPE pyxasm_function_calls_total counter' in lines
+    assert 'pyxasm_function_calls_total{function="dec\\"ode"} 2' in lines
+    assert 'pyxasm_function_errors_total{function="dec\\"ode"} 0' in lines
+    assert '# TYPE pyxasm_function_latency_seconds histogram' in lines
+
+    # 100 ns is in bucket with upper bound 128 ns, buckets are cumulative
+    assert 'pyxasm_function_latency_seconds_bucket{function="dec\\"ode",le="1.28e-07"} 1' in lines
+    assert 'pyxasm_function_latency_seconds_bucket{function="dec\\"ode",le="4.096e-06"} 2' in lines
+    assert 'pyxasm_function_latency_seconds_bucket{function="dec\\"ode",le="+Inf"} 2' in lines
+    assert 'pyxasm_function_latency_seconds_count{function="dec\\"ode"} 2' in lines
+    assert 'pyxasm_function_latency_seconds_sum{function="dec\\"ode"} 3.1e-06' in lines
+
+
+def test_write_prometheus(tmp_path):
+    _metrics_for('f')._record(10)
+    path = os.path.join(tmp_path, 'pyxasm.prom')
+
+    asm.metrics.write_prometheus(path)
+
+    with open(path) as metrics_file:
+        assert metrics_file.read() == asm.metrics.prometheus_text()
+
+    assert os.listdir(tmp_path) == ['pyxasm.prom']
+
+
+def test_exporter_writes_file_on_stop(tmp_path):
+    path = os.path.join(tmp_path, 'pyxasm.prom')
+
+    with asm.metrics.PrometheusExporter(path, interval=60):
+        _metrics_for('f')._record(10)
+
+    with open(path) as metrics_file:
+        assert 'pyxasm_function_calls_total{function="f"} 1' in metrics_file.read()
+
+    with pytest.raises(ArgumentValueError):
+        asm.metrics.PrometheusExporter(path, interval=0)
+
+
+def test_name_of_function_is_required():
+    with pytest.raises(ArgumentValueError):
+        Function([mov(eax, 1)]).enable_metrics()
+
+    with pytest.raises(ArgumentTypeError):
+        Function([mov(eax, 1)]).enable_metrics('')
+
+
+def test_calls_are_counted(compiler):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    metrics = f.enable_metrics('add_one')
+
+    f(1)
+    f(2)
+    f.batch([1, 2, 3])
+
+    with pytest.raises(ArgumentValueError):
+        f()
+
+    counters = asm.metrics.snapshot()['add_one']
+
+    assert metrics.calls == counters['calls'] == 4
+    assert counters['elements'] == 6
+    assert counters['errors'] == 1
+
+    # counters stay after metrics are turned off
+    f.disable_metrics()
+    f(3)
+
+    assert asm.metrics.snapshot()['add_one']['calls'] == 4
+
+
+def test_variants_share_metrics(compiler):
+    T = TypeVar('T', 'int', 'long long')
+    a = Variable(T)
+
+    generic = Function([])
+    generic.compile([a], [], [])
+    generic.enable_metrics('generic')
+
+    generic(1)
+    generic(2 ** 40)
+
+    b, d = Variable(Type('int')), Variable(Type('int'))
+
+    @kernel([b], [], [d])
+    def shift(count):
+        yield mov(eax, b)
+        yield add(eax, count)
+        yield mov(d, eax)
+
+    shift.specialize(count=1)
+    shift.enable_metrics()
+    shift.specialize(count=1)(1)
+    shift.specialize(count=2)(1)
+
+    assert asm.metrics.snapshot()['generic']['calls'] == 2
+    assert asm.metrics.snapshot()['shift']['calls'] == 2
+
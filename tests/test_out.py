@@ -0,0 +1,56 @@
+from array import array
+from ctypes import c_int
+
+import pytest
+
+from asm import Function, Variable, Type
+from asm.registers import eax, ebx
+from asm._instructions import mov, add, sub
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+@pytest.fixture
+def sum_and_difference(compiler):
+    a, b = Variable(Type('int')), Variable(Type('int'))
+    s, d = Variable(Type('int')), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, b), mov(s, eax), mov(ebx, a), sub(ebx, b), mov(d, ebx)])
+    f.compile([a, b], [], [s, d])
+
+    return f
+
+
+def test_outputs_are_values(sum_and_difference):
+    assert sum_and_difference(5, 3) == (8, 2)
+
+    # preallocated structure of outputs is reused, previous result is not changed
+    first = sum_and_difference(1, 1)
+    sum_and_difference(10, 1)
+    assert first == (2, 0)
+
+
+def test_out_with_ctypes_objects(sum_and_difference):
+    result = (c_int(), c_int())
+
+    assert sum_and_difference(5, 3, out=result) is result
+    assert (result[0].value, result[1].value) == (8, 2)
+
+
+def test_out_with_writable_buffers(sum_and_difference):
+    s, d = bytearray(4), array('i', [0])
+
+    sum_and_difference(7, 2, out=[s, d])
+
+    assert int.from_bytes(s, 'little') == 9
+    assert d[0] == 5
+
+
+def test_invalid_out(sum_and_difference):
+    with pytest.raises(ArgumentValueError):
+        sum_and_difference(1, 2, out=[c_int()])
+
+    with pytest.raises(ArgumentTypeError):
+        sum_and_difference(1, 2, out=[c_int(), bytes(4)])
+
+    with pytest.raises(ArgumentTypeError):
+        sum_and_difference(1, 2, out=5)
@@ -0,0 +1,62 @@
+import pytest
+
+from asm import Function, Variable, Type, Array
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._errors import ArgumentValueError
+
+
+@pytest.fixture
+def add_one(compiler):
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, 1), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    return f
+
+
+@pytest.fixture
+def with_arrays(compiler):
+    a, data = Variable(Type('int')), Variable(Array(Type('int'), 4))
+    buffer, c = Variable(Array(Type('int'), 4), [1, 2, 3, 4]), Variable(Type('int'))
+
+    f = Function([mov(eax, a), add(eax, 2), mov(c, eax)])
+    f.compile([a, data], [buffer], [c])
+
+    return f
+
+
+def test_results_are_in_order(add_one):
+    inputs = list(range(1000))
+
+    assert add_one.parallel_map(inputs, workers=4, chunk=7) == [(x + 1, ) for x in inputs]
+    assert add_one.parallel_map([(5, )]) == [(6, )]
+    assert add_one.parallel_map([]) == []
+
+
+def test_calls_with_arrays(with_arrays):
+    inputs = [(x, [x] * 4) for x in range(200)]
+
+    assert with_arrays.parallel_map(inputs, workers=4, chunk=3) == [(x + 2, ) for x in range(200)]
+
+
+def test_threads_do_not_share_local_arrays(with_arrays):
+    first = with_arrays._Function__thread_arguments()
+    second = with_arrays._Function__thread_arguments()
+
+    # local variable has no roles, input array (last input) is shared
+    roles = with_arrays._Function__roles
+    local, data = roles.index([]), len(roles) - 2
+
+    assert first[local] is not second[local]
+    assert list(first[local]) == list(second[local]) == [1, 2, 3, 4]
+    assert first[data] is second[data]
+
+
+def test_invalid_arguments(add_one):
+    with pytest.raises(ArgumentValueError):
+        add_one.parallel_map([1, 2], workers=0)
+
+    with pytest.raises(ArgumentValueError):
+        add_one.parallel_map([1, 2], chunk=0)
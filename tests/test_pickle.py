@@ -0,0 +1,57 @@
+import os
+import sys
+import pickle
+import subprocess
+
+from asm import Function, Variable, Type
+from asm.registers import eax
+from asm._instructions import mov, add
+from asm._stream import InstructionStream
+
+
+def _add_one() -> tuple:
+    a, c = Variable(Type('int')), Variable(Type('int'))
+
+    return Function([mov(eax, a), add(eax, 1), mov(c, eax)]), a, c
+
+
+def test_stream_is_picklable():
+    stream = InstructionStream()
+    stream.extend([mov(eax, 1), add(eax, 2)])
+
+    restored = pickle.loads(pickle.dumps(stream))
+
+    assert len(restored) == 2
+    assert restored._source() == stream._source()
+
+
+def test_function_without_compilation():
+    f, a, c = _add_one()
+
+    restored = pickle.loads(pickle.dumps(f))
+
+    assert restored._Function__instructions._source() == f._Function__instructions._source()
+
+
+def test_compiled_function(compiler):
+    f, a, c = _add_one()
+    f.compile([a], [], [c])
+
+    assert pickle.loads(pickle.dumps(f))(41) == (42, )
+
+
+def test_compiled_function_in_other_process(compiler):
+    f, a, c = _add_one()
+    f.compile([a], [], [c])
+
+    # process does not import asm before unpickling, library is loaded without compiler
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__import__('asm').__file__)))
+    script = 'import pickle, sys\nprint(pickle.loads(sys.stdin.buffer.read())(1))'
+
+    result = subprocess.run([sys.executable, '-c', script],
+                            input=pickle.dumps(f),
+                            stdout=subprocess.PIPE,
+                            env=dict(os.environ, PYTHONPATH=root),
+                            check=True)
+
+    assert result.stdout.decode().strip() == '(2,)'
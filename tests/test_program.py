@@ -0,0 +1,92 @@
+import pytest
+
+from asm import Function
+from asm.registers import eax, ecx
+from asm._instructions import add
+from asm._program import Program, _emitters
+from asm._errors import ArgumentTypeError, ArgumentValueError, LabelIsNotDefinedError
+
+
+def test_program_with_forward_label():
+    with Program() as program:
+        done = program.label()
+
+        program.mov(ecx, 3)
+        program.jmp(done)
+
+        with program.label() as loop:
+            program.add(eax, ecx)
+            program.dec(ecx)
+            program.jne(loop)
+
+        program.place(done)
+
+    assert len(program) == 7
+    assert '"' + repr(done) + ':"' in list(program._stream._source_lines())
+
+
+def test_used_label_should_be_placed():
+    with pytest.raises(LabelIsNotDefinedError):
+        with Program() as program:
+            program.jmp(program.label())
+
+
+def test_function_checks_labels_of_program():
+    program = Program()
+    program.jmp(program.label())
+
+    with pytest.raises(LabelIsNotDefinedError):
+        Function(program)
+
+
+def test_label_is_placed_once():
+    program = Program()
+    label = program.label()
+    program.place(label)
+
+    with pytest.raises(ArgumentValueError):
+        program.place(label)
+
+
+def test_only_position_labels_are_placed():
+    with pytest.raises(ArgumentTypeError):
+        Program().place(object())
+
+
+def test_instructions_of_program_are_validated():
+    program = Program()
+
+    with pytest.raises(ArgumentTypeError):
+        program.mov(1, eax)
+
+    with pytest.raises(AttributeError):
+        program.unknown(eax)
+
+
+def test_program_extends_stream_lazily():
+    program = Program()
+    program.extend(add(eax, i) for i in range(5))
+
+    assert len(program) == 5
+
+
+def test_only_instructions_are_methods():
+    program = Program()
+
+    # other names of asm._instructions are not methods of program
+    for name in ('spec', 'available_instructions', 'Instruction', '_public_name', '__all__'):
+        with pytest.raises(AttributeError):
+            getattr(program, name)
+
+    assert not hasattr(program, 'iskeyword')
+
+
+def test_methods_are_created_once():
+    first, second = Program(), Program()
+
+    first.mov(eax, 1)
+    second.mov(eax, 2)
+
+    assert _emitters['mov'] is first.mov.__func__
+    assert first.mov.__func__ is second.mov.__func__
+    assert 'mov' not in vars(Program)
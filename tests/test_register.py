@@ -0,0 +1,65 @@
+import pickle
+
+import pytest
+
+import asm.registers
+import asm.instructions
+from asm._register import Register
+from asm._errors import ArgumentValueError
+
+
+def test_registers_are_interned():
+    assert Register('eax') is Register('eax')
+    assert asm.registers.eax is Register('eax')
+    assert asm.registers.Register is Register
+
+
+def test_unknown_register():
+    with pytest.raises(ArgumentValueError):
+        Register('rax')
+
+
+def test_metadata_of_registers():
+    assert Register('al').width() == 8
+    assert Register('ax').width() == 16
+    assert Register('eax').width() == 32
+    assert Register('mmx0').width() == 64
+
+    assert Register('ah').family() == Register('eax').family() == 'a'
+    assert Register('esi').is_source_index()
+    assert Register('ds').is_segment()
+    assert Register('mmx3').is_mmx()
+
+
+def test_aliases_of_registers():
+    assert Register('al').aliases(Register('eax'))
+    assert Register('ah').aliases(Register('ax'))
+    assert not Register('al').aliases(Register('ah'))
+    assert not Register('eax').aliases(Register('ebx'))
+
+
+def test_available_registers():
+    names = Register.available_registers()
+
+    assert 'eax' in names and 'mmx7' in names
+    assert all(hasattr(asm.registers, name) for name in names)
+
+
+def test_pickled_register_is_interned():
+    assert pickle.loads(pickle.dumps(Register('ecx'))) is Register('ecx')
+
+
+def test_representation_of_registers():
+    ecx = Register('ecx')
+
+    assert repr(ecx) == ecx.name() == 'ecx'
+    assert str(ecx) == "Register(name='ecx')"
+    assert (ecx.number(), ecx.kind()) == (1, 'gpr')
+    assert ecx.is_counter() and not ecx.is_accumulator()
+
+    # interned registers are keys of dicts
+    assert {Register('ecx'): 1}[asm.registers.ecx] == 1
+
+
+def test_legacy_instructions_use_names_of_registers():
+    assert asm.instructions.add(asm.registers.ecx, asm.registers.al)() == '"add ecx, al;"\n'
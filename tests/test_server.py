@@ -0,0 +1,130 @@
+import os
+import socket
+import shutil
+import threading
+
+import pytest
+
+from asm._server import (CompileServer, _job_key, _is_private, _private_directory, _socket_path,
+                         _read_library, _compile_remote, _SOCKET_VARIABLE)
+from asm._toolchain import GccToolchain
+from asm._warns import UnsafeServerWarning
+from asm._errors import ArgumentValueError, CompilationError
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix sockets are not supported')
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / 'server.sock')
+    server = CompileServer(socket_path, str(tmp_path / 'cache'), 2)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv(_SOCKET_VARIABLE, socket_path)
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_job_key():
+    toolchain = GccToolchain()._description()
+
+    assert _job_key('int a;', toolchain, []) == _job_key('int a;', dict(reversed(toolchain.items())), [])
+    assert _job_key('int a;', toolchain, []) != _job_key('int a;', toolchain, ['-fopenmp'])
+    assert _job_key('int a;', toolchain, []) != _job_key('int b;', toolchain, [])
+
+
+def test_private_files(tmp_path):
+    path = tmp_path / 'library.so'
+    path.write_bytes(b'library')
+
+    os.chmod(path, 0o600)
+    assert _is_private(os.stat(path))
+
+    os.chmod(path, 0o644)
+    assert not _is_private(os.stat(path))
+
+
+def test_private_directory(tmp_path):
+    _private_directory(str(tmp_path / 'cache'))
+
+    assert os.stat(tmp_path / 'cache').st_mode & 0o777 == 0o700
+
+    os.chmod(tmp_path / 'cache', 0o755)
+
+    with pytest.raises(ArgumentValueError):
+        _private_directory(str(tmp_path / 'cache'))
+
+
+def test_libraries_are_read_from_private_directory(tmp_path):
+    directory = tmp_path / 'cache'
+    directory.mkdir(mode=0o700)
+
+    path = directory / 'library.so'
+    path.write_bytes(b'library')
+    os.chmod(path, 0o600)
+
+    assert _read_library(str(path)) == b'library'
+
+    os.chmod(path, 0o666)
+
+    with pytest.warns(UnsafeServerWarning):
+        assert _read_library(str(path)) is None
+
+
+def test_server_is_disabled(monkeypatch, tmp_path):
+    monkeypatch.setenv(_SOCKET_VARIABLE, '')
+    assert _socket_path() is None
+
+    monkeypatch.setenv(_SOCKET_VARIABLE, str(tmp_path / 'missing.sock'))
+    assert _compile_remote('int a;', GccToolchain(), ()) is None
+
+
+def test_socket_of_other_users_is_not_used(monkeypatch, tmp_path):
+    socket_path = str(tmp_path / 'server.sock')
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(socket_path)
+        os.chmod(socket_path, 0o666)
+
+        monkeypatch.setenv(_SOCKET_VARIABLE, socket_path)
+
+        with pytest.warns(UnsafeServerWarning):
+            assert _compile_remote('int a;', GccToolchain(), ()) is None
+
+
+def test_server_is_started_once(server, tmp_path):
+    assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+
+    with pytest.raises(ArgumentValueError):
+        CompileServer(server.socket_path, str(tmp_path / 'cache'), 1)
+
+    with pytest.raises(ArgumentValueError):
+        CompileServer(str(tmp_path / 'other.sock'), str(tmp_path / 'cache'), 0)
+
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason='gcc is not found')
+def test_output_of_compiler_is_in_error(server, capfd):
+    with pytest.raises(CompilationError) as error:
+        _compile_remote('int a = ;\n', GccToolchain(), ())
+
+    assert 'Output of compiler:' in str(error.value)
+    assert 'error' in str(error.value)
+
+    # server does not write to output of client
+    assert capfd.readouterr().err == ''
+
+
+def test_library_is_compiled_once(compiler, server):
+    source = 'int pyxasm_value = 1;\n'
+
+    library = _compile_remote(source, GccToolchain(), ())
+
+    assert library is not None
+    assert os.listdir(server.cache) == [f'pyxasm_{_job_key(source, GccToolchain()._description(), [])}.so']
+    assert _compile_remote(source, GccToolchain(), ()) == library
@@ -0,0 +1,63 @@
+import pytest
+
+from asm import Function, Variable, Type, kernel
+from asm.registers import eax
+from asm._instructions import mov, shl, AND
+from asm._errors import ArgumentTypeError, ArgumentValueError, FunctionIsNotCompiledError
+
+
+a, c = Variable(Type('int')), Variable(Type('int'))
+
+
+def _shift_and_mask(shift, mask=0xFF):
+    yield mov(eax, a)
+    yield shl(eax, shift)
+    yield AND(eax, mask)
+    yield mov(c, eax)
+
+
+def test_invalid_templates():
+    with pytest.raises(ArgumentTypeError):
+        kernel([a], [], [c])(5)
+
+    with pytest.raises(ArgumentValueError):
+        kernel([a], [], [c], maxsize=0)(_shift_and_mask)
+
+    with pytest.raises(ArgumentValueError):
+        kernel([a], [], [c], backend='unknown')(_shift_and_mask)
+
+    with pytest.raises(ArgumentValueError):
+        Function([mov(eax, a)]).specialize(shift=1)
+
+
+def test_invalid_parameters():
+    template = kernel([a], [], [c])(_shift_and_mask)
+
+    with pytest.raises(ArgumentValueError):
+        template.specialize(unknown=1)
+
+    with pytest.raises(ArgumentValueError):
+        template.specialize()
+
+    with pytest.raises(ArgumentTypeError):
+        template.specialize(shift=[1])
+
+    # template is not compiled function
+    with pytest.raises(FunctionIsNotCompiledError):
+        template(1)
+
+
+def test_variants_are_memoized(compiler):
+    template = kernel([a], [], [c], maxsize=2)(_shift_and_mask)
+
+    variant = template.specialize(shift=3)
+
+    assert variant(5) == (40, )
+    assert template.specialize(shift=3, mask=0xFF) is variant
+    assert template.specialize(shift=1, mask=0x0F)(15) == (14, )
+
+    # least recently used variant is removed from cache
+    template.specialize(shift=2)
+    template.specialize(shift=4)
+
+    assert template.specialize(shift=3) is not variant
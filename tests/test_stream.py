@@ -0,0 +1,58 @@
+import pickle
+
+from asm.registers import eax, ebx
+from asm._instructions import mov, add, jmp
+from asm._base_intruction import Label
+from asm._stream import InstructionStream
+from asm._type import Type
+from asm._variable import Variable
+
+
+def test_stream_stores_instructions_in_columns():
+    stream = InstructionStream([mov(eax, 1), add(eax, ebx), mov(ebx, eax)])
+
+    assert len(stream) == 3
+    assert len(stream._opcodes) == len(stream._first) == len(stream._second) == 3
+
+    # operands are interned: eax, 1 and ebx
+    assert len(stream._operands) == 3
+
+
+def test_stream_round_trip_of_instructions():
+    instructions = [mov(eax, 1), add(eax, ebx)]
+    stream = InstructionStream(instructions)
+
+    assert [(instruction._name(), instruction._args()) for instruction in stream] == \
+           [(instruction._name(), instruction._args()) for instruction in instructions]
+
+
+def test_stream_source_in_both_syntaxes():
+    stream = InstructionStream([mov(eax, 1), add(eax, ebx)])
+
+    assert list(stream._source_lines()) == ['"mov eax, 1;"', '"add eax, ebx;"']
+    assert list(stream._source_lines('att')) == ['"mov $1, %%eax;"', '"add %%ebx, %%eax;"']
+
+
+def test_stream_extends_other_stream_and_generator():
+    stream = InstructionStream(mov(eax, i) for i in range(3))
+    stream.extend(InstructionStream([add(eax, ebx)]))
+
+    assert len(stream) == 4
+    assert list(stream._source_lines())[-1] == '"add eax, ebx;"'
+
+
+def test_stream_keeps_variables_and_labels():
+    a = Variable(Type('int'))
+    label = Label([add(eax, 1)])
+    stream = InstructionStream([mov(eax, a), jmp(label)])
+
+    assert list(stream._variables()) == [a]
+    assert list(stream._labels()) == [label]
+
+
+def test_pickled_stream_has_the_same_source():
+    stream = InstructionStream([mov(eax, 1), add(eax, ebx)])
+    restored = pickle.loads(pickle.dumps(stream))
+
+    assert list(restored._source_lines()) == list(stream._source_lines())
+    assert restored._operands[0] is eax
@@ -0,0 +1,81 @@
+import pytest
+
+from asm import Toolchain, available_toolchains, fastest_toolchain
+from asm._toolchain import GccToolchain, TinyCCToolchain, _resolve_toolchain
+from asm._errors import ArgumentTypeError, ArgumentValueError, CompilationError
+
+
+def test_create_toolchains():
+    gcc = Toolchain.create('gcc', optimization=2, native=True)
+
+    assert isinstance(gcc, GccToolchain)
+    assert (gcc.optimization, gcc.native, gcc.syntax, gcc.executable) == (2, True, 'intel', 'gcc')
+    assert Toolchain.create('clang', syntax='att').syntax == 'att'
+    assert Toolchain.create('tcc').syntax == 'att'
+
+    with pytest.raises(ArgumentValueError):
+        Toolchain.create('msvc')
+
+    with pytest.raises(ArgumentValueError):
+        Toolchain.create('gcc', optimization=4)
+
+    with pytest.raises(ArgumentValueError):
+        Toolchain.create('tcc', syntax='intel')
+
+
+def test_toolchains_are_compared_by_options():
+    assert Toolchain.create('gcc') == GccToolchain()
+    assert Toolchain.create('gcc') != Toolchain.create('gcc', optimization=1)
+    assert len({GccToolchain(), GccToolchain(), TinyCCToolchain()}) == 2
+
+    # description is used in manifest of bundle
+    gcc = Toolchain.create('gcc', optimization=3, executable='gcc-12')
+    assert Toolchain.create(**gcc._description()) == gcc
+
+
+def test_commands():
+    gcc = Toolchain.create('gcc', optimization=2, native=True)
+
+    assert gcc._command('a.c', 'a.so', ('-fopenmp', )) == \
+           ['gcc', '-fPIC', '-shared', '-m32', '-masm=intel', '-O2', '-march=native', '-fopenmp', '-o', 'a.so', 'a.c']
+    assert '-masm=intel' not in Toolchain.create('clang', syntax='att')._flags(())
+
+    # TinyCC does not optimize code
+    assert Toolchain.create('tcc', optimization=3)._command('a.c', 'a.so') == ['tcc', '-shared', '-m32', '-o', 'a.so', 'a.c']
+
+    with pytest.raises(CompilationError):
+        TinyCCToolchain()._flags(('-fopenmp', ))
+
+
+def test_missing_compiler(tmp_path):
+    source = tmp_path / 'a.c'
+    source.write_text('int a;\n')
+
+    with pytest.raises(CompilationError):
+        Toolchain.create('gcc', executable='pyxasm-missing-compiler')._compile(str(source), str(tmp_path / 'a.so'))
+
+
+def test_resolve_toolchain():
+    assert _resolve_toolchain(None) == GccToolchain()
+    assert _resolve_toolchain('tcc') == TinyCCToolchain()
+
+    clang = Toolchain.create('clang')
+    assert _resolve_toolchain(clang) is clang
+
+    with pytest.raises(ArgumentTypeError):
+        _resolve_toolchain(3)
+
+    with pytest.raises(ArgumentValueError):
+        fastest_toolchain(repeat=0)
+
+
+def test_detection(compiler):
+    toolchains = available_toolchains()
+
+    assert GccToolchain() in toolchains
+    assert available_toolchains() == toolchains
+
+    fastest = fastest_toolchain(repeat=1)
+
+    assert fastest in toolchains
+    assert fastest_toolchain() is fastest
@@ -0,0 +1,85 @@
+from array import array
+
+import pytest
+
+from asm import Function, Variable, Type, Array, TypeVar
+from asm.registers import eax, al
+from asm._instructions import mov
+from asm._type import _holds
+from asm._errors import ArgumentTypeError, ArgumentValueError
+
+
+def test_holds():
+    assert _holds(Type('short'), 32767)
+    assert not _holds(Type('short'), 32768)
+    assert not _holds(Type('unsigned int'), -1)
+    assert _holds(Type('double'), 0.5)
+    assert not _holds(Type('int'), 0.5)
+    assert _holds(Type('char'), b'a')
+    assert not _holds(Type('char'), 'a')
+    assert _holds(Type('int'), [1, [2, 3]])
+    assert _holds(Type('int'), array('i', [1])) and not _holds(Type('short'), array('i', [1]))
+
+
+def test_resolve_picks_first_candidate():
+    T = TypeVar('T', 'int', 'long long', 'double')
+
+    assert T._resolve([1, 2])._base_type_name == 'int'
+    assert T._resolve([1, 2 ** 40])._base_type_name == 'long long'
+    assert T._resolve([1.5])._base_type_name == 'double'
+
+    with pytest.raises(ArgumentTypeError):
+        T._resolve([b'a'])
+
+    with pytest.raises(ArgumentValueError):
+        TypeVar('T')
+
+    with pytest.raises(ArgumentValueError):
+        Variable(T, 1)
+
+
+def test_methods_of_compiled_variants_only():
+    T = TypeVar('T', 'int', 'long long')
+    a, c = Variable(T), Variable(T)
+
+    f = Function([mov(eax, a), mov(c, eax)])
+    f.compile([a], [], [c])
+
+    with pytest.raises(ArgumentValueError):
+        f.batch([1, 2])
+
+    with pytest.raises(ArgumentValueError):
+        f.parallel_map([1, 2])
+
+    with pytest.raises(ArgumentValueError):
+        f._bundle_entry()
+
+    with pytest.raises(ArgumentValueError):
+        f.resolve(1, 2)
+
+    with pytest.raises(ArgumentValueError):
+        Function([mov(eax, 1)]).resolve()
+
+
+def test_variant_is_validated_with_concrete_types():
+    T = TypeVar('T', 'int', 'char')
+    a = Variable(T)
+
+    f = Function([mov(al, a)])
+    f.compile([a], [], [])
+
+    # mov al, int is invalid
+    with pytest.raises(ArgumentTypeError):
+        f.resolve(1)
+
+
+def test_variants_are_cached(compiler):
+    T = TypeVar('T', 'int', 'double')
+    a, b = Variable(T), Variable(Array(T, 2))
+
+    # variants differ only in types of arguments
+    f = Function([])
+    f.compile([a, b], [], [])
+
+    assert f.resolve(1, [1, 2]) is f.resolve(2, [3, 4])
+    assert f.resolve(1, [1, 2]) is not f.resolve(0.5, [0.5, 1.0])
@@ -0,0 +1,79 @@
+import pytest
+
+from asm import _instructions
+from asm.registers import eax, ax, al, ebx, cl
+from asm._isa import OperandKind, spec
+from asm._base_intruction import Label, _classify
+from asm._type import Type, Array, TypeVar
+from asm._variable import Variable
+from asm._errors import ArgumentTypeError, ArgumentsNumberError
+
+
+def test_classes_of_operands():
+    assert _classify(eax) == OperandKind.REGISTER | OperandKind.W32
+    assert _classify(al) == OperandKind.REGISTER | OperandKind.W8
+    assert _classify(Variable(Type('short'))) == OperandKind.MEMORY | OperandKind.W16
+
+    # array is passed as pointer
+    assert _classify(Variable(Array(Type('char'), 4))) == OperandKind.MEMORY | OperandKind.W32
+
+    # number has all widths which can hold it
+    assert _classify(1) & OperandKind.WIDTHS == OperandKind.WIDTHS
+    assert not _classify(300) & OperandKind.W8
+
+    assert _classify(Label()) & OperandKind.LABEL
+    assert _classify('eax') == 0
+
+
+def test_masks_of_instructions():
+    mov = spec('mov')
+
+    assert mov.same_width
+    assert mov.masks[1] & OperandKind.IMMEDIATE
+
+    # shifts take count of 8 bits, so operands have different widths
+    assert not spec('shl').same_width
+    _instructions.shl(eax, cl)
+    _instructions.movzx(eax, al)
+
+
+def test_widths_of_operands_are_checked():
+    _instructions.mov(eax, ebx)
+    _instructions.mov(al, 255)
+
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(eax, al)
+
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(ax, 2 ** 20)
+
+
+def test_kinds_of_operands_are_checked():
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(1, eax)
+
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(eax, 'ebx')
+
+
+def test_widths_of_variables_are_checked():
+    _instructions.mov(eax, Variable(Type('int')))
+    _instructions.mov(eax, Variable(Array(Type('short'), 4)))
+
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(eax, Variable(Type('long long')))
+
+
+def test_number_of_operands_is_checked():
+    with pytest.raises(ArgumentsNumberError):
+        _instructions.mov(eax)
+
+
+def test_variables_of_type_variables():
+    T = TypeVar('T', 'short', 'int')
+
+    _instructions.mov(eax, Variable(T))
+    _instructions.mov(ax, Variable(T))
+
+    with pytest.raises(ArgumentTypeError):
+        _instructions.mov(al, Variable(T))